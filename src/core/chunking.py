@@ -0,0 +1,73 @@
+import hashlib
+
+MIN_CHUNK = 4 * 1024
+MAX_CHUNK = 64 * 1024
+# Marks are computed for growing steps past the minimum: text often cuts
+# soon after it, random data about 8 KB later.
+FIRST_STEP = 2 * 1024
+LAST_STEP = 16 * 1024
+# A cut follows RUN_LENGTH consecutive marked positions, about one in 2**13
+# for random data, so random data averages roughly MIN_CHUNK + 8 KB per chunk.
+RUN_LENGTH = 12
+RUN = b"\x01" * RUN_LENGTH
+DIGEST_SIZE = 16
+
+
+def _table(label):
+    return hashlib.shake_256(b"pyeditor-chunking-" + label).digest(256)
+
+
+# Fixed tables: chunk boundaries must come out the same in every process.
+MIX_LOW = _table(b"low")
+MIX_HIGH = _table(b"high")
+MARK = bytes(value & 1 for value in _table(b"mark"))
+
+
+def marks(segment):
+    # marks[i] is a pseudo-random bit of the byte pair ending at segment[i],
+    # so a run of marks is a hash of the last RUN_LENGTH + 1 bytes. The pair
+    # hash is built from whole-segment translate and integer XOR so that no
+    # Python code runs per byte; marks[0] has no predecessor and is unused.
+    mixed = int.from_bytes(segment.translate(MIX_LOW), "little") ^ (
+        int.from_bytes(segment.translate(MIX_HIGH), "little") << 8
+    )
+    return mixed.to_bytes(len(segment) + 1, "little").translate(MARK)
+
+
+def find_cut(data, low, high):
+    # First chunk end in [low, high] that follows a run of marks, else high.
+    position = low
+    step = FIRST_STEP
+    while position < high:
+        end = min(position + step, high)
+        start = max(0, position - RUN_LENGTH - 1)
+        found = marks(data[start:end]).find(RUN, 1, end - start)
+        if found != -1:
+            return max(low, start + found + RUN_LENGTH)
+        position = end
+        step = min(step * 2, LAST_STEP)
+    return high
+
+
+def cut_points(data, min_size=MIN_CHUNK, max_size=MAX_CHUNK):
+    # Boundaries depend only on nearby content, so an insert or delete moves
+    # at most the chunks around it and the rest still deduplicate.
+    size = len(data)
+    start = 0
+    while start < size:
+        if start + min_size >= size:
+            yield size
+            return
+        start = find_cut(data, start + min_size, min(start + max_size, size))
+        yield start
+
+
+def chunks(data, min_size=MIN_CHUNK, max_size=MAX_CHUNK):
+    start = 0
+    for end in cut_points(data, min_size, max_size):
+        yield data[start:end]
+        start = end
+
+
+def digest(chunk):
+    return hashlib.blake2b(chunk, digest_size=DIGEST_SIZE).digest()
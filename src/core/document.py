@@ -0,0 +1,244 @@
+import os
+from bisect import bisect_right
+from core.piece_table import (
+    PieceTable,
+    dirty_ranges,
+    iter_ranges,
+    iter_snapshot,
+    layout_of,
+    span_bytes,
+)
+from core.save import atomic_write, patch_in_place
+from core.text_format import NATIVE, encode_chunks
+from core.undo import UndoHistory
+
+
+def file_key(stat):
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class SavedState:
+    def __init__(self, path, version, layout, stat, stats, patched):
+        self.path = path
+        self.version = version
+        self.layout = layout
+        self.stat = stat
+        self.stats = stats
+        self.patched = patched
+
+
+class Document:
+    PATCH_RATIO = 0.25
+
+    def __init__(self, table, encoding="utf-8", source=None):
+        self.table = table
+        self.encoding = encoding
+        self.source = source
+        self.version = 0
+        self.saved_version = 0
+        # (path, file_key, layout) of the file as last opened or saved.
+        self.disk = None
+        # Receives insert(offset, data) and delete(offset, length) in bytes.
+        self.journal = None
+        # Encoding, byte order mark and line ends of the file on disk.
+        self.text_format = NATIVE
+        self.history = UndoHistory()
+
+    @classmethod
+    def from_text(cls, text, encoding="utf-8"):
+        return cls(PieceTable(text.encode(encoding)), encoding)
+
+    @classmethod
+    def from_index(cls, index, encoding=None):
+        document = cls(
+            PieceTable(index.buffer, index.offsets), encoding or index.encoding, index
+        )
+        if index.path is not None:
+            document.attach_file(index.path, index.stat)
+        return document
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def modified(self):
+        return self.version != self.saved_version
+
+    @property
+    def line_count(self):
+        return self.table.line_count
+
+    def line_start(self, line):
+        return self.table.line_start(line)
+
+    def get_text(self, first, last):
+        data = self.table.read(self.line_start(first), self.line_start(last))
+        return data.decode(self.encoding, errors="replace")
+
+    def text(self):
+        return self.table.read().decode(self.encoding, errors="replace")
+
+    def insert(self, offset, text):
+        data = text.encode(self.encoding)
+        start = len(self.table.added.data)
+        self.table.insert(offset, data)
+        self.version += 1
+        if data:
+            self.history.inserted(offset, (self.table.added, start, len(data)), text)
+        if self.journal is not None:
+            self.journal.insert(offset, data)
+
+    def delete(self, offset, length):
+        if length > 0:
+            self.history.deleted(offset, self.table.spans(offset, offset + length))
+        self.table.delete(offset, length)
+        self.version += 1
+        if self.journal is not None:
+            self.journal.delete(offset, length)
+
+    def splice(self, offset, length, spans):
+        # Replays undo history, so unlike insert and delete is not recorded.
+        self.table.delete(offset, length)
+        self.table.insert_spans(offset, spans)
+        self.version += 1
+        if self.journal is not None:
+            if length:
+                self.journal.delete(offset, length)
+            if spans:
+                self.journal.insert(offset, span_bytes(spans))
+
+    def undo(self, splice=None):
+        return self.history.undo(splice or self.splice)
+
+    def redo(self, splice=None):
+        return self.history.redo(splice or self.splice)
+
+    def attach_file(self, path, stat=None):
+        if stat is None:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self.disk = None
+                return
+        self.disk = (path, file_key(stat), layout_of(self.table.snapshot()))
+
+    def patch_ranges(self, path, layout):
+        # Transcoded files no longer match the document byte for byte.
+        if (
+            self.disk is None
+            or not self.text_format.native
+            or not hasattr(os, "pwrite")
+        ):
+            return None
+        disk_path, key, disk_layout = self.disk
+        if os.path.abspath(path) != os.path.abspath(disk_path):
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if file_key(stat) != key:
+            return None
+
+        ranges = dirty_ranges(disk_layout, layout)
+        if sum(end - start for start, end in ranges) > len(self) * self.PATCH_RATIO:
+            return None
+
+        source_stat = getattr(self.source, "stat", None)
+        if source_stat is not None and (source_stat.st_dev, source_stat.st_ino) == (
+            stat.st_dev,
+            stat.st_ino,
+        ):
+            # The original buffer maps this very file; patching is only safe
+            # if none of the rewritten bytes are read back from that mapping.
+            starts = [start for start, _ in ranges]
+            original = self.table.original.data
+            for offset, data, _, length in layout:
+                if data is not original:
+                    continue
+                i = bisect_right(starts, offset + length - 1) - 1
+                if i >= 0 and ranges[i][1] > offset:
+                    return None
+            if not self.protect_history(ranges, starts):
+                return None
+        return ranges
+
+    def protect_history(self, ranges, starts):
+        # Undo history refers to mapped bytes by their place in the file, so
+        # any the patch rewrites or truncates away are copied out first; if
+        # that is more than a patch would save, the caller writes it all.
+        original = self.table.original
+        size = len(self)
+        exposed = set()
+        for span in self.history.spans():
+            buffer, start, length = span
+            if buffer is not original:
+                continue
+            i = bisect_right(starts, start + length - 1) - 1
+            if start + length > size or (i >= 0 and ranges[i][1] > start):
+                exposed.add(span)
+        if sum(length for _, _, length in exposed) > size * self.PATCH_RATIO:
+            return False
+        copies = {}
+        for span in exposed:
+            _, start, length = span
+            copies[span] = self.table.add(bytes(original.data[start : start + length]))
+        if copies:
+            self.history.replace_spans(copies)
+        return True
+
+    def save_job(self, path):
+        # Everything the job needs is captured here on the calling thread;
+        # the job itself may run on an I/O worker while editing continues.
+        snapshot = self.table.snapshot()
+        layout = layout_of(snapshot)
+        version = self.version
+        size = len(self)
+        ranges = self.patch_ranges(path, layout)
+        text_format = self.text_format
+
+        def job(task=None):
+            if ranges is not None:
+                stats = patch_in_place(path, iter_ranges(layout, ranges), size)
+            else:
+                chunks = encode_chunks(iter_snapshot(snapshot), text_format)
+                stats = atomic_write(path, chunks, task)
+            return SavedState(
+                path, version, layout, os.stat(path), stats, ranges is not None
+            )
+
+        if ranges is not None:
+            return job, sum(end - start for start, end in ranges)
+        return job, size
+
+    def mark_saved(self, saved):
+        self.saved_version = saved.version
+        self.disk = (saved.path, file_key(saved.stat), saved.layout)
+
+    def save(self, path):
+        job, _ = self.save_job(path)
+        saved = job()
+        self.mark_saved(saved)
+        return saved
+
+    def convert(self, text_format):
+        # The file on disk no longer matches the document byte for byte, so
+        # the next save rewrites it whole.
+        self.text_format = text_format
+        self.disk = None
+
+    def compact(self):
+        # Rebuilds the table from its own text, dropping buffer bytes that
+        # edits have left behind. History and the disk layout refer to the
+        # old buffers, so both go with them.
+        self.table = PieceTable(self.table.read())
+        self.history.clear()
+        self.disk = None
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+
+    def close(self):
+        if self.source is not None:
+            self.source.close()
+            self.source = None
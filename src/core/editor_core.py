@@ -0,0 +1,125 @@
+import os
+from core.document import Document
+from core.io_worker import CHUNK_SIZE
+from core.line_index import LineIndex
+from core.search import SearchResult, replace_all, search
+from core.text_format import ASCII_COMPATIBLE, read_text, sniff
+
+LARGE_FILE_THRESHOLD = 16 * 1024 * 1024
+
+
+def make_document(path, text, text_format):
+    document = Document.from_text(text)
+    document.text_format = text_format
+    document.attach_file(path)
+    return document
+
+
+def load_document(path, task=None):
+    # Safe on an I/O worker: nothing here touches shared state.
+    return make_document(path, *read_text(path, task))
+
+
+def open_index(path):
+    # Large files are edited as raw bytes, which needs an encoding where
+    # every newline byte ends a line.
+    index = LineIndex.from_path(path)
+    encoding = sniff(index.buffer[:CHUNK_SIZE]).encoding
+    if encoding not in ASCII_COMPATIBLE:
+        index.close()
+        raise ValueError(f"Large {encoding} files are not supported")
+    index.encoding = encoding
+    return index
+
+
+class EditorCore:
+    # One open document and everything done to it that needs no widgets.
+    # FileEditor drives these from Tk; benchmarks and tests use them bare.
+    def __init__(self, document=None, path=None):
+        self.document = document if document is not None else Document.from_text("")
+        self.path = path
+
+    @classmethod
+    def open(cls, path, task=None):
+        if os.path.getsize(path) >= LARGE_FILE_THRESHOLD:
+            index = open_index(path)
+            index.build()
+            return cls(Document.from_index(index), path)
+        return cls.load(path, task)
+
+    @classmethod
+    def load(cls, path, task=None):
+        # Read into memory whatever the size; safe on an I/O worker.
+        return cls(load_document(path, task), path)
+
+    def text(self):
+        return self.document.text()
+
+    def snapshot(self):
+        # (snapshot, encoding, version): what a worker needs to read the
+        # document while editing goes on.
+        document = self.document
+        return document.table.snapshot(), document.encoding, document.version
+
+    def insert(self, offset, text):
+        self.document.insert(offset, text)
+
+    def delete(self, offset, length):
+        self.document.delete(offset, length)
+
+    def replace_text(self, text):
+        # The whole document in one group, so one undo step.
+        with self.document.history.group():
+            self.document.delete(0, len(self.document))
+            self.document.insert(0, text)
+
+    def undo(self, splice=None):
+        # splice is the widget's, when one shows the document.
+        return self.document.undo(splice)
+
+    def redo(self, splice=None):
+        return self.document.redo(splice)
+
+    def save_job(self, path=None):
+        return self.document.save_job(path or self.path)
+
+    def save(self, path=None):
+        path = path or self.path
+        saved = self.document.save(path)
+        self.path = path
+        return saved
+
+    def search_job(self, query):
+        # Like save_job: the snapshot is taken now and the returned job may
+        # fill the result on a worker. Returns (job, result, total bytes).
+        snapshot, encoding, version = self.snapshot()
+        result = SearchResult(version)
+
+        def job(task=None):
+            return search(snapshot, query, encoding, result, task)
+
+        return job, result, sum(length for _, _, length in snapshot)
+
+    def search(self, query, task=None):
+        job, _, _ = self.search_job(query)
+        return job(task)
+
+    def replace_job(self, query, replacement):
+        # Returns (job, version); the job gives (text, count) for the
+        # document as it was at version.
+        snapshot, encoding, version = self.snapshot()
+
+        def job(task=None):
+            return replace_all(snapshot, query, replacement, encoding, task)
+
+        return job, version
+
+    def replace_all(self, query, replacement, task=None):
+        job, _ = self.replace_job(query, replacement)
+        text, count = job(task)
+        if count:
+            self.replace_text(text)
+        return count
+
+    def close(self):
+        self.document.close()
@@ -0,0 +1,115 @@
+import os
+import threading
+from collections import deque
+from core.io_worker import CHUNK_SIZE
+from core.text_format import decoder
+
+FOLLOW_POLL_SECONDS = 0.25
+# Lines a followed document keeps; older ones are dropped from the top.
+DEFAULT_FOLLOW_LINES = 100_000
+# Decoded text waiting for the Tk thread, in case it falls behind a fast
+# writer; the oldest is dropped first, as the line cap would drop it anyway.
+MAX_PENDING_BYTES = 16 * 1024 * 1024
+# Trimmed lines stay in the piece table's buffers; a followed document is
+# rebuilt once its buffers hold this many times its text, plus some slack.
+COMPACT_RATIO = 2
+COMPACT_SLACK_BYTES = 1024 * 1024
+
+
+class FileFollower:
+    # Watches a growing file from a thread and collects what is appended to
+    # it; the Tk thread takes the text in batches at its own rate.
+    def __init__(
+        self, path, offset, key, text_format, interval=FOLLOW_POLL_SECONDS
+    ):
+        self.path = path
+        # Bytes of the file already shown and (st_dev, st_ino) of the file
+        # they were read from.
+        self.offset = offset
+        self.key = key
+        self.text_format = text_format
+        self.interval = interval
+        self.decode = decoder(text_format).decode
+        self.pending = deque()
+        self.pending_bytes = 0
+        # Set when the file was truncated or replaced: what was shown is gone
+        # and pending text starts from the top of the new file.
+        self.reset = False
+        self.error = None
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run, name="file-follower", daemon=True
+        )
+        self._thread.start()
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except OSError as e:
+                self.error = e
+            self._stop.wait(self.interval)
+
+    def poll(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Rotated away and not yet recreated.
+            return
+        key = (stat.st_dev, stat.st_ino)
+        if key != self.key or stat.st_size < self.offset:
+            self.restart(key)
+        if stat.st_size > self.offset:
+            self.read(key)
+
+    def restart(self, key):
+        self.key = key
+        self.offset = 0
+        self.decode = decoder(self.text_format).decode
+        with self.lock:
+            self.pending.clear()
+            self.pending_bytes = 0
+            self.reset = True
+
+    def read(self, key):
+        with open(self.path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            if (stat.st_dev, stat.st_ino) != key:
+                # Replaced between stat and open; the next poll restarts.
+                return
+            file.seek(self.offset)
+            while not self._stop.is_set():
+                chunk = file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.offset += len(chunk)
+                self.add(self.decode(chunk), len(chunk))
+
+    def add(self, text, size):
+        if not text:
+            return
+        with self.lock:
+            self.pending.append((text, size))
+            self.pending_bytes += size
+            while self.pending_bytes > MAX_PENDING_BYTES and len(self.pending) > 1:
+                self.pending_bytes -= self.pending.popleft()[1]
+
+    def take(self):
+        # (reset, text) of everything collected since the last call.
+        with self.lock:
+            reset, self.reset = self.reset, False
+            text = "".join(text for text, _ in self.pending)
+            self.pending.clear()
+            self.pending_bytes = 0
+        return reset, text
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
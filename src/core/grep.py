@@ -0,0 +1,289 @@
+import mmap
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+
+SKIP_DIRS = frozenset(
+    (".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", ".mypy_cache")
+)
+BINARY_SNIFF = 8192
+BATCH_FILES = 64
+MAX_MATCHES_PER_FILE = 1000
+MAX_PREVIEW = 200
+# Files are indexed a chunk at a time and left unindexed, so always searched,
+# when they are large, look random or have too many distinct trigrams.
+INDEX_CHUNK = 64 * 1024
+MAX_INDEX_BYTES = 16 * 1024 * 1024
+MAX_TRIGRAMS = 64 * 1024
+# Distinct trigrams per byte of the first block: text stays below a third,
+# random or compressed data is close to one.
+MAX_TRIGRAM_DENSITY = 0.5
+
+
+def default_index_path():
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache, "pyeditor", "grep-index.db")
+
+
+def walk(folder):
+    for directory, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+        for name in sorted(files):
+            yield os.path.join(directory, name)
+
+
+def trigrams(buffer):
+    # Distinct lower-cased 3-byte sequences, concatenated, or None if the
+    # file is not worth indexing. Lookups use bytes.find, so a hit straddling
+    # two entries is a harmless false positive: the file is then simply
+    # searched.
+    if len(buffer) > MAX_INDEX_BYTES:
+        return None
+    head = buffer[:BINARY_SNIFF].lower()
+    if len(head) == BINARY_SNIFF:
+        distinct = len({head[i : i + 3] for i in range(len(head) - 2)})
+        if distinct > BINARY_SNIFF * MAX_TRIGRAM_DENSITY:
+            return None
+    found = set()
+    for start in range(0, len(buffer), INDEX_CHUNK):
+        # Overlapping by two bytes keeps the trigrams across the boundary.
+        data = buffer[start : start + INDEX_CHUNK + 2].lower()
+        found.update(data[i : i + 3] for i in range(len(data) - 2))
+        if len(found) > MAX_TRIGRAMS:
+            return None
+    return b"".join(sorted(found))
+
+
+def query_trigrams(pattern, regex, match_case=True):
+    # Trigrams every matching file must contain; none for regex searches.
+    # The index only folds ASCII case, so ignoring case needs ASCII text.
+    if regex or not (match_case or pattern.isascii()):
+        return []
+    data = pattern.encode("utf-8").lower()
+    return sorted({data[i : i + 3] for i in range(len(data) - 2)})
+
+
+@lru_cache(maxsize=8)
+def compile_pattern(pattern, regex, match_case):
+    flags = 0 if match_case else re.IGNORECASE
+    source = pattern.encode("utf-8")
+    return re.compile(source if regex else re.escape(source), flags)
+
+
+def grep_file(path, spec, index):
+    # Returns (path, stat key, binary, matches, trigrams or None); runs in a
+    # worker process, so everything it touches is picklable.
+    try:
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            key = (stat.st_mtime_ns, stat.st_size)
+            if not stat.st_size:
+                return path, key, False, [], b"" if index else None
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                if b"\0" in buffer[:BINARY_SNIFF]:
+                    return path, key, True, [], None
+                matches = search_buffer(buffer, compile_pattern(*spec))
+                data = trigrams(buffer) if index else None
+    except (OSError, ValueError):
+        return path, None, False, [], None
+    return path, key, False, matches, data
+
+
+def search_buffer(buffer, compiled):
+    matches = []
+    line = 0
+    scanned = 0
+    for match in compiled.finditer(buffer):
+        start = match.start()
+        if match.end() == start:
+            continue
+        # mmap has no count(); each byte is copied out at most once here.
+        line += buffer[scanned:start].count(b"\n")
+        scanned = start
+        line_start = buffer.rfind(b"\n", 0, start) + 1
+        line_end = buffer.find(b"\n", start)
+        if line_end == -1:
+            line_end = len(buffer)
+        prefix = buffer[line_start:start].decode("utf-8", errors="replace")
+        text = buffer[line_start:line_end].decode("utf-8", errors="replace")
+        matches.append((line, len(prefix), text.strip()[:MAX_PREVIEW]))
+        if len(matches) >= MAX_MATCHES_PER_FILE:
+            break
+    return matches
+
+
+def grep_batch(batch, spec):
+    return [grep_file(path, spec, index) for path, index in batch]
+
+
+class GrepIndex:
+    # Per-file trigram sets keyed by (mtime_ns, size), persisted in SQLite
+    # so repeat searches only read files that can contain the pattern.
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                binary INTEGER NOT NULL,
+                trigrams BLOB
+            )
+        """)
+
+    def load(self, folder):
+        prefix = os.path.join(os.path.abspath(folder), "")
+        rows = self.conn.execute(
+            "SELECT path, mtime_ns, size, binary, trigrams FROM files "
+            "WHERE path >= ? AND path < ?",
+            (prefix, prefix[:-1] + chr(ord(os.sep) + 1)),
+        )
+        return {
+            path: ((mtime, size), binary, data)
+            for path, mtime, size, binary, data in rows
+        }
+
+    def store(self, entries):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                [
+                    (path, key[0], key[1], int(binary), data)
+                    for path, key, binary, data in entries
+                ],
+            )
+
+    def forget(self, paths):
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM files WHERE path = ?", [(path,) for path in paths]
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+class GrepResults:
+    # Filled by the search thread, read by the Tk thread: items only grow.
+    def __init__(self):
+        self.items = []
+        self.files_total = 0
+        self.files_searched = 0
+        self.files_skipped = 0
+        self.complete = False
+        self.lock = threading.Lock()
+
+    def add(self, path, matches):
+        with self.lock:
+            self.items.extend(
+                (path, line, column, text) for line, column, text in matches
+            )
+            self.files_searched += 1
+
+    def since(self, start):
+        with self.lock:
+            return self.items[start:]
+
+
+def grep_folder(folder, spec, results, index_path=None, executor=None, task=None):
+    # spec is (pattern, regex, match_case). Files whose indexed trigrams
+    # rule out a match are skipped without being opened.
+    folder = os.path.abspath(folder)
+    index = GrepIndex(index_path) if index_path else None
+    updates = []
+    try:
+        known = index.load(folder) if index is not None else {}
+        wanted = query_trigrams(*spec)
+        candidates = []
+        seen = set()
+        for path in walk(folder):
+            if task is not None and task.cancelled:
+                return results
+            seen.add(path)
+            results.files_total += 1
+            entry = known.get(path)
+            if entry is not None:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                key, binary, data = entry
+                if key == (stat.st_mtime_ns, stat.st_size):
+                    if binary or (
+                        data is not None and not all(t in data for t in wanted)
+                    ):
+                        results.files_skipped += 1
+                        continue
+                    candidates.append((path, False))
+                    continue
+            candidates.append((path, index is not None))
+        # Files read to be indexed; those left unindexed are stored without
+        # trigrams so later searches neither skip nor index them again.
+        indexing = {path for path, fresh in candidates if fresh}
+
+        if task is not None:
+            task.total = len(candidates)
+        batches = [
+            candidates[i : i + BATCH_FILES]
+            for i in range(0, len(candidates), BATCH_FILES)
+        ]
+        if executor is None:
+            outputs = (grep_batch(batch, spec) for batch in batches)
+        else:
+            outputs = stream(executor, batches, spec)
+        for output in outputs:
+            for path, key, binary, matches, data in output:
+                if key is None:
+                    continue
+                if matches:
+                    results.add(path, matches)
+                else:
+                    results.files_searched += 1
+                if index is not None and (binary or path in indexing):
+                    updates.append((path, key, binary, data))
+            if task is not None:
+                task.advance(len(output))
+
+        if index is not None:
+            index.forget(set(known) - seen)
+    finally:
+        if index is not None:
+            # Kept even when cancelled: those files need not be read again.
+            index.store(updates)
+            index.close()
+        results.complete = True
+    return results
+
+
+def stream(executor, batches, spec):
+    # Yields batch results as they finish, keeping a bounded number of
+    # batches in flight so cancelling stops work promptly.
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    pending = set()
+    batches = iter(batches)
+    limit = 2 * (os.cpu_count() or 1)
+    try:
+        while True:
+            while len(pending) < limit:
+                batch = next(batches, None)
+                if batch is None:
+                    break
+                pending.add(executor.submit(grep_batch, batch, spec))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,258 @@
+import builtins
+import keyword
+import os
+import re
+from bisect import bisect_left, bisect_right
+from time import perf_counter
+
+
+class Lexer:
+    # Lexes one line at a time. The state carried from line to line is a
+    # string: "" between tokens, otherwise the kind of multi-line region
+    # (string, comment) the next line starts inside.
+    initial = ""
+    TOKEN = None
+    KEYWORDS = frozenset()
+    BUILTINS = frozenset()
+    DEFINERS = frozenset()
+
+    def lex_line(self, text, state):
+        tokens = []
+        position = 0
+        definition = False
+        while True:
+            if state:
+                kind = self.region_kind(state)
+                end, state = self.continue_region(text, position, state)
+                tokens.append((kind, position, end))
+                if state:
+                    return tokens, state
+                position = end
+
+            match = self.TOKEN.search(text, position)
+            if match is None:
+                return tokens, self.initial
+            kind = match.lastgroup
+            start, end = match.span()
+            position = end
+
+            opened = self.open_region(match)
+            if opened:
+                end, state = self.continue_region(text, end, opened)
+                tokens.append((self.region_kind(opened), start, end))
+                if state:
+                    return tokens, state
+                position = end
+                continue
+
+            if kind == "name":
+                word = match.group()
+                if definition:
+                    kind = "definition"
+                elif word in self.KEYWORDS:
+                    kind = "keyword"
+                elif word in self.BUILTINS:
+                    kind = "builtin"
+                else:
+                    definition = False
+                    continue
+                definition = word in self.DEFINERS
+            tokens.append((kind, start, end))
+
+    def open_region(self, match):
+        return None
+
+    def continue_region(self, text, position, state):
+        raise NotImplementedError
+
+    def region_kind(self, state):
+        return "string"
+
+
+class PythonLexer(Lexer):
+    KEYWORDS = frozenset(keyword.kwlist + keyword.softkwlist)
+    BUILTINS = frozenset(name for name in dir(builtins) if not name.startswith("_"))
+    DEFINERS = frozenset(("def", "class"))
+    TOKEN = re.compile(
+        r"""
+        (?P<comment>\#.*)
+        | (?P<string>(?i:[rbuf]{0,2})(?:'''|\"\"\"|'(?:\\.|[^'\\])*'?|"(?:\\.|[^"\\])*"?))
+        | (?P<decorator>^\s*@[\w.]+)
+        | (?P<number>\b(?:0[xXoObB][0-9a-fA-F_]+|\d[\d_]*\.?[\d_]*(?:[eE][+-]?\d+)?[jJ]?))
+        | (?P<name>[A-Za-z_]\w*)
+        """,
+        re.VERBOSE,
+    )
+    CLOSE = {
+        quote: re.compile(r"(?:\\.|[^\\])*?" + quote, re.DOTALL)
+        for quote in ("'''", '"""')
+    }
+
+    def open_region(self, match):
+        if match.lastgroup == "string":
+            quote = match.group().lstrip("rRbBuUfF")[:3]
+            if quote in self.CLOSE:
+                return quote
+        return None
+
+    def continue_region(self, text, position, state):
+        close = self.CLOSE[state].match(text, position)
+        if close is None:
+            return len(text), state
+        return close.end(), self.initial
+
+
+class RustLexer(Lexer):
+    KEYWORDS = frozenset(
+        """as async await break const continue crate dyn else enum extern false
+        fn for if impl in let loop match mod move mut pub ref return self Self
+        static struct super trait true type union unsafe use where while""".split()
+    )
+    BUILTINS = frozenset(
+        """bool char str String u8 u16 u32 u64 u128 usize i8 i16 i32 i64 i128
+        isize f32 f64 Vec Option Result Box Some None Ok Err""".split()
+    )
+    DEFINERS = frozenset(("fn", "struct", "enum", "trait", "mod", "type"))
+    TOKEN = re.compile(
+        r"""
+        (?P<comment>//.*)
+        | (?P<block>/\*)
+        | (?P<raw>b?r(?P<hashes>\#*)")
+        | (?P<string>b?")
+        | (?P<char>b?'(?:\\.|[^\\'])')
+        | (?P<decorator>\#!?\[[^\]]*\]?)
+        | (?P<number>\b\d[\d_]*(?:\.\d[\d_]*)?(?:[eE][+-]?\d+)?(?:[iuf](?:8|16|32|64|128|size))?)
+        | (?P<macro>[A-Za-z_]\w*!)
+        | (?P<name>[A-Za-z_]\w*)
+        """,
+        re.VERBOSE,
+    )
+    COMMENT_MARK = re.compile(r"/\*|\*/")
+    STRING_CLOSE = re.compile(r'(?:\\.|[^"\\])*"')
+
+    # States: "/*<depth>" in nested block comments, '"' in a string and
+    # "r<hashes>" in a raw string.
+    def open_region(self, match):
+        kind = match.lastgroup
+        if kind == "block":
+            return "/*1"
+        if kind == "string":
+            return '"'
+        if kind == "raw":
+            return "r" + str(len(match.group("hashes")))
+        return None
+
+    def continue_region(self, text, position, state):
+        if state.startswith("/*"):
+            depth = int(state[2:])
+            for mark in self.COMMENT_MARK.finditer(text, position):
+                depth += 1 if mark.group() == "/*" else -1
+                if depth == 0:
+                    return mark.end(), self.initial
+            return len(text), f"/*{depth}"
+        if state == '"':
+            close = self.STRING_CLOSE.match(text, position)
+            if close is None:
+                return len(text), state
+            return close.end(), self.initial
+        closer = '"' + "#" * int(state[1:])
+        end = text.find(closer, position)
+        if end == -1:
+            return len(text), state
+        return end + len(closer), self.initial
+
+    def region_kind(self, state):
+        return "comment" if state.startswith("/*") else "string"
+
+
+LEXERS = {".py": PythonLexer, ".pyw": PythonLexer, ".rs": RustLexer}
+
+
+def lexer_for(path):
+    if not path:
+        return None
+    lexer = LEXERS.get(os.path.splitext(path)[1].lower())
+    return lexer() if lexer is not None else None
+
+
+class Highlighter:
+    # Keeps the lexer state at the start of every line. After an edit only
+    # the edited lines are re-lexed, continuing until the state at a line
+    # start matches what was stored there before; everything past that
+    # point, up to the next edited line, lexes the same as before.
+    def __init__(self, lexer, line_count=1):
+        self.lexer = lexer
+        self.states = [lexer.initial] + [None] * (line_count - 1)
+        # states[:valid] are correct; states[:lexed] were, before the edits
+        # in dirty (sorted line numbers, not yet re-lexed).
+        self.valid = 1
+        self.lexed = 1
+        self.dirty = []
+        # Lines whose tokens were handed out and have not changed since.
+        self.fresh = bytearray(line_count)
+
+    @property
+    def line_count(self):
+        return len(self.states)
+
+    def edit(self, line, removed, added):
+        # Lines line..line+removed were replaced by lines line..line+added.
+        delta = added - removed
+        self.states[line + 1 : line + 1 + removed] = [None] * added
+        self.fresh[line : line + 1 + removed] = bytes(added + 1)
+
+        dirty = self.dirty
+        frontier = self.valid - 1
+        if line < frontier and self.valid < self.lexed:
+            # Re-lexing stopped part way down; the line it stopped at still
+            # has to be redone once the frontier moves above it.
+            position = bisect_left(dirty, frontier)
+            if position == len(dirty) or dirty[position] != frontier:
+                dirty.insert(position, frontier)
+        first = bisect_left(dirty, line)
+        last = bisect_right(dirty, line + removed)
+        dirty[first:last] = [line]
+        for i in range(first + 1, len(dirty)):
+            dirty[i] += delta
+
+        if self.lexed > line + removed + 1:
+            self.lexed += delta
+        elif self.lexed > line + 1:
+            self.lexed = line + 1
+        self.valid = min(self.valid, line + 1)
+
+    def advance(self, target, get_line, deadline=None):
+        # Make states[target] correct; returns False if the deadline passed.
+        target = min(target, self.line_count - 1)
+        states = self.states
+        dirty = self.dirty
+        while self.valid <= target:
+            line = self.valid - 1
+            _, end = self.lexer.lex_line(get_line(line), states[line])
+            while dirty and dirty[0] <= line:
+                dirty.pop(0)
+            following = line + 1
+            if states[following] == end and following < self.lexed:
+                self.valid = min(dirty[0] + 1, self.lexed) if dirty else self.lexed
+            else:
+                if states[following] != end:
+                    states[following] = end
+                    self.fresh[following] = 0
+                self.valid = following + 1
+                self.lexed = max(self.lexed, self.valid)
+            if deadline is not None and perf_counter() > deadline:
+                return self.valid > target
+        return True
+
+    def tokens(self, line, get_line):
+        # states[line] must be correct; see advance().
+        tokens, _ = self.lexer.lex_line(get_line(line), self.states[line])
+        self.fresh[line] = 1
+        return tokens
+
+    def stale_lines(self, first, last):
+        last = min(last, self.line_count)
+        line = self.fresh.find(0, first, last)
+        while line != -1:
+            yield line
+            line = self.fresh.find(0, line + 1, last)
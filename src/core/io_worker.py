@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class Cancelled(Exception):
+    pass
+
+
+class IOTask:
+    def __init__(self, total=0):
+        self.total = total
+        self.done_bytes = 0
+        self.future = None
+        self._cancelled = threading.Event()
+
+    @property
+    def progress(self):
+        if not self.total:
+            return 0.0
+        return min(self.done_bytes / self.total, 1.0)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def advance(self, count):
+        if self._cancelled.is_set():
+            raise Cancelled()
+        self.done_bytes += count
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        return self.future.result()
+
+
+class IOWorker:
+    def __init__(self, max_workers=2):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="editor-io"
+        )
+
+    def submit(self, function, *args, total=0):
+        task = IOTask(total)
+        task.future = self.executor.submit(function, *args, task=task)
+        return task
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def read_file(path, task=None, chunk_size=CHUNK_SIZE):
+    chunks = []
+    with open(path, "rb") as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if task is not None:
+                task.advance(len(chunk))
+    return b"".join(chunks)
+
@@ -0,0 +1,107 @@
+import hashlib
+import mmap
+import os
+import threading
+from array import array
+
+FINGERPRINT_BYTES = 64 * 1024
+
+
+def map_file(path):
+    with open(path, "rb") as file:
+        stat = os.fstat(file.fileno())
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped.
+            buffer = b""
+    return buffer, stat
+
+
+def fingerprint(buffer, stat):
+    # Size, mtime and a hash of the first and last 64 KB: cheap to compute,
+    # and enough to tell whether a cached line index still fits the file.
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(buffer[:FINGERPRINT_BYTES])
+    digest.update(buffer[-FINGERPRINT_BYTES:])
+    return stat.st_size, stat.st_mtime_ns, digest.digest()
+
+
+class LineIndex:
+    CHUNK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, buffer, path=None, stat=None):
+        self.buffer = buffer
+        self.path = path
+        self.stat = stat
+        self.size = len(buffer)
+        self.offsets = array("Q", [0])
+        self.scanned = 0
+        self.complete = self.size == 0
+        # Only encodings where a newline byte always ends a line.
+        self.encoding = "utf-8"
+        self._cancelled = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_path(cls, path):
+        buffer, stat = map_file(path)
+        return cls(buffer, path, stat)
+
+    @property
+    def line_count(self):
+        return len(self.offsets)
+
+    @property
+    def progress(self):
+        if self.complete:
+            return 1.0
+        return self.scanned / self.size
+
+    def build(self):
+        buffer = self.buffer
+        position = 0
+        while position < self.size and not self._cancelled.is_set():
+            end = min(position + self.CHUNK_SIZE, self.size)
+            found = array("Q")
+            newline = buffer.find(b"\n", position, end)
+            while newline != -1:
+                found.append(newline + 1)
+                newline = buffer.find(b"\n", newline + 1, end)
+            self.offsets.extend(found)
+            position = end
+            self.scanned = end
+        if not self._cancelled.is_set():
+            self.complete = True
+
+    def adopt(self, offsets):
+        # Offsets from an earlier scan of the same file, so none is needed.
+        self.offsets = offsets
+        self.scanned = self.size
+        self.complete = True
+
+    def start(self):
+        if self.complete or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.build, daemon=True)
+        self._thread.start()
+
+    def line_start(self, line):
+        if line < len(self.offsets):
+            return self.offsets[line]
+        return self.size if self.complete else self.scanned
+
+    def get_bytes(self, first, last):
+        return self.buffer[self.line_start(first) : self.line_start(last)]
+
+    def get_text(self, first, last):
+        data = bytes(self.get_bytes(first, last))
+        return data.decode(self.encoding, errors="replace")
+
+    def close(self):
+        self._cancelled.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
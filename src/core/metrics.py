@@ -0,0 +1,133 @@
+import functools
+import math
+import threading
+import time
+from array import array
+
+# Bucket upper bounds grow by 2 ** (1 / 4) from 1 µs, so a percentile read
+# from the buckets is within about 19% of the true value; the last bucket
+# takes everything above about 4.5 minutes.
+MIN_SECONDS = 1e-6
+BUCKETS_PER_DOUBLING = 4
+BUCKETS = 112
+PERCENTILES = (50, 90, 99)
+
+
+def bucket_of(seconds):
+    if seconds <= MIN_SECONDS:
+        return 0
+    i = math.ceil(math.log2(seconds / MIN_SECONDS) * BUCKETS_PER_DOUBLING)
+    return min(i, BUCKETS - 1)
+
+
+def bucket_limit(i):
+    return MIN_SECONDS * 2 ** (i / BUCKETS_PER_DOUBLING)
+
+
+class Histogram:
+    # Fixed size however many samples it takes.
+    __slots__ = ("counts", "count", "total", "maximum")
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * BUCKETS))
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def record(self, seconds):
+        self.counts[bucket_of(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def percentile(self, percent):
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_limit(i), self.maximum)
+        return self.maximum
+
+    def summary(self):
+        summary = {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.maximum * 1000,
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent}_ms"] = self.percentile(percent) * 1000
+        return summary
+
+
+class Probes:
+    # Named latency histograms. While disabled a probe costs one attribute
+    # check; the lock is only taken to record.
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.record(seconds)
+
+    def timed(self, name):
+        def decorate(function):
+            @functools.wraps(function)
+            def probe(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - started)
+
+            return probe
+
+        return decorate
+
+    def summary(self):
+        with self.lock:
+            return {
+                name: histogram.summary()
+                for name, histogram in sorted(self.histograms.items())
+            }
+
+    def dump(self, path):
+        # Raw bucket counts are kept alongside the summary so runs from
+        # different releases can be merged or compared bucket by bucket.
+        import json
+        import platform
+
+        with self.lock:
+            buckets = {
+                name: {
+                    str(i): count for i, count in enumerate(histogram.counts) if count
+                }
+                for name, histogram in self.histograms.items()
+            }
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "bucket_limits_ms": [bucket_limit(i) * 1000 for i in range(BUCKETS)],
+            "probes": self.summary(),
+            "buckets": buckets,
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+
+
+# Shared by the whole process; main enables it with --metrics.
+PROBES = Probes()
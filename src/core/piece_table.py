@@ -0,0 +1,363 @@
+import random
+from array import array
+from bisect import bisect_left
+
+
+class PieceBuffer:
+    __slots__ = ("data", "line_starts")
+
+    def __init__(self, data, line_starts):
+        self.data = data
+        self.line_starts = line_starts
+
+    def count_newlines(self, start, end):
+        starts = self.line_starts
+        return bisect_left(starts, end + 1) - bisect_left(starts, start + 1)
+
+    def line_end(self, start, n):
+        # Offset just past the n-th newline found at or after start.
+        starts = self.line_starts
+        return starts[bisect_left(starts, start + 1) + n - 1]
+
+
+class Piece:
+    __slots__ = (
+        "buffer",
+        "start",
+        "length",
+        "newlines",
+        "priority",
+        "left",
+        "right",
+        "size",
+        "lines",
+    )
+
+    def __init__(self, buffer, start, length):
+        self.buffer = buffer
+        self.start = start
+        self.length = length
+        self.newlines = buffer.count_newlines(start, start + length)
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.size = length
+        self.lines = self.newlines
+
+    def update(self):
+        self.size = self.length
+        self.lines = self.newlines
+        if self.left is not None:
+            self.size += self.left.size
+            self.lines += self.left.lines
+        if self.right is not None:
+            self.size += self.right.size
+            self.lines += self.right.lines
+
+
+def _size(node):
+    return node.size if node is not None else 0
+
+
+def _lines(node):
+    return node.lines if node is not None else 0
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+def _split(node, offset):
+    if node is None:
+        return None, None
+    left_size = _size(node.left)
+    if offset <= left_size:
+        left, node.left = _split(node.left, offset)
+        node.update()
+        return left, node
+    if offset >= left_size + node.length:
+        node.right, right = _split(node.right, offset - left_size - node.length)
+        node.update()
+        return node, right
+
+    cut = offset - left_size
+    tail = Piece(node.buffer, node.start + cut, node.length - cut)
+    node.length = cut
+    node.newlines -= tail.newlines
+    right = _merge(tail, node.right)
+    node.right = None
+    node.update()
+    return node, right
+
+
+class PieceTable:
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, original=b"", line_starts=None):
+        if line_starts is None:
+            line_starts = array("Q", [0])
+            newline = original.find(b"\n")
+            while newline != -1:
+                line_starts.append(newline + 1)
+                newline = original.find(b"\n", newline + 1)
+        self.original = PieceBuffer(original, line_starts)
+        self.added = PieceBuffer(bytearray(), array("Q", [0]))
+        self.root = Piece(self.original, 0, len(original)) if original else None
+
+    def __len__(self):
+        return _size(self.root)
+
+    @property
+    def line_count(self):
+        return _lines(self.root) + 1
+
+    def add(self, data):
+        # Appends to the add buffer and returns the (buffer, start, length)
+        # span now holding data.
+        added = self.added
+        start = len(added.data)
+        added.data += data
+        newline = data.find(b"\n")
+        while newline != -1:
+            added.line_starts.append(start + newline + 1)
+            newline = data.find(b"\n", newline + 1)
+        return added, start, len(data)
+
+    def insert(self, offset, data):
+        if not data:
+            return
+        added, start, _ = self.add(data)
+
+        left, right = _split(self.root, offset)
+        if not self._extend_last(left, start, len(data)):
+            left = _merge(left, Piece(added, start, len(data)))
+        self.root = _merge(left, right)
+
+    def _extend_last(self, node, start, length):
+        # Consecutive typing appends to the same piece instead of adding nodes.
+        if node is None:
+            return False
+        if node.right is not None:
+            extended = self._extend_last(node.right, start, length)
+        else:
+            extended = (
+                node.buffer is self.added and node.start + node.length == start
+            )
+            if extended:
+                node.length += length
+                node.newlines = node.buffer.count_newlines(
+                    node.start, node.start + node.length
+                )
+        if extended:
+            node.update()
+        return extended
+
+    def delete(self, offset, length):
+        if length <= 0:
+            return
+        left, rest = _split(self.root, offset)
+        _, right = _split(rest, length)
+        self.root = _merge(left, right)
+
+    def insert_spans(self, offset, spans):
+        # Puts back (buffer, start, length) spans taken by spans(); nothing
+        # is copied since buffers are never modified.
+        left, right = _split(self.root, offset)
+        for buffer, start, length in spans:
+            left = _merge(left, Piece(buffer, start, length))
+        self.root = _merge(left, right)
+
+    def spans(self, start, end):
+        spans = []
+        self._spans(self.root, start, end, 0, spans)
+        return spans
+
+    def _spans(self, node, start, end, base, spans):
+        if node is None:
+            return
+        left_size = _size(node.left)
+        if start < base + left_size:
+            self._spans(node.left, start, end, base, spans)
+        piece_base = base + left_size
+        lo = max(start, piece_base)
+        hi = min(end, piece_base + node.length)
+        if lo < hi:
+            spans.append((node.buffer, node.start + lo - piece_base, hi - lo))
+        right_base = piece_base + node.length
+        if end > right_base:
+            self._spans(node.right, start, end, right_base, spans)
+
+    def line_at(self, offset):
+        # Lines before offset, that is the 0-based line it falls on.
+        line = 0
+        node = self.root
+        while node is not None:
+            left_size = _size(node.left)
+            if offset < left_size:
+                node = node.left
+                continue
+            offset -= left_size
+            line += _lines(node.left)
+            if offset <= node.length:
+                return line + node.buffer.count_newlines(
+                    node.start, node.start + offset
+                )
+            offset -= node.length
+            line += node.newlines
+            node = node.right
+        return line
+
+    def line_start(self, line):
+        if line <= 0:
+            return 0
+        if line > _lines(self.root):
+            return len(self)
+        node = self.root
+        offset = 0
+        while node is not None:
+            left_lines = _lines(node.left)
+            if line <= left_lines:
+                node = node.left
+                continue
+            line -= left_lines
+            offset += _size(node.left)
+            if line <= node.newlines:
+                return offset + node.buffer.line_end(node.start, line) - node.start
+            line -= node.newlines
+            offset += node.length
+            node = node.right
+        return offset
+
+    def iter_chunks(self, start=0, end=None):
+        if end is None:
+            end = len(self)
+        if start >= end:
+            return
+        yield from self._iter(self.root, start, end, 0)
+
+    def _iter(self, node, start, end, base):
+        if node is None:
+            return
+        left_size = _size(node.left)
+        if start < base + left_size:
+            yield from self._iter(node.left, start, end, base)
+        piece_base = base + left_size
+        lo = max(start, piece_base)
+        hi = min(end, piece_base + node.length)
+        data = node.buffer.data
+        while lo < hi:
+            step = min(hi - lo, self.CHUNK_SIZE)
+            offset = node.start + lo - piece_base
+            yield data[offset : offset + step]
+            lo += step
+        right_base = piece_base + node.length
+        if end > right_base:
+            yield from self._iter(node.right, start, end, right_base)
+
+    def read(self, start=0, end=None):
+        return b"".join(bytes(chunk) for chunk in self.iter_chunks(start, end))
+
+    def snapshot(self):
+        return [(node.buffer.data, node.start, node.length) for node in self.pieces()]
+
+    def pieces(self):
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+
+def iter_snapshot(snapshot, chunk_size=PieceTable.CHUNK_SIZE):
+    # Buffers are append-only, so a snapshot stays valid while editing goes on.
+    for data, start, length in snapshot:
+        end = start + length
+        while start < end:
+            step = min(end - start, chunk_size)
+            yield data[start : start + step]
+            start += step
+
+
+def span_bytes(spans):
+    return b"".join(
+        bytes(buffer.data[start : start + length]) for buffer, start, length in spans
+    )
+
+
+def layout_of(snapshot):
+    layout = []
+    offset = 0
+    for data, start, length in snapshot:
+        layout.append((offset, data, start, length))
+        offset += length
+    return layout
+
+
+def dirty_ranges(old, new):
+    # Byte ranges of the new layout whose content is not known to sit at the
+    # same offset in the old one, merged and in ascending order.
+    ranges = []
+
+    def mark(start, end):
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+
+    i = 0
+    for start, data, data_start, length in new:
+        end = start + length
+        while i < len(old) and old[i][0] + old[i][3] <= start:
+            i += 1
+        position = start
+        j = i
+        while position < end:
+            if j >= len(old) or old[j][0] >= end:
+                mark(position, end)
+                break
+            old_start, old_data, old_data_start, old_length = old[j]
+            if old_start > position:
+                mark(position, old_start)
+                position = old_start
+            stop = min(end, old_start + old_length)
+            same = old_data is data and (
+                old_data_start - old_start == data_start - start
+            )
+            if not same:
+                mark(position, stop)
+            position = stop
+            j += 1
+    return [tuple(r) for r in ranges]
+
+
+def iter_ranges(layout, ranges, chunk_size=PieceTable.CHUNK_SIZE):
+    # Yields (offset, bytes) for each sorted range, sweeping the layout once.
+    i = 0
+    for start, end in ranges:
+        while i < len(layout) and layout[i][0] + layout[i][3] <= start:
+            i += 1
+        j = i
+        while j < len(layout) and layout[j][0] < end:
+            offset, data, data_start, length = layout[j]
+            lo = max(start, offset)
+            hi = min(end, offset + length)
+            while lo < hi:
+                step = min(hi - lo, chunk_size)
+                position = data_start + lo - offset
+                yield lo, data[position : position + step]
+                lo += step
+            j += 1
@@ -0,0 +1,54 @@
+import threading
+from array import array
+
+
+class RingBuffer:
+    def __init__(self, capacity, typecode="d"):
+        self.capacity = capacity
+        self.data = array(typecode, [0]) * capacity
+        self.start = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+        end = (self.start + self.count) % self.capacity
+        self.data[end] = value
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def values(self):
+        end = self.start + self.count
+        if end <= self.capacity:
+            return self.data[self.start : end]
+        return self.data[self.start :] + self.data[: end - self.capacity]
+
+    def latest(self, default=0.0):
+        if not self.count:
+            return default
+        return self.data[(self.start + self.count - 1) % self.capacity]
+
+
+class History:
+    # Every series is allocated up front and written on every record(), so
+    # index i of each series always refers to the same sample.
+    def __init__(self, capacity, names):
+        self.capacity = capacity
+        self.series = {name: RingBuffer(capacity) for name in names}
+        self.lock = threading.Lock()
+
+    def record(self, values):
+        with self.lock:
+            for name, buffer in self.series.items():
+                buffer.append(values.get(name, 0.0))
+
+    def values(self, name):
+        with self.lock:
+            buffer = self.series.get(name)
+            return buffer.values() if buffer is not None else array("d")
+
+    def names(self):
+        return list(self.series)
@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+import psutil
+from core.ring_buffer import History
+
+
+class Sample:
+    __slots__ = ("timestamp", "cpu_percent", "ram_percent", "ram_used", "ram_total")
+
+    def __init__(self, timestamp, cpu_percent, ram_percent, ram_used, ram_total):
+        self.timestamp = timestamp
+        self.cpu_percent = cpu_percent
+        self.ram_percent = ram_percent
+        self.ram_used = ram_used
+        self.ram_total = ram_total
+
+
+class ResourceSampler:
+    FIRST_INTERVAL = 0.1
+    HISTORY_SIZE = 120
+
+    def __init__(self, interval=1.0, history_size=HISTORY_SIZE):
+        self.interval = interval
+        self.latest = None
+        self.cores = psutil.cpu_count() or 1
+        self.history = History(history_size, self.series_names(self.cores))
+        self.process = psutil.Process(os.getpid())
+        self._disk = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def series_names(cores):
+        names = ["cpu", "ram", "rss", "disk_read", "disk_write"]
+        return names + [f"cpu{number}" for number in range(cores)]
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run, name="resource-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def run(self):
+        # cpu_percent(interval=...) sleeps for the whole interval, which is
+        # only acceptable because this never runs on the Tk thread.
+        interval = self.FIRST_INTERVAL
+        while not self._stop.is_set():
+            cores = psutil.cpu_percent(interval=interval, percpu=True)
+            self.record(cores, interval)
+            interval = self.interval
+
+    def record(self, cores, elapsed):
+        cpu = sum(cores) / len(cores) if cores else 0.0
+        ram = psutil.virtual_memory()
+        values = {"cpu": cpu, "ram": ram.percent, "rss": self.process.memory_info().rss}
+        for number, percent in enumerate(cores):
+            values[f"cpu{number}"] = percent
+
+        disk = psutil.disk_io_counters()
+        if disk is not None and self._disk is not None:
+            values["disk_read"] = (disk.read_bytes - self._disk.read_bytes) / elapsed
+            values["disk_write"] = (disk.write_bytes - self._disk.write_bytes) / elapsed
+        else:
+            # No earlier counters to diff against; record an idle sample so
+            # the disk series stay aligned with the others.
+            values["disk_read"] = values["disk_write"] = 0.0
+        self._disk = disk
+
+        self.history.record(values)
+        # A single attribute store, so readers always see a whole sample.
+        self.latest = Sample(time.time(), cpu, ram.percent, ram.used, ram.total)
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
@@ -0,0 +1,114 @@
+import os
+import stat
+import tempfile
+import time
+
+WRITE_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def _read_umask():
+    # os.umask can only be read by setting it, which is process-wide; do it
+    # once at import, before any I/O worker threads exist.
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+UMASK = _read_umask()
+
+
+class SaveStats:
+    def __init__(self, bytes_written, seconds):
+        self.bytes_written = bytes_written
+        self.seconds = seconds
+
+    @property
+    def megabytes(self):
+        return self.bytes_written / (1024 * 1024)
+
+    @property
+    def throughput(self):
+        return self.megabytes / self.seconds if self.seconds > 0 else float("inf")
+
+
+def coalesce(chunks, chunk_size=WRITE_CHUNK_SIZE):
+    pending = bytearray()
+    for chunk in chunks:
+        if not pending and len(chunk) == chunk_size:
+            yield chunk
+            continue
+        pending += chunk
+        while len(pending) >= chunk_size:
+            yield bytes(pending[:chunk_size])
+            del pending[:chunk_size]
+    if pending:
+        yield bytes(pending)
+
+
+def fsync_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened for syncing on every platform.
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def copy_mode(path, temp_path):
+    if os.path.exists(path):
+        os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+    else:
+        os.chmod(temp_path, 0o666 & ~UMASK)
+
+
+def atomic_write(path, chunks, task=None, chunk_size=WRITE_CHUNK_SIZE):
+    # Written beside the target and renamed over it, so a crash, failure or
+    # cancellation leaves either the old or the new file, never a truncated
+    # one. The document may also still be reading from a mapping of the old.
+    started = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    written = 0
+    try:
+        with os.fdopen(fd, "wb", buffering=0) as file:
+            for chunk in coalesce(chunks, chunk_size):
+                view = memoryview(chunk)
+                while view:
+                    count = file.write(view)
+                    view = view[count:]
+                written += len(chunk)
+                if task is not None:
+                    task.advance(len(chunk))
+            os.fsync(file.fileno())
+        copy_mode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    fsync_directory(directory)
+    return SaveStats(written, time.perf_counter() - started)
+
+
+def patch_in_place(path, writes, size):
+    # Not atomic: only used for edits small enough that the window for a
+    # torn write is a few pwrite calls, never for restructuring the file.
+    started = time.perf_counter()
+    written = 0
+    fd = os.open(path, os.O_WRONLY)
+    try:
+        for offset, chunk in writes:
+            view = memoryview(chunk)
+            while view:
+                count = os.pwrite(fd, view, offset)
+                view = view[count:]
+                offset += count
+            written += len(chunk)
+        os.ftruncate(fd, size)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return SaveStats(written, time.perf_counter() - started)
@@ -0,0 +1,146 @@
+import codecs
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from core.piece_table import iter_snapshot
+
+BLOCK_SIZE = 1024 * 1024
+NEWLINE = re.compile("\n")
+# Longest regex match looked for within a single line that spans blocks;
+# literal matches are never longer than the pattern.
+MAX_MATCH_CHARS = 64 * 1024
+
+
+class SearchQuery:
+    def __init__(self, pattern, regex=False, match_case=True):
+        self.pattern = pattern
+        self.regex = regex
+        self.match_case = match_case
+        flags = 0 if match_case else re.IGNORECASE
+        self.compiled = re.compile(pattern if regex else re.escape(pattern), flags)
+
+    @property
+    def window(self):
+        # Characters a match can cover, and so have to be carried over when
+        # a line goes on past the end of a block.
+        return MAX_MATCH_CHARS if self.regex else len(self.pattern)
+
+    def replace_all(self, text, replacement):
+        if not self.regex:
+            # A literal replacement must not expand \1 or \g<name>.
+            return self.compiled.subn(lambda match: replacement, text)
+        return self.compiled.subn(replacement, text)
+
+
+class SearchResult:
+    # Matches as parallel arrays of (line, column, length), in document
+    # order. The worker appends while the Tk thread reads the count.
+    def __init__(self, version=None):
+        self.version = version
+        self.lines = array("Q")
+        self.columns = array("Q")
+        self.lengths = array("Q")
+        self.complete = False
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __getitem__(self, i):
+        return self.lines[i], self.columns[i], self.lengths[i]
+
+    def add(self, line, column, length):
+        # Columns and lengths first: a match only counts once its line is in.
+        self.columns.append(column)
+        self.lengths.append(length)
+        self.lines.append(line)
+
+    def next_after(self, line, column):
+        # Index of the first match starting after (line, column), wrapping.
+        count = len(self)
+        if not count:
+            return None
+        lines = self.lines
+        i = bisect_left(lines, line, 0, count)
+        end = bisect_right(lines, line, i, count)
+        while i < end and self.columns[i] <= column:
+            i += 1
+        return i if i < count else 0
+
+    def previous_before(self, line, column):
+        count = len(self)
+        if not count:
+            return None
+        lines = self.lines
+        start = bisect_left(lines, line, 0, count)
+        i = bisect_right(lines, line, start, count) - 1
+        while i >= start and self.columns[i] >= column:
+            i -= 1
+        return i if i >= 0 else count - 1
+
+
+def scan_block(block, first_line, first_column, query, result, end=None):
+    # Adds the matches starting before end, by default all of them, and
+    # returns where the search should go on from. The block starts at
+    # (first_line, first_column); line starts within it are only worked out
+    # once it has a match.
+    end = len(block) if end is None else end
+    resume = end
+    starts = None
+    for match in query.compiled.finditer(block):
+        start, stop = match.span()
+        if start >= end:
+            break
+        if start == stop:
+            continue
+        if starts is None:
+            starts = array("Q", [0])
+            starts.extend(newline.end() for newline in NEWLINE.finditer(block))
+        i = bisect_right(starts, start) - 1
+        column = start - starts[i] + (first_column if not i else 0)
+        result.add(first_line + i, column, stop - start)
+        resume = max(resume, stop)
+    return resume
+
+
+def advance(text, end, line, column):
+    # (line, column) just after text[:end], which starts at (line, column).
+    newlines = text.count("\n", 0, end)
+    if not newlines:
+        return line, column + end
+    return line + newlines, end - text.rfind("\n", 0, end) - 1
+
+
+def search(snapshot, query, encoding="utf-8", result=None, task=None):
+    # Decodes the snapshot block by block and searches whole lines at a
+    # time. A line running past the end of a block is carried over only as
+    # far back as the query's window, so one long line stays linear.
+    if result is None:
+        result = SearchResult()
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    window = query.window
+    pending = ""
+    line = column = 0
+    for chunk in iter_snapshot(snapshot, BLOCK_SIZE):
+        text = pending + decoder.decode(chunk)
+        end = max(text.rfind("\n") + 1, len(text) - window)
+        resume = scan_block(text, line, column, query, result, end)
+        line, column = advance(text, resume, line, column)
+        pending = text[resume:]
+        if task is not None:
+            task.advance(len(chunk))
+    text = pending + decoder.decode(b"", final=True)
+    scan_block(text, line, column, query, result)
+    result.complete = True
+    return result
+
+
+def replace_all(snapshot, query, replacement, encoding="utf-8", task=None):
+    # Builds the whole replaced text so the widget can swap it in with one
+    # edit, instead of one edit per match.
+    chunks = []
+    for chunk in iter_snapshot(snapshot, BLOCK_SIZE):
+        chunks.append(chunk)
+        if task is not None:
+            task.advance(len(chunk))
+    text = b"".join(chunks).decode(encoding, errors="replace")
+    return query.replace_all(text, replacement)
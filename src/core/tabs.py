@@ -0,0 +1,92 @@
+import os
+from collections import OrderedDict
+
+DEFAULT_LIVE_TABS = 4
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+
+class TabSet:
+    # Tabs in display order, plus a least-recently-used order that decides
+    # which tabs lose their widget and which unmodified buffers are dropped
+    # (to be re-read from disk) once the limits are exceeded. Tabs need
+    # path, live, pinned, droppable and resident_bytes attributes.
+    def __init__(
+        self, live_limit=DEFAULT_LIVE_TABS, memory_budget=DEFAULT_MEMORY_BUDGET
+    ):
+        self.live_limit = live_limit
+        self.memory_budget = memory_budget
+        self.tabs = []
+        self.recent = OrderedDict()
+        self.active = None
+
+    def __len__(self):
+        return len(self.tabs)
+
+    def __iter__(self):
+        return iter(self.tabs)
+
+    def add(self, tab):
+        # New tabs open next to the active one.
+        if self.active is None:
+            self.tabs.append(tab)
+        else:
+            self.tabs.insert(self.tabs.index(self.active) + 1, tab)
+        self.recent[id(tab)] = tab
+        self.recent.move_to_end(id(tab), last=False)
+        return tab
+
+    def remove(self, tab):
+        # Returns the tab to show instead when the active one is removed.
+        i = self.tabs.index(tab)
+        self.tabs.remove(tab)
+        del self.recent[id(tab)]
+        if tab is not self.active:
+            return None
+        self.active = None
+        if not self.tabs:
+            return None
+        return self.tabs[min(i, len(self.tabs) - 1)]
+
+    def activate(self, tab):
+        self.active = tab
+        self.recent.move_to_end(id(tab))
+
+    def neighbour(self, step):
+        if not self.tabs:
+            return None
+        i = self.tabs.index(self.active) if self.active in self.tabs else 0
+        return self.tabs[(i + step) % len(self.tabs)]
+
+    def find(self, path):
+        path = os.path.abspath(path)
+        for tab in self.tabs:
+            if tab.path is not None and os.path.abspath(tab.path) == path:
+                return tab
+        return None
+
+    def least_recent(self):
+        return [tab for tab in self.recent.values() if tab is not self.active]
+
+    def widgets_to_release(self):
+        live = [tab for tab in self.recent.values() if tab.live]
+        excess = len(live) - self.live_limit
+        if excess <= 0:
+            return []
+        releasable = [
+            tab for tab in live if tab is not self.active and not tab.pinned
+        ]
+        return releasable[:excess]
+
+    def resident_bytes(self):
+        return sum(tab.resident_bytes for tab in self.tabs)
+
+    def buffers_to_drop(self):
+        excess = self.resident_bytes() - self.memory_budget
+        dropped = []
+        for tab in self.least_recent():
+            if excess <= 0:
+                break
+            if tab.droppable:
+                dropped.append(tab)
+                excess -= tab.resident_bytes
+        return dropped
@@ -0,0 +1,157 @@
+import codecs
+import io
+from core.io_worker import CHUNK_SIZE
+
+# Checked in this order: the UTF-32 LE mark starts with the UTF-16 LE one.
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+BOM_OF = {encoding: bom for bom, encoding in BOMS}
+NEWLINE_NAMES = {"\n": "LF", "\r\n": "CRLF", "\r": "CR"}
+NEWLINES = {name: newline for newline, name in NEWLINE_NAMES.items()}
+# Encodings whose newline byte is always a line break, so the raw bytes of
+# a file can be indexed and edited without transcoding.
+ASCII_COMPATIBLE = ("utf-8", "cp1252", "latin-1")
+# The format is sniffed from at least this much of the start of a file.
+SNIFF_BYTES = 4 * 1024
+
+
+class TextFormat:
+    def __init__(self, encoding="utf-8", bom=b"", newline="\n"):
+        self.encoding = encoding
+        self.bom = bom
+        self.newline = newline
+
+    @property
+    def native(self):
+        # Documents hold UTF-8 with "\n" line ends; files in exactly that
+        # format are written back byte for byte.
+        return self.encoding == "utf-8" and not self.bom and self.newline == "\n"
+
+    @property
+    def label(self):
+        bom = " BOM" if self.bom else ""
+        return f"{self.encoding}{bom} {NEWLINE_NAMES[self.newline]}"
+
+    @classmethod
+    def from_label(cls, label):
+        encoding, *flags, newline = label.split()
+        bom = BOM_OF[encoding] if "BOM" in flags else b""
+        return cls(encoding, bom, NEWLINES[newline])
+
+    def __eq__(self, other):
+        return isinstance(other, TextFormat) and self.label == other.label
+
+    def __repr__(self):
+        return f"TextFormat({self.label!r})"
+
+
+NATIVE = TextFormat()
+
+
+def sniff_encoding(head):
+    # UTF-16 without a mark: mostly ASCII text has a zero in every other
+    # byte, which is also valid UTF-8 and so is checked first.
+    quarter = len(head) // 4
+    if head[1::2].count(0) > quarter and not head[0::2].count(0):
+        return "utf-16-le"
+    if head[0::2].count(0) > quarter and not head[1::2].count(0):
+        return "utf-16-be"
+    try:
+        # Not final: the head may end partway through a character.
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        head.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def sniff_newline(text):
+    crlf = text.count("\r\n")
+    counts = {
+        "\n": text.count("\n") - crlf,
+        "\r\n": crlf,
+        "\r": text.count("\r") - crlf,
+    }
+    # The most common line end wins; a file without any gets "\n".
+    return max(counts, key=lambda newline: (counts[newline], newline == "\n"))
+
+
+def sniff(head):
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            break
+    else:
+        bom, encoding = b"", sniff_encoding(head)
+    text = head[len(bom) :].decode(encoding, errors="replace")
+    return TextFormat(encoding, bom, sniff_newline(text))
+
+
+def decoder(text_format):
+    # Also turns "\r\n" and "\r" into "\n", holding back a "\r" that ends a
+    # chunk until the next one shows whether a "\n" follows.
+    return io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder(text_format.encoding)(), translate=True
+    )
+
+
+def decode_chunks(head, file, text_format, task=None, chunk_size=CHUNK_SIZE):
+    decode = decoder(text_format).decode
+    parts = [decode(head[len(text_format.bom) :])]
+    if task is not None:
+        task.advance(len(head))
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        parts.append(decode(chunk))
+        if task is not None:
+            task.advance(len(chunk))
+    parts.append(decode(b"", final=True))
+    return "".join(parts)
+
+
+def read_text(path, task=None, chunk_size=CHUNK_SIZE):
+    # Returns (text, format). The format is sniffed from the first chunk,
+    # which is then decoded with the rest in the same pass.
+    with open(path, "rb") as file:
+        head = file.read(max(chunk_size, SNIFF_BYTES))
+        text_format = sniff(head)
+        try:
+            return decode_chunks(head, file, text_format, task, chunk_size), text_format
+        except UnicodeDecodeError:
+            if text_format.bom:
+                raise
+        # Text past the first chunk that is not in the sniffed encoding;
+        # every byte sequence is valid Latin-1, so the file is read again as
+        # that rather than refused.
+        text_format = TextFormat("latin-1", b"", text_format.newline)
+        file.seek(0)
+        head = file.read(max(chunk_size, SNIFF_BYTES))
+        return decode_chunks(head, file, text_format, None, chunk_size), text_format
+
+
+def encode_chunks(chunks, text_format):
+    # Document bytes back to the file's own encoding and line ends.
+    if text_format.native:
+        yield from chunks
+        return
+    decode = codecs.getincrementaldecoder("utf-8")().decode
+    encode = codecs.getincrementalencoder(text_format.encoding)().encode
+    newline = text_format.newline
+    if text_format.bom:
+        yield text_format.bom
+    for chunk in chunks:
+        text = decode(chunk)
+        if newline != "\n":
+            text = text.replace("\n", newline)
+        yield encode(text)
+    yield encode(decode(b"", final=True), final=True)
@@ -0,0 +1,193 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# History memory is estimated per step and per span: the text itself stays
+# in the piece table's buffers, which are append-only and kept anyway, so a
+# step only holds references into them.
+STEP_COST = 120
+SPAN_COST = 80
+DEFAULT_UNDO_MEMORY = 4 * 1024 * 1024
+# Keystrokes further apart than this start a new step.
+COALESCE_SECONDS = 2.0
+# Backspace and Delete remove one character, at most four bytes in UTF-8.
+MAX_CHAR_BYTES = 4
+
+
+def span_length(spans):
+    return sum(length for _, _, length in spans)
+
+
+def is_word(char):
+    return char.isalnum() or char == "_"
+
+
+class Delta:
+    __slots__ = ("offset", "removed", "inserted")
+
+    def __init__(self, offset, removed, inserted):
+        self.offset = offset
+        # (buffer, start, length) spans of the bytes replaced and put there.
+        self.removed = removed
+        self.inserted = inserted
+
+
+class UndoHistory:
+    # Steps are lists of deltas; undoing one replays them backwards through
+    # splice(offset, length, spans), which must not record anything itself.
+    def __init__(self, limit=DEFAULT_UNDO_MEMORY):
+        self.limit = limit
+        self.undo_steps = deque()
+        self.redo_steps = []
+        self.size = 0
+        self.depth = 0
+        self.pending = None
+        # (kind, last character, time) while typing may extend the last step.
+        self.typing = None
+
+    def __len__(self):
+        return len(self.undo_steps)
+
+    @staticmethod
+    def cost(step):
+        spans = sum(len(delta.removed) + len(delta.inserted) for delta in step)
+        return STEP_COST + SPAN_COST * spans
+
+    @contextmanager
+    def group(self):
+        # Everything recorded inside becomes one step, e.g. Replace All.
+        if not self.depth:
+            self.pending = []
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            if not self.depth:
+                step, self.pending = self.pending, None
+                if step:
+                    self.push(step)
+
+    def inserted(self, offset, span, text):
+        now = time.monotonic()
+        if self.depth:
+            last = self.pending[-1] if self.pending else None
+            if last is not None and not last.inserted and last.offset == offset:
+                last.inserted = [span]
+            else:
+                self.pending.append(Delta(offset, [], [span]))
+            return
+        if len(text) != 1 or text == "\n":
+            self.push([Delta(offset, [], [span])])
+            return
+        if not self.extend_typing(offset, span, text, now):
+            self.push([Delta(offset, [], [span])])
+        self.typing = ("insert", text, now)
+
+    def extend_typing(self, offset, span, text, now):
+        if not self.continues("insert", now):
+            return False
+        # A word character after anything else starts a new word.
+        if is_word(text) and not is_word(self.typing[1]):
+            return False
+        delta = self.undo_steps[-1][0]
+        if delta.offset + span_length(delta.inserted) != offset:
+            return False
+        buffer, start, length = delta.inserted[-1]
+        if buffer is span[0] and start + length == span[1]:
+            delta.inserted[-1] = (buffer, start, length + span[2])
+        else:
+            delta.inserted.append(span)
+            self.size += SPAN_COST
+        return True
+
+    def deleted(self, offset, spans):
+        now = time.monotonic()
+        if self.depth:
+            self.pending.append(Delta(offset, spans, []))
+            return
+        if span_length(spans) > MAX_CHAR_BYTES:
+            self.push([Delta(offset, spans, [])])
+            return
+        if not self.extend_deletes(offset, spans, now):
+            self.push([Delta(offset, spans, [])])
+        self.typing = ("delete", "", now)
+
+    def extend_deletes(self, offset, spans, now):
+        if not self.continues("delete", now):
+            return False
+        delta = self.undo_steps[-1][0]
+        if offset + span_length(spans) == delta.offset:
+            delta.removed[:0] = spans
+            delta.offset = offset
+        elif offset == delta.offset:
+            delta.removed.extend(spans)
+        else:
+            return False
+        self.size += SPAN_COST * len(spans)
+        return True
+
+    def continues(self, kind, now):
+        return (
+            self.typing is not None
+            and self.typing[0] == kind
+            and now - self.typing[2] <= COALESCE_SECONDS
+            and bool(self.undo_steps)
+        )
+
+    def push(self, step):
+        self.size -= sum(self.cost(redo) for redo in self.redo_steps)
+        self.redo_steps.clear()
+        self.undo_steps.append(step)
+        self.size += self.cost(step)
+        self.typing = None
+        self.trim()
+
+    def trim(self):
+        # Oldest first; the newest step is kept whatever it costs.
+        while self.size > self.limit and len(self.undo_steps) > 1:
+            self.size -= self.cost(self.undo_steps.popleft())
+
+    def deltas(self):
+        steps = list(self.undo_steps) + self.redo_steps
+        if self.pending:
+            steps.append(self.pending)
+        for step in steps:
+            yield from step
+
+    def spans(self):
+        # Every span a step could put back or take away.
+        for delta in self.deltas():
+            yield from delta.removed
+            yield from delta.inserted
+
+    def replace_spans(self, replacements):
+        for delta in self.deltas():
+            delta.removed = [replacements.get(span, span) for span in delta.removed]
+            delta.inserted = [replacements.get(span, span) for span in delta.inserted]
+
+    def clear(self):
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+        self.size = 0
+        self.typing = None
+
+    def undo(self, splice):
+        if not self.undo_steps:
+            return False
+        self.typing = None
+        step = self.undo_steps.pop()
+        for delta in reversed(step):
+            splice(delta.offset, span_length(delta.inserted), delta.removed)
+        self.redo_steps.append(step)
+        return True
+
+    def redo(self, splice):
+        if not self.redo_steps:
+            return False
+        self.typing = None
+        step = self.redo_steps.pop()
+        for delta in step:
+            splice(delta.offset, span_length(delta.removed), delta.inserted)
+        self.undo_steps.append(step)
+        return True
@@ -1,53 +1,358 @@
+import csv
+import os
 import sqlite3
-import hashlib
+import threading
+from core.metrics import PROBES
+from db.passwords import PasswordHasher, ReauthTokens, legacy_hash
+
+MIGRATIONS = (
+    (
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ),
+    (
+        # Unsaved edits, replayed after a crash: each document row holds a
+        # base (a compaction snapshot, or the file on disk identified by
+        # size and mtime) and journal_edits the deltas applied on top.
+        """
+        CREATE TABLE IF NOT EXISTS journal_documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            session TEXT NOT NULL,
+            path TEXT,
+            encoding TEXT NOT NULL,
+            base_size INTEGER,
+            base_mtime_ns INTEGER,
+            snapshot BLOB,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS journal_documents_username
+        ON journal_documents (username)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS journal_edits (
+            document_id INTEGER NOT NULL
+                REFERENCES journal_documents (id) ON DELETE CASCADE,
+            seq INTEGER NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            data BLOB,
+            PRIMARY KEY (document_id, seq)
+        ) WITHOUT ROWID
+        """,
+    ),
+    (
+        # Saved file versions as content-defined chunks, stored once per
+        # hash. A version's manifest lists the chunks that hold its list of
+        # chunk hashes, so unchanged stretches of that list dedupe as well.
+        """
+        CREATE TABLE IF NOT EXISTS history_chunks (
+            hash BLOB PRIMARY KEY,
+            size INTEGER NOT NULL,
+            lines INTEGER NOT NULL,
+            data BLOB NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS history_versions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT NOT NULL,
+            username TEXT,
+            size INTEGER NOT NULL,
+            manifest BLOB NOT NULL,
+            added_bytes INTEGER NOT NULL,
+            seconds REAL NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS history_versions_path
+        ON history_versions (path)
+        """,
+    ),
+    (
+        """
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            username TEXT PRIMARY KEY,
+            geometry TEXT,
+            active INTEGER,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS session_tabs (
+            username TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            path TEXT NOT NULL,
+            top REAL,
+            cursor TEXT,
+            PRIMARY KEY (username, position)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS recent_files (
+            username TEXT NOT NULL,
+            path TEXT NOT NULL,
+            opened_at REAL NOT NULL,
+            PRIMARY KEY (username, path)
+        )
+        """,
+        # Line offsets of large files, reused while the fingerprint matches.
+        """
+        CREATE TABLE IF NOT EXISTS line_index_cache (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            digest BLOB NOT NULL,
+            offsets BLOB NOT NULL,
+            used_at REAL NOT NULL
+        )
+        """,
+    ),
+    # Encoding and line ends of the file, as TextFormat.label.
+    ("ALTER TABLE journal_documents ADD COLUMN text_format TEXT",),
+)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA foreign_keys = ON",
+)
+
+INSERT_USER = "INSERT INTO users (username, password_hash) VALUES (?, ?)"
+SELECT_USER = "SELECT id, password_hash FROM users WHERE username = ?"
+UPDATE_PASSWORD = "UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?"
+
+BULK_BATCH_SIZE = 500
+# Stays under SQLite's historical 999 bound-parameter limit.
+MAX_QUERY_PARAMETERS = 900
+
+
+class BulkResult:
+    def __init__(self):
+        self.created = 0
+        # (row number, username, reason) for every row that was not created.
+        self.conflicts = []
+
+    def __repr__(self):
+        return f"BulkResult(created={self.created}, conflicts={len(self.conflicts)})"
+
+
+def read_user_rows(source):
+    # Yields (row number, row); CSV rows are numbered by their source line.
+    if not hasattr(source, "read"):
+        yield from enumerate(source, 1)
+        return
+    reader = csv.reader(source)
+    for row in reader:
+        if reader.line_num == 1 and [cell.strip().lower() for cell in row] == [
+            "username",
+            "password",
+        ]:
+            continue
+        yield reader.line_num, row
+
+
+def batched(rows, size):
+    batch = []
+    for entry in rows:
+        batch.append(entry)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+DEFAULT_DB_NAME = "file_editor.db"
 
 
 class Database:
-    def __init__(self, db_name="file_editor.db"):
+    def __init__(self, db_name=DEFAULT_DB_NAME, hasher=None, reauth_seconds=0):
         self.db_name = db_name
+        self.hasher = hasher or PasswordHasher()
+        self.tokens = ReauthTokens(reauth_seconds)
+        self._dummy_hash = None
+        self.lock = threading.RLock()
+        # One connection for the object's lifetime, shared across threads
+        # under self.lock; sqlite3 keeps prepared statements cached per
+        # connection, keyed by SQL text.
+        self.conn = sqlite3.connect(
+            db_name, check_same_thread=False, cached_statements=64
+        )
+        for pragma in PRAGMAS:
+            self.conn.execute(pragma)
         self.init_db()
 
     def init_db(self):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.commit()
-        conn.close()
+        with self.lock:
+            (version,) = self.conn.execute("PRAGMA user_version").fetchone()
+            if version >= SCHEMA_VERSION:
+                return
+            with self.conn:
+                for statements in MIGRATIONS[version:]:
+                    for sql in statements:
+                        self.conn.execute(sql)
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
     def hash_password(self, password: str):
-        return hashlib.sha256(password.encode()).hexdigest()
+        # Legacy unsalted format, only used to verify rows written before
+        # the switch to scrypt.
+        return legacy_hash(password)
 
+    @PROBES.timed("db.create_user")
     def create_user(self, username, password):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        try:
-            password_hash = self.hash_password(password)
-            cursor.execute(
-                "INSERT INTO users (username, password_hash) VALUES (?, ?)",
-                (username, password_hash),
+        password_hash = self.hasher.hash(password)
+        with self.lock:
+            try:
+                with self.conn:
+                    self.conn.execute(INSERT_USER, (username, password_hash))
+                return True
+            except sqlite3.IntegrityError:
+                return False
+
+    def existing_usernames(self, usernames):
+        usernames = list(usernames)
+        existing = set()
+        for start in range(0, len(usernames), MAX_QUERY_PARAMETERS):
+            chunk = usernames[start : start + MAX_QUERY_PARAMETERS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT username FROM users WHERE username IN ({placeholders})",
+                chunk,
             )
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            return False
+            existing.update(username for (username,) in rows)
+        return existing
+
+    def create_users_bulk(self, source, batch_size=BULK_BATCH_SIZE, workers=None):
+        result = BulkResult()
+        seen = set()
+        workers = workers or os.cpu_count() or 1
+        executor = None
+        if workers > 1:
+            # Imported here: multiprocessing is slow to load and only bulk
+            # provisioning needs it.
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(workers)
+        try:
+            for batch in batched(read_user_rows(source), batch_size):
+                pending = []
+                for number, row in batch:
+                    if len(row) != 2 or not row[0].strip() or not row[1]:
+                        username = row[0] if row else ""
+                        result.conflicts.append((number, username, "invalid"))
+                        continue
+                    username = row[0].strip()
+                    if username in seen:
+                        result.conflicts.append(
+                            (number, username, "duplicate in input")
+                        )
+                        continue
+                    seen.add(username)
+                    pending.append((number, username, row[1]))
+                if not pending:
+                    continue
+
+                with self.lock:
+                    existing = self.existing_usernames(u for _, u, _ in pending)
+                for number, username, _ in pending:
+                    if username in existing:
+                        result.conflicts.append((number, username, "exists"))
+                pending = [entry for entry in pending if entry[1] not in existing]
+
+                passwords = [password for _, _, password in pending]
+                if executor is not None:
+                    chunksize = max(1, len(passwords) // (workers * 4))
+                    hashes = list(
+                        executor.map(self.hasher.hash, passwords, chunksize=chunksize)
+                    )
+                else:
+                    hashes = [self.hasher.hash(password) for password in passwords]
+
+                with self.lock:
+                    # IMMEDIATE takes the write lock before re-checking, so
+                    # another process can't slip the same username in between.
+                    self.conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        existing = self.existing_usernames(u for _, u, _ in pending)
+                        rows = []
+                        for entry, password_hash in zip(pending, hashes):
+                            number, username, _ = entry
+                            if username in existing:
+                                result.conflicts.append((number, username, "exists"))
+                            else:
+                                rows.append((username, password_hash))
+                        self.conn.executemany(INSERT_USER, rows)
+                        self.conn.execute("COMMIT")
+                    except BaseException:
+                        self.conn.execute("ROLLBACK")
+                        raise
+                    result.created += len(rows)
         finally:
-            conn.close()
+            if executor is not None:
+                executor.shutdown()
+        result.conflicts.sort()
+        return result
 
+    @PROBES.timed("db.authenticate_user")
     def authenticate_user(self, username, password):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        password_hash = self.hash_password(password)
-        cursor.execute(
-            "SELECT id FROM users WHERE username = ? AND password_hash = ?",
-            (username, password_hash),
-        )
-        result = cursor.fetchone()
-        conn.close()
-        return result is not None
+        if self.tokens.check(username, password):
+            return True
+        # The KDF runs outside the lock so other threads keep using the
+        # connection while a login is being verified.
+        with self.lock:
+            row = self.conn.execute(SELECT_USER, (username,)).fetchone()
+
+        if row is None:
+            # Spend the same time as a real check so usernames can't be probed.
+            if self._dummy_hash is None:
+                self._dummy_hash = self.hasher.hash("")
+            self.hasher.verify(password, self._dummy_hash)
+            return False
+
+        user_id, stored = row
+        if not self.hasher.verify(password, stored):
+            return False
+
+        if self.hasher.needs_rehash(stored):
+            upgraded = self.hasher.hash(password)
+            with self.lock, self.conn:
+                self.conn.execute(UPDATE_PASSWORD, (upgraded, user_id, stored))
+        self.tokens.issue(username, password)
+        return True
+
+    def close(self):
+        with _handles_lock:
+            if _handles.get(os.path.abspath(self.db_name)) is self:
+                del _handles[os.path.abspath(self.db_name)]
+        with self.lock:
+            self.conn.close()
+
+
+# Process-wide handles by database path, so every window and every login
+# shares one connection and the schema is checked once per process.
+_handles = {}
+_handles_lock = threading.Lock()
+
+
+def open_database(db_name=DEFAULT_DB_NAME, hasher=None, reauth_seconds=0):
+    # Settings only apply to the call that opens the handle.
+    with _handles_lock:
+        db = _handles.get(os.path.abspath(db_name))
+        if db is None:
+            db = Database(db_name, hasher, reauth_seconds)
+            _handles[os.path.abspath(db_name)] = db
+        return db
@@ -0,0 +1,234 @@
+import difflib
+import mmap
+import os
+import re
+import zlib
+from time import perf_counter
+from core.chunking import DIGEST_SIZE, chunks, digest
+from core.save import atomic_write
+from db.db import MAX_QUERY_PARAMETERS
+
+# New chunks are checked and written per batch of this many bytes, so the
+# database lock is never held for a whole large file.
+STORE_BATCH_BYTES = 4 * 1024 * 1024
+# Manifest pieces end after a hash whose first byte is below this, about
+# one in 64, so a small edit rewrites only a piece of about 1 KB.
+MANIFEST_CUT = 4
+MANIFEST_MAX_ENTRIES = 1024
+HUNK = re.compile(r"^@@ -(\d+)((?:,\d+)?) \+(\d+)((?:,\d+)?) @@")
+
+INSERT_CHUNK = "INSERT OR IGNORE INTO history_chunks VALUES (?, ?, ?, ?)"
+SELECT_CHUNK = "SELECT data FROM history_chunks WHERE hash = ?"
+
+
+class VersionReport:
+    def __init__(self, version_id, size, chunk_count, new_chunks, added_bytes, seconds):
+        self.version_id = version_id
+        self.size = size
+        self.chunk_count = chunk_count
+        self.new_chunks = new_chunks
+        # Compressed bytes this version added to the database.
+        self.added_bytes = added_bytes
+        self.seconds = seconds
+
+    def __repr__(self):
+        return (
+            f"VersionReport(id={self.version_id}, size={self.size}, "
+            f"new_chunks={self.new_chunks}/{self.chunk_count}, "
+            f"added_bytes={self.added_bytes}, seconds={self.seconds:.3f})"
+        )
+
+
+def split_hashes(data):
+    return [data[i : i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE)]
+
+
+def manifest_pieces(hashes):
+    piece = []
+    for chunk_hash in hashes:
+        piece.append(chunk_hash)
+        if chunk_hash[0] < MANIFEST_CUT or len(piece) >= MANIFEST_MAX_ENTRIES:
+            yield b"".join(piece)
+            piece = []
+    if piece:
+        yield b"".join(piece)
+
+
+class FileHistory:
+    def __init__(self, db):
+        self.db = db
+
+    def store(self, batch):
+        # batch is [(hash, chunk)]; returns (new chunks, compressed bytes).
+        unique = dict(batch)
+        hashes = list(unique)
+        existing = set()
+        with self.db.lock:
+            for start in range(0, len(hashes), MAX_QUERY_PARAMETERS):
+                part = hashes[start : start + MAX_QUERY_PARAMETERS]
+                placeholders = ", ".join("?" * len(part))
+                rows = self.db.conn.execute(
+                    f"SELECT hash FROM history_chunks WHERE hash IN ({placeholders})",
+                    part,
+                )
+                existing.update(chunk_hash for (chunk_hash,) in rows)
+        rows = [
+            (chunk_hash, len(chunk), chunk.count(b"\n"), zlib.compress(chunk, 1))
+            for chunk_hash, chunk in unique.items()
+            if chunk_hash not in existing
+        ]
+        if rows:
+            with self.db.lock, self.db.conn:
+                self.db.conn.executemany(INSERT_CHUNK, rows)
+        return len(rows), sum(len(row[3]) for row in rows)
+
+    def record(self, path, username=None, task=None):
+        started = perf_counter()
+        path = os.path.abspath(path)
+        hashes = []
+        batch = []
+        batch_bytes = 0
+        new_chunks = 0
+        added = 0
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            buffer = (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            )
+            try:
+                for chunk in chunks(buffer):
+                    chunk_hash = digest(chunk)
+                    hashes.append(chunk_hash)
+                    batch.append((chunk_hash, chunk))
+                    batch_bytes += len(chunk)
+                    if batch_bytes >= STORE_BATCH_BYTES:
+                        count, stored = self.store(batch)
+                        new_chunks += count
+                        added += stored
+                        batch = []
+                        batch_bytes = 0
+                    if task is not None:
+                        task.advance(len(chunk))
+            finally:
+                if size:
+                    buffer.close()
+        count, stored = self.store(batch)
+        new_chunks += count
+        added += stored
+
+        pieces = [(digest(piece), piece) for piece in manifest_pieces(hashes)]
+        _, stored = self.store(pieces)
+        added += stored
+        manifest = b"".join(piece_hash for piece_hash, _ in pieces)
+        seconds = perf_counter() - started
+        with self.db.lock, self.db.conn:
+            version_id = self.db.conn.execute(
+                "INSERT INTO history_versions "
+                "(path, username, size, manifest, added_bytes, seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, username, size, manifest, added + len(manifest), seconds),
+            ).lastrowid
+        return VersionReport(
+            version_id, size, len(hashes), new_chunks, added + len(manifest), seconds
+        )
+
+    def versions(self, path):
+        # (id, created_at, size, added_bytes, seconds), newest first.
+        with self.db.lock:
+            return self.db.conn.execute(
+                "SELECT id, created_at, size, added_bytes, seconds "
+                "FROM history_versions WHERE path = ? ORDER BY id DESC",
+                (os.path.abspath(path),),
+            ).fetchall()
+
+    def chunk(self, chunk_hash):
+        with self.db.lock:
+            (data,) = self.db.conn.execute(SELECT_CHUNK, (chunk_hash,)).fetchone()
+        return zlib.decompress(data)
+
+    def manifest(self, version_id):
+        with self.db.lock:
+            (manifest,) = self.db.conn.execute(
+                "SELECT manifest FROM history_versions WHERE id = ?", (version_id,)
+            ).fetchone()
+        hashes = []
+        for piece_hash in split_hashes(manifest):
+            hashes.extend(split_hashes(self.chunk(piece_hash)))
+        return hashes
+
+    def iter_version(self, version_id):
+        for chunk_hash in self.manifest(version_id):
+            yield self.chunk(chunk_hash)
+
+    def restore(self, version_id, path, task=None):
+        return atomic_write(path, self.iter_version(version_id), task)
+
+    def line_starts(self, hashes):
+        # Line number at the start of each chunk, from the stored counts.
+        lines = {}
+        with self.db.lock:
+            for start in range(0, len(hashes), MAX_QUERY_PARAMETERS):
+                part = list(set(hashes[start : start + MAX_QUERY_PARAMETERS]))
+                placeholders = ", ".join("?" * len(part))
+                lines.update(
+                    self.db.conn.execute(
+                        "SELECT hash, lines FROM history_chunks "
+                        f"WHERE hash IN ({placeholders})",
+                        part,
+                    )
+                )
+        starts = [0]
+        for chunk_hash in hashes:
+            starts.append(starts[-1] + lines[chunk_hash])
+        return starts
+
+    def diff(self, old_id, new_id, encoding="utf-8", context=3):
+        # Unified diff that only reads the chunks that differ, each region
+        # widened to whole lines using its unchanged neighbours.
+        old = self.manifest(old_id)
+        new = self.manifest(new_id)
+        old_starts = self.line_starts(old)
+        new_starts = self.line_starts(new)
+        yield f"--- version {old_id}"
+        yield f"+++ version {new_id}"
+        matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            head = b""
+            if i1 > 0 and j1 > 0:
+                before = self.chunk(old[i1 - 1])
+                head = before[before.rfind(b"\n") + 1 :]
+            tail = b""
+            if i2 < len(old) and j2 < len(new):
+                after = self.chunk(old[i2])
+                newline = after.find(b"\n")
+                tail = after if newline == -1 else after[: newline + 1]
+            old_lines = self.region(old[i1:i2], head, tail, encoding)
+            new_lines = self.region(new[j1:j2], head, tail, encoding)
+            hunks = difflib.unified_diff(old_lines, new_lines, n=context, lineterm="")
+            for line in hunks:
+                if line.startswith(("---", "+++")):
+                    continue
+                match = HUNK.match(line)
+                if match is not None:
+                    line = (
+                        f"@@ -{int(match[1]) + old_starts[i1]}{match[2]} "
+                        f"+{int(match[3]) + new_starts[j1]}{match[4]} @@"
+                    )
+                yield line
+
+    def region(self, hashes, head, tail, encoding):
+        data = head + b"".join(self.chunk(chunk_hash) for chunk_hash in hashes) + tail
+        return data.decode(encoding, errors="replace").splitlines()
+
+    def storage(self):
+        # (stored compressed bytes, bytes of every version laid end to end).
+        with self.db.lock:
+            (stored,) = self.db.conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM history_chunks"
+            ).fetchone()
+            (logical,) = self.db.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM history_versions"
+            ).fetchone()
+        return stored, logical
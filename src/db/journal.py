@@ -0,0 +1,390 @@
+import os
+import sqlite3
+import uuid
+from core.document import Document
+from core.editor_core import LARGE_FILE_THRESHOLD, open_index
+from core.piece_table import PieceTable
+from core.text_format import NATIVE, TextFormat
+
+# A document is compacted into a snapshot once this many deltas, or more
+# journaled bytes than the document itself holds, have piled up.
+COMPACT_EDITS = 2000
+COMPACT_BYTES = 64 * 1024
+# Above this size the journal keeps deltas rather than copying the document;
+# saving re-bases them onto the file written instead.
+SNAPSHOT_LIMIT = 32 * 1024 * 1024
+
+INSERT_DOCUMENT = (
+    "INSERT INTO journal_documents "
+    "(username, session, path, encoding, text_format, base_size, base_mtime_ns) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_EDIT = "INSERT INTO journal_edits VALUES (?, ?, ?, ?, ?)"
+WRITE_SNAPSHOT = (
+    "UPDATE journal_documents SET snapshot = ?, path = ?, text_format = ?, "
+    "base_size = NULL, base_mtime_ns = NULL, updated_at = CURRENT_TIMESTAMP "
+    "WHERE id = ?"
+)
+REBASE = (
+    "UPDATE journal_documents SET snapshot = NULL, path = ?, base_size = ?, "
+    "base_mtime_ns = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+)
+DELETE_EDITS = "DELETE FROM journal_edits WHERE document_id = ?"
+DELETE_EDITS_BEFORE = "DELETE FROM journal_edits WHERE document_id = ? AND seq < ?"
+# Documents with nothing to replay: no snapshot and no edits.
+DELETE_EMPTY = (
+    "DELETE FROM journal_documents WHERE username = ? AND session != ? "
+    "AND snapshot IS NULL AND NOT EXISTS "
+    "(SELECT 1 FROM journal_edits WHERE document_id = journal_documents.id)"
+)
+DELETE_DOCUMENT = "DELETE FROM journal_documents WHERE id = ?"
+
+
+class RecoveredDocument:
+    def __init__(self, row_id, path, document, edits=()):
+        self.row_id = row_id
+        self.path = path
+        self.document = document
+        # [(offset, length, data)] replayed onto a file base; journaled again
+        # when tracked, since the base alone no longer holds the text.
+        self.edits = edits
+
+
+class DocumentJournal:
+    # Deltas of one document, coalesced in memory between flushes: typing
+    # extends the last insert and backspacing shrinks or extends the last
+    # edit, so a burst of keystrokes becomes a single row.
+    def __init__(self, document, path):
+        self.document = document
+        self.path = path
+        self.row_id = None
+        self.seq = 0
+        # [offset, deleted length, inserted bytes]; entries before sealed
+        # were made before a save started and are never extended.
+        self.pending = []
+        self.sealed = 0
+        # Edits before this position are in the last snapshot, or None if
+        # some were lost and only a new snapshot can account for them.
+        self.snapshot_seq = 0
+        self.journaled = 0
+        self.journaled_bytes = 0
+        self.set_base()
+
+    def set_base(self):
+        # Edits apply to the file as last opened or saved; anything else
+        # needs a snapshot before deltas mean something.
+        # Transcoded documents do not hold the file's bytes, so their edits
+        # cannot be replayed onto it.
+        disk = self.document.disk
+        self.needs_snapshot = False
+        if disk is not None and self.document.text_format.native:
+            key = disk[1]
+            self.base = (key[2], key[3])
+            self.unbased = False
+        else:
+            # Snapshotted along with the first edit, so documents that are
+            # only read never are.
+            self.base = None
+            self.unbased = len(self.document) > 0
+
+    def insert(self, offset, data):
+        if not data:
+            return
+        if len(self.pending) > self.sealed:
+            last = self.pending[-1]
+            if last[0] + len(last[2]) == offset:
+                last[2] += data
+                return
+        self.pending.append([offset, 0, bytearray(data)])
+
+    def delete(self, offset, length):
+        if length <= 0:
+            return
+        if len(self.pending) > self.sealed:
+            last = self.pending[-1]
+            start, deleted, inserted = last
+            if start <= offset and offset + length <= start + len(inserted):
+                # Removing text that has not been flushed yet.
+                del inserted[offset - start : offset + length - start]
+                if not deleted and not inserted:
+                    self.pending.pop()
+                return
+            if not inserted:
+                if offset + length == start:
+                    last[0] = offset
+                    last[1] += length
+                    return
+                if offset == start:
+                    last[1] += length
+                    return
+        self.pending.append([offset, length, bytearray()])
+
+    @property
+    def dirty(self):
+        return bool(self.pending) or self.needs_snapshot
+
+    def should_compact(self):
+        if self.needs_snapshot or self.unbased:
+            return True
+        size = len(self.document)
+        if size > SNAPSHOT_LIMIT:
+            return False
+        return (
+            self.journaled + len(self.pending) >= COMPACT_EDITS
+            or self.journaled_bytes >= max(size, COMPACT_BYTES)
+        )
+
+    def write(self, conn, username, session):
+        if self.row_id is None:
+            base_size, base_mtime = self.base or (None, None)
+            self.row_id = conn.execute(
+                INSERT_DOCUMENT,
+                (
+                    username,
+                    session,
+                    self.path,
+                    self.document.encoding,
+                    self.document.text_format.label,
+                    base_size,
+                    base_mtime,
+                ),
+            ).lastrowid
+
+        if self.should_compact():
+            # Recorded edits are applied to the document as they happen, so
+            # its current text already contains every pending delta.
+            conn.execute(
+                WRITE_SNAPSHOT,
+                (
+                    self.document.table.read(),
+                    self.path,
+                    self.document.text_format.label,
+                    self.row_id,
+                ),
+            )
+            conn.execute(DELETE_EDITS, (self.row_id,))
+            self.seq += len(self.pending)
+            self.snapshot_seq = self.seq
+            self.journaled = 0
+            self.journaled_bytes = 0
+            self.needs_snapshot = False
+            self.unbased = False
+        else:
+            conn.executemany(
+                INSERT_EDIT,
+                [
+                    (self.row_id, self.seq + i, offset, length, bytes(data) or None)
+                    for i, (offset, length, data) in enumerate(self.pending)
+                ],
+            )
+            self.seq += len(self.pending)
+            self.journaled += len(self.pending)
+            self.journaled_bytes += sum(len(data) for _, _, data in self.pending)
+        self.pending = []
+        self.sealed = 0
+
+    def checkpoint(self):
+        # The place in the edit stream of a save starting now.
+        self.sealed = len(self.pending)
+        return self.seq + len(self.pending)
+
+    def can_rebase(self, checkpoint):
+        return (
+            self.document.disk is not None
+            and self.document.text_format.native
+            and self.snapshot_seq is not None
+            and self.snapshot_seq <= checkpoint
+        )
+
+    def rebase(self, conn, checkpoint):
+        # Edits before the checkpoint are in the file just saved and those
+        # after it apply to that file, so only the latter are kept.
+        drop = checkpoint - self.seq
+        if drop > 0:
+            self.pending = self.pending[drop:]
+            self.sealed = max(0, self.sealed - drop)
+            self.seq = checkpoint
+        self.set_base()
+        self.journaled = self.seq - checkpoint
+        self.journaled_bytes = 0
+        if self.row_id is not None:
+            conn.execute(DELETE_EDITS_BEFORE, (self.row_id, checkpoint))
+            conn.execute(REBASE, (self.path, *self.base, self.row_id))
+
+
+class EditJournal:
+    # Per-user crash journal in the editor's database. Edits are buffered in
+    # memory and written by flush(), which the editor calls on a timer, so
+    # each tick costs one small transaction whatever the document size.
+    def __init__(self, db, username):
+        self.db = db
+        self.username = username
+        self.session = uuid.uuid4().hex
+        self.documents = {}
+
+    def track(self, document, path=None, edits=()):
+        journal = DocumentJournal(document, path)
+        journal.pending = [
+            [offset, length, bytearray(data or b"")] for offset, length, data in edits
+        ]
+        document.journal = journal
+        self.documents[id(document)] = journal
+        return journal
+
+    def forget(self, document):
+        journal = self.documents.pop(id(document), None)
+        if journal is None:
+            return
+        document.journal = None
+        if journal.row_id is not None:
+            with self.db.lock, self.db.conn:
+                self.db.conn.execute(DELETE_DOCUMENT, (journal.row_id,))
+
+    def checkpoint(self, document):
+        journal = self.documents.get(id(document))
+        return journal.checkpoint() if journal is not None else None
+
+    def saved(self, document, path, checkpoint=None):
+        # The file on disk now holds what the journal was protecting, unless
+        # edits came in while the save was running; those are re-based onto
+        # the file when checkpoint marks where the save began.
+        journal = self.documents.get(id(document))
+        if journal is None:
+            return
+        journal.path = path
+        if document.modified:
+            if checkpoint is not None and journal.can_rebase(checkpoint):
+                with self.db.lock, self.db.conn:
+                    journal.rebase(self.db.conn, checkpoint)
+            else:
+                journal.needs_snapshot = True
+            return
+        self.forget(document)
+        self.track(document, path)
+
+    def flush(self):
+        dirty = [journal for journal in self.documents.values() if journal.dirty]
+        if not dirty:
+            return 0
+        rows = [journal.row_id for journal in dirty]
+        try:
+            with self.db.lock, self.db.conn:
+                for journal in dirty:
+                    journal.write(self.db.conn, self.username, self.session)
+        except sqlite3.Error:
+            # The transaction rolled back, so deltas written by it are gone;
+            # a snapshot on the next flush covers them.
+            for journal, row_id in zip(dirty, rows):
+                journal.row_id = row_id
+                journal.pending = []
+                journal.sealed = 0
+                journal.snapshot_seq = None
+                journal.needs_snapshot = True
+            raise
+        return len(dirty)
+
+    def close(self):
+        # Unsaved documents stay journaled so the next login can offer them.
+        self.flush()
+        for journal in list(self.documents.values()):
+            if not journal.document.modified:
+                self.forget(journal.document)
+            else:
+                journal.document.journal = None
+        self.documents = {}
+
+    def recoverable(self):
+        with self.db.lock:
+            with self.db.conn:
+                self.db.conn.execute(DELETE_EMPTY, (self.username, self.session))
+            rows = self.db.conn.execute(
+                "SELECT id, path, updated_at FROM journal_documents "
+                "WHERE username = ? AND session != ? ORDER BY id",
+                (self.username, self.session),
+            ).fetchall()
+        return rows
+
+    def recover(self, task=None):
+        # Returns (recovered documents, paths whose base file has changed on
+        # disk since the edits were journaled). Either way the old rows are
+        # removed; recovered documents are journaled afresh once tracked.
+        # Runs on an I/O worker: bases are read outside the database lock.
+        with self.db.lock:
+            rows = self.db.conn.execute(
+                "SELECT id, path, encoding, text_format, base_size, base_mtime_ns, "
+                "snapshot "
+                "FROM journal_documents WHERE username = ? AND session != ? "
+                "ORDER BY id",
+                (self.username, self.session),
+            ).fetchall()
+            journaled = [
+                self.db.conn.execute(
+                    "SELECT offset, length, data FROM journal_edits "
+                    "WHERE document_id = ? ORDER BY seq",
+                    (row[0],),
+                ).fetchall()
+                for row in rows
+            ]
+        recovered = []
+        conflicts = []
+        for row, edits in zip(rows, journaled):
+            row_id, path, encoding, label, size, mtime, snapshot = row
+            if snapshot is None and not edits:
+                continue
+            if snapshot is not None:
+                document = Document(PieceTable(bytes(snapshot)), encoding)
+            else:
+                document = open_base(path, size, mtime, encoding)
+            if document is None:
+                conflicts.append(path)
+                continue
+            replay(document, edits)
+            document.text_format = TextFormat.from_label(label) if label else NATIVE
+            if document.source is None:
+                edits = ()
+            recovered.append(RecoveredDocument(row_id, path, document, edits))
+        with self.db.lock, self.db.conn:
+            self.db.conn.executemany(DELETE_DOCUMENT, [(row[0],) for row in rows])
+        return recovered, conflicts
+
+    def discard(self):
+        with self.db.lock, self.db.conn:
+            self.db.conn.execute(
+                "DELETE FROM journal_documents WHERE username = ? AND session != ?",
+                (self.username, self.session),
+            )
+
+
+def open_base(path, size, mtime_ns, encoding="utf-8"):
+    # The file the edits were made to, or None if it has changed since.
+    if size is None:
+        # Journaled from an empty, never saved document.
+        return Document(PieceTable(b""), encoding)
+    try:
+        if size >= LARGE_FILE_THRESHOLD:
+            # Mapped and indexed like any large file, so it opens in the
+            # windowed view rather than whole in a widget.
+            index = open_index(path)
+            if (index.stat.st_size, index.stat.st_mtime_ns) != (size, mtime_ns):
+                index.close()
+                return None
+            index.build()
+            return Document.from_index(index)
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                return None
+            return Document(PieceTable(file.read()), encoding)
+    except (OSError, ValueError):
+        return None
+
+
+def replay(document, edits):
+    table = document.table
+    for offset, length, data in edits:
+        table.delete(offset, length)
+        if data:
+            table.insert(offset, data)
+    # Nothing on disk holds this text, so it counts as unsaved.
+    document.saved_version = None
+    return document
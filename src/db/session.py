@@ -0,0 +1,109 @@
+import os
+import time
+import zlib
+from array import array
+
+RECENT_LIMIT = 10
+# Cached line indexes kept; the least recently used are pruned first.
+INDEX_CACHE_LIMIT = 20
+
+
+class Session:
+    def __init__(self, geometry, tabs, active):
+        self.geometry = geometry
+        # [(path, top fraction or None, cursor index or None)] in tab order.
+        self.tabs = tabs
+        self.active = active
+
+
+class SessionStore:
+    def __init__(self, db):
+        self.db = db
+
+    def save(self, username, geometry, tabs, active):
+        with self.db.lock, self.db.conn:
+            conn = self.db.conn
+            conn.execute(
+                "INSERT OR REPLACE INTO user_sessions (username, geometry, active) "
+                "VALUES (?, ?, ?)",
+                (username, geometry, active),
+            )
+            conn.execute("DELETE FROM session_tabs WHERE username = ?", (username,))
+            conn.executemany(
+                "INSERT INTO session_tabs VALUES (?, ?, ?, ?, ?)",
+                [
+                    (username, position, path, top, cursor)
+                    for position, (path, top, cursor) in enumerate(tabs)
+                ],
+            )
+
+    def load(self, username):
+        with self.db.lock:
+            row = self.db.conn.execute(
+                "SELECT geometry, active FROM user_sessions WHERE username = ?",
+                (username,),
+            ).fetchone()
+            if row is None:
+                return None
+            tabs = self.db.conn.execute(
+                "SELECT path, top, cursor FROM session_tabs "
+                "WHERE username = ? ORDER BY position",
+                (username,),
+            ).fetchall()
+        return Session(row[0], tabs, row[1])
+
+    def add_recent(self, username, path):
+        path = os.path.abspath(path)
+        with self.db.lock, self.db.conn:
+            self.db.conn.execute(
+                "INSERT OR REPLACE INTO recent_files VALUES (?, ?, ?)",
+                (username, path, time.time()),
+            )
+            self.db.conn.execute(
+                "DELETE FROM recent_files WHERE username = ? AND path NOT IN ("
+                "SELECT path FROM recent_files WHERE username = ? "
+                "ORDER BY opened_at DESC LIMIT ?)",
+                (username, username, RECENT_LIMIT),
+            )
+
+    def recent(self, username):
+        with self.db.lock:
+            rows = self.db.conn.execute(
+                "SELECT path FROM recent_files WHERE username = ? "
+                "ORDER BY opened_at DESC",
+                (username,),
+            )
+            return [path for (path,) in rows]
+
+    def cached_offsets(self, path, fingerprint):
+        with self.db.lock:
+            row = self.db.conn.execute(
+                "SELECT size, mtime_ns, digest, offsets FROM line_index_cache "
+                "WHERE path = ?",
+                (os.path.abspath(path),),
+            ).fetchone()
+            if row is None or tuple(row[:3]) != tuple(fingerprint):
+                return None
+            with self.db.conn:
+                self.db.conn.execute(
+                    "UPDATE line_index_cache SET used_at = ? WHERE path = ?",
+                    (time.time(), os.path.abspath(path)),
+                )
+        offsets = array("Q")
+        offsets.frombytes(zlib.decompress(row[3]))
+        return offsets
+
+    def cache_offsets(self, path, fingerprint, offsets, task=None):
+        # Compressed off the Tk thread; task is accepted for the I/O worker.
+        data = zlib.compress(offsets.tobytes(), 1)
+        size, mtime_ns, digest = fingerprint
+        with self.db.lock, self.db.conn:
+            self.db.conn.execute(
+                "INSERT OR REPLACE INTO line_index_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(path), size, mtime_ns, digest, data, time.time()),
+            )
+            self.db.conn.execute(
+                "DELETE FROM line_index_cache WHERE path NOT IN ("
+                "SELECT path FROM line_index_cache ORDER BY used_at DESC LIMIT ?)",
+                (INDEX_CACHE_LIMIT,),
+            )
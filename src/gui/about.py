@@ -2,11 +2,22 @@ import tkinter as tk
 from tkinter import messagebox
 import platform
 import psutil
+from core.metrics import PROBES
+from core.sampler import ResourceSampler
+from gui.charts import IdleBatch, PieChart, Sparkline
 
 
 class AboutWindow:
-    def __init__(self, parent):
+    POLL_MS = 500
+    CORE_COLORS = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b")
+
+    def __init__(self, parent, refresh_ms=POLL_MS):
         self.parent = parent
+        self.sampler = None
+        self._poll_id = None
+        self.refresh_ms = refresh_ms
+        self.sparklines = {}
+        self.chart_batch = None
         self.parent.title("Authentication Required")
         self.parent.geometry("400x500")
 
@@ -127,15 +138,57 @@ class AboutWindow:
         self.cpu_canvas = tk.Canvas(cpu_frame, width=150, height=150, bg="white")
         self.cpu_canvas.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        tk.Button(self.main_frame, text="Refresh", command=self.update_pie_charts).pack(
-            pady=10
+        self.chart_batch = IdleBatch(self.parent)
+        self.ram_chart = PieChart(self.ram_canvas, self.chart_batch)
+        self.cpu_chart = PieChart(self.cpu_canvas, self.chart_batch)
+
+        controls = tk.Frame(self.main_frame)
+        controls.pack(fill=tk.X, pady=5)
+
+        tk.Button(controls, text="Refresh", command=self.update_pie_charts).pack(
+            side=tk.LEFT
         )
 
+        self.live_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            controls, text="Live", variable=self.live_var, command=self.toggle_live
+        ).pack(side=tk.LEFT, padx=10)
+
+        self.latency_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            controls,
+            text="Latency",
+            variable=self.latency_var,
+            command=self.toggle_latency,
+        ).pack(side=tk.LEFT)
+
+        tk.Label(controls, text="Refresh (ms):").pack(side=tk.LEFT)
+        self.refresh_var = tk.IntVar(value=self.refresh_ms)
+        refresh_box = tk.Spinbox(
+            controls,
+            from_=100,
+            to=5000,
+            increment=100,
+            width=6,
+            textvariable=self.refresh_var,
+            command=self.set_refresh_rate,
+        )
+        refresh_box.pack(side=tk.LEFT)
+        refresh_box.bind("<Return>", lambda event: self.set_refresh_rate())
+        refresh_box.bind("<FocusOut>", lambda event: self.set_refresh_rate())
+
+        self.live_frame = tk.Frame(self.main_frame)
+        self.sampler = ResourceSampler(interval=self.refresh_ms / 1000)
+        self.create_sparklines(self.sampler.cores)
+        self.create_latency_panel()
+
         tk.Button(self.main_frame, text="Close", command=self.parent.destroy).pack(
             pady=5
         )
 
-        self.update_pie_charts()
+        self.sampler.start()
+        self.parent.bind("<Destroy>", self.on_destroy, add="+")
+        self.poll_sampler()
 
     @staticmethod
     def get_os_info():
@@ -153,77 +206,135 @@ class AboutWindow:
         )
         return info
 
-    def draw_pie_chart(self, canvas, percent_used, title):
-        canvas.delete("all")
-
-        width = canvas.winfo_width()
-        height = canvas.winfo_height()
-        radius = min(width, height) * 0.4
-        center_x = width // 2
-        center_y = height // 2
-
-        used_color = "#ff9999"
-        free_color = "#66b3ff"
-        text_color = "black"
-
-        used_angle = 360 * percent_used / 100
-        free_angle = 360 - used_angle
-
-        canvas.create_arc(
-            center_x - radius,
-            center_y - radius,
-            center_x + radius,
-            center_y + radius,
-            start=0,
-            extent=used_angle,
-            fill=used_color,
-            outline="white",
-        )
+    def update_pie_charts(self):
+        sample = self.sampler.latest
+        if sample is None:
+            # Nothing sampled yet; RAM is instant to read, CPU needs an interval.
+            ram = psutil.virtual_memory()
+            ram_percent, ram_used, ram_total = ram.percent, ram.used, ram.total
+        else:
+            ram_percent = sample.ram_percent
+            ram_used, ram_total = sample.ram_used, sample.ram_total
 
-        canvas.create_arc(
-            center_x - radius,
-            center_y - radius,
-            center_x + radius,
-            center_y + radius,
-            start=used_angle,
-            extent=free_angle,
-            fill=free_color,
-            outline="white",
+        self.ram_chart.set(
+            ram_percent,
+            f"RAM: {ram_used / (1024**3):.1f}/{ram_total / (1024**3):.1f} GB",
         )
 
-        inner_radius = radius * 0.5
-        canvas.create_oval(
-            center_x - inner_radius,
-            center_y - inner_radius,
-            center_x + inner_radius,
-            center_y + inner_radius,
-            fill="white",
-            outline="white",
+        if sample is None:
+            self.cpu_chart.set(0, "CPU: measuring...")
+        else:
+            self.cpu_chart.set(sample.cpu_percent, "CPU Usage")
+
+    def create_sparklines(self, cores):
+        rows = (
+            ("CPU", ("cpu",)),
+            ("Per-core CPU", tuple(f"cpu{number}" for number in range(cores))),
+            ("RAM", ("ram",)),
+            ("Disk I/O (read, write)", ("disk_read", "disk_write")),
+            ("Editor RSS", ("rss",)),
         )
-
-        canvas.create_text(
-            center_x,
-            center_y,
-            text=f"{percent_used:.1f}%",
-            font=("Helvetica", 14, "bold"),
-            fill=text_color,
+        for title, names in rows:
+            frame = tk.LabelFrame(self.live_frame, text=title)
+            frame.pack(fill=tk.X, padx=5, pady=2)
+            canvas = tk.Canvas(frame, height=40, bg="white", highlightthickness=0)
+            canvas.pack(fill=tk.X, padx=2, pady=2)
+            for number, name in enumerate(names):
+                color = self.CORE_COLORS[number % len(self.CORE_COLORS)]
+                maximum = 100 if name.startswith(("cpu", "ram")) else None
+                self.sparklines[name] = Sparkline(canvas, color, maximum)
+
+    def create_latency_panel(self):
+        self.latency_frame = tk.LabelFrame(self.main_frame, text="Latency (ms)")
+        self.recording_var = tk.BooleanVar(value=PROBES.enabled)
+        tk.Checkbutton(
+            self.latency_frame,
+            text="Record probes",
+            variable=self.recording_var,
+            command=self.toggle_recording,
+        ).pack(anchor=tk.W)
+        self.latency_table = tk.Label(
+            self.latency_frame, text="", font=("Courier", 9), justify=tk.LEFT
         )
+        self.latency_table.pack(fill=tk.X, anchor=tk.W)
 
-        canvas.create_text(
-            center_x, height - 15, text=title, font=("Helvetica", 10), fill=text_color
-        )
+    def resize(self):
+        latency = self.latency_var.get()
+        height = 500 + (300 if self.live_var.get() else 0) + (250 if latency else 0)
+        self.parent.geometry(f"{560 if latency else 400}x{height}")
 
-    def update_pie_charts(self):
-        ram = psutil.virtual_memory()
-        ram_used_percent = ram.percent
-        self.draw_pie_chart(
-            self.ram_canvas,
-            ram_used_percent,
-            f"RAM: {ram.used / (1024**3):.1f}/{ram.total / (1024**3):.1f} GB",
+    def toggle_live(self):
+        if self.live_var.get():
+            self.live_frame.pack(fill=tk.X, pady=5)
+            self.update_sparklines()
+        else:
+            self.live_frame.pack_forget()
+        self.resize()
+
+    def toggle_latency(self):
+        if self.latency_var.get():
+            self.latency_frame.pack(fill=tk.X, pady=5)
+            self.update_latency()
+        else:
+            self.latency_frame.pack_forget()
+        self.resize()
+
+    def toggle_recording(self):
+        PROBES.enabled = self.recording_var.get()
+        self.update_latency()
+
+    @staticmethod
+    def latency_rows(summary):
+        rows = [f"{'probe':<22}{'count':>7}{'p50':>9}{'p99':>9}{'max':>9}"]
+        for name, stats in summary.items():
+            rows.append(
+                f"{name:<22}{stats['count']:>7}{stats['p50_ms']:>9.2f}"
+                f"{stats['p99_ms']:>9.2f}{stats['max_ms']:>9.2f}"
+            )
+        if len(rows) == 1:
+            rows.append("No samples yet" if PROBES.enabled else "Recording is off")
+        return "\n".join(rows)
+
+    def update_latency(self):
+        self.latency_table.config(text=self.latency_rows(PROBES.summary()))
+
+    def set_refresh_rate(self):
+        try:
+            refresh_ms = int(self.refresh_var.get())
+        except (tk.TclError, ValueError):
+            return
+        self.refresh_ms = max(100, refresh_ms)
+        self.sampler.interval = self.refresh_ms / 1000
+
+    def update_sparklines(self):
+        history = self.sampler.history
+        # Both disk series share one scale so read and write compare directly.
+        disk_peak = max(
+            max(history.values("disk_read"), default=0),
+            max(history.values("disk_write"), default=0),
         )
+        for name, sparkline in self.sparklines.items():
+            maximum = disk_peak if name.startswith("disk") else None
+            sparkline.draw(history.values(name), history.capacity, maximum)
 
-        cpu_percent = psutil.cpu_percent(interval=1)
-        self.draw_pie_chart(self.cpu_canvas, cpu_percent, "CPU Usage")
+    def poll_sampler(self):
+        self.update_pie_charts()
+        if self.live_var.get():
+            self.update_sparklines()
+        if self.latency_var.get():
+            self.update_latency()
+        self._poll_id = self.parent.after(self.refresh_ms, self.poll_sampler)
+
+    def on_destroy(self, event):
+        if event.widget is not self.parent:
+            return
+        if self._poll_id is not None:
+            self.parent.after_cancel(self._poll_id)
+            self._poll_id = None
+        if self.chart_batch is not None:
+            self.chart_batch.cancel()
+        if self.sampler is not None:
+            self.sampler.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,141 @@
+from core.metrics import PROBES
+
+
+class Sparkline:
+    # One canvas line item per series; redraws only move its coordinates, so
+    # the canvas item count stays fixed however long the chart runs.
+    PADDING = 2
+
+    def __init__(self, canvas, color="#1f77b4", maximum=None):
+        self.canvas = canvas
+        self.maximum = maximum
+        self.item = canvas.create_line(0, 0, 0, 0, fill=color, width=1)
+
+    def points(self, values, width, height, capacity, maximum=None):
+        top = maximum or self.maximum or max(values, default=0) or 1
+        step = (width - 2 * self.PADDING) / max(capacity - 1, 1)
+        # Newest sample on the right edge; older ones scroll off to the left.
+        x = width - self.PADDING - step * (len(values) - 1)
+        usable = height - 2 * self.PADDING
+        coords = []
+        for value in values:
+            coords.append(x)
+            coords.append(height - self.PADDING - usable * min(value / top, 1.0))
+            x += step
+        if len(coords) < 4:
+            # Tk lines need at least two points.
+            coords = coords * 2 if coords else [0, 0, 0, 0]
+        return coords
+
+    @PROBES.timed("redraw.sparkline")
+    def draw(self, values, capacity, maximum=None):
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        self.canvas.coords(
+            self.item, self.points(values, width, height, capacity, maximum)
+        )
+
+
+class IdleBatch:
+    # Collects chart updates and applies them all from one idle callback.
+    def __init__(self, widget):
+        self.widget = widget
+        self.pending = {}
+        self._idle_id = None
+
+    def schedule(self, chart):
+        self.pending[id(chart)] = chart
+        if self._idle_id is None:
+            self._idle_id = self.widget.after_idle(self.flush)
+
+    @PROBES.timed("redraw.charts")
+    def flush(self):
+        self._idle_id = None
+        pending, self.pending = self.pending, {}
+        for chart in pending.values():
+            chart.flush()
+
+    def cancel(self):
+        if self._idle_id is not None:
+            self.widget.after_cancel(self._idle_id)
+            self._idle_id = None
+        self.pending.clear()
+
+
+class PieChart:
+    # Donut chart whose items are created once and then only reconfigured.
+    THRESHOLD = 0.5
+    USED_COLOR = "#ff9999"
+    FREE_COLOR = "#66b3ff"
+
+    def __init__(self, canvas, batch=None, threshold=THRESHOLD):
+        self.canvas = canvas
+        self.batch = batch or IdleBatch(canvas)
+        self.threshold = threshold
+        self.percent = None
+        self.title = None
+        self.size = None
+        self._target = (0.0, "")
+        self.used = canvas.create_arc(
+            0, 0, 0, 0, start=0, extent=0, fill=self.USED_COLOR, outline="white"
+        )
+        self.free = canvas.create_arc(
+            0, 0, 0, 0, start=0, extent=0, fill=self.FREE_COLOR, outline="white"
+        )
+        self.hole = canvas.create_oval(0, 0, 0, 0, fill="white", outline="white")
+        self.value_text = canvas.create_text(
+            0, 0, text="", font=("Helvetica", 14, "bold"), fill="black"
+        )
+        self.title_text = canvas.create_text(
+            0, 0, text="", font=("Helvetica", 10), fill="black"
+        )
+
+    def set(self, percent, title):
+        self._target = (percent, title)
+        self.batch.schedule(self)
+
+    def flush(self):
+        percent, title = self._target
+        canvas = self.canvas
+        size = (canvas.winfo_width(), canvas.winfo_height())
+        if size != self.size:
+            self.size = size
+            self.layout(*size)
+            self.percent = None
+
+        if title != self.title:
+            self.title = title
+            canvas.itemconfigure(self.title_text, text=title)
+
+        if self.percent is not None and abs(percent - self.percent) < self.threshold:
+            return False
+        self.percent = percent
+        used_angle = 360 * percent / 100
+        canvas.itemconfigure(self.used, extent=used_angle)
+        canvas.itemconfigure(self.free, start=used_angle, extent=360 - used_angle)
+        canvas.itemconfigure(self.value_text, text=f"{percent:.1f}%")
+        return True
+
+    def layout(self, width, height):
+        canvas = self.canvas
+        radius = min(width, height) * 0.4
+        inner_radius = radius * 0.5
+        center_x = width // 2
+        center_y = height // 2
+        box = (
+            center_x - radius,
+            center_y - radius,
+            center_x + radius,
+            center_y + radius,
+        )
+        canvas.coords(self.used, *box)
+        canvas.coords(self.free, *box)
+        canvas.coords(
+            self.hole,
+            center_x - inner_radius,
+            center_y - inner_radius,
+            center_x + inner_radius,
+            center_y + inner_radius,
+        )
+        canvas.coords(self.value_text, center_x, center_y)
+        canvas.coords(self.title_text, center_x, height - 15)
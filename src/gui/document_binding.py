@@ -0,0 +1,141 @@
+import tkinter as tk
+from core.piece_table import span_bytes
+
+
+class DocumentBinding:
+    def __init__(self, text_area, document, first_line=0, on_edit=None):
+        self.text_area = text_area
+        self.document = document
+        self.first_line = first_line
+        self.on_edit = on_edit
+        # Called as on_change(line, removed, added) with 0-based widget lines
+        # before each edit reaches the widget.
+        self.on_change = None
+        self.suspended = False
+        # Drops edits from the user, keeping widget and document unchanged.
+        self.read_only = False
+
+        self.tk = text_area.tk
+        self.widget = str(text_area)
+        self.original = self.widget + "_document"
+        self.tk.call("rename", self.widget, self.original)
+        self.tk.createcommand(self.widget, self.dispatch)
+
+    def call(self, *args):
+        return self.tk.call((self.original,) + args)
+
+    def dispatch(self, command, *args):
+        if self.read_only and command in ("insert", "delete", "replace"):
+            return ""
+        if not self.suspended:
+            if command == "insert":
+                self.record_insert(args[0], "".join(args[1::2]))
+            elif command == "delete":
+                self.record_delete(args)
+            elif command == "replace":
+                with self.document.history.group():
+                    self.record_delete(args[:2])
+                    self.record_insert(args[0], "".join(args[2::2]))
+        result = self.call(command, *args)
+        if command in ("insert", "delete", "replace") and self.on_edit is not None:
+            self.on_edit()
+        return result
+
+    def byte_offset(self, index):
+        line, _ = index.split(".")
+        prefix = self.call("get", f"{line}.0", index)
+        return self.document.line_start(self.first_line + int(line) - 1) + len(
+            prefix.encode(self.document.encoding)
+        )
+
+    def index_of(self, offset):
+        line = self.document.table.line_at(offset)
+        start = self.document.line_start(line)
+        prefix = self.document.table.read(start, offset)
+        column = len(prefix.decode(self.document.encoding, errors="replace"))
+        return f"{line - self.first_line + 1}.{column}"
+
+    def compare(self, a, op, b):
+        return self.tk.getboolean(self.call("compare", a, op, b))
+
+    def clamp(self, index):
+        index = str(self.call("index", index))
+        if self.compare(index, ">", "end-1c"):
+            index = str(self.call("index", "end-1c"))
+        return index
+
+    def record_insert(self, index, text):
+        if text:
+            index = self.clamp(index)
+            self.document.insert(self.byte_offset(index), text)
+            if self.on_change is not None:
+                line = int(index.split(".")[0]) - 1
+                self.on_change(line, 0, text.count("\n"))
+
+    def record_delete(self, args):
+        ranges = []
+        for i in range(0, len(args), 2):
+            start = self.clamp(args[i])
+            end = self.clamp(args[i + 1] if i + 1 < len(args) else f"{start}+1c")
+            if self.compare(start, "<", end):
+                ranges.append((start, end))
+
+        # Later ranges first, so earlier byte offsets stay valid.
+        for start, end in sorted(
+            ranges, key=lambda r: tuple(map(int, r[0].split("."))), reverse=True
+        ):
+            removed = self.call("get", start, end).encode(self.document.encoding)
+            self.document.delete(self.byte_offset(start), len(removed))
+            if self.on_change is not None:
+                first = int(start.split(".")[0]) - 1
+                self.on_change(first, int(end.split(".")[0]) - 1 - first, 0)
+
+    def splice(self, offset, length, spans):
+        # Undo and redo: the document replays its history and the widget
+        # follows, without recording either as a new edit.
+        start = self.index_of(offset)
+        end = self.index_of(offset + length)
+        self.document.splice(offset, length, spans)
+        text = span_bytes(spans).decode(self.document.encoding, errors="replace")
+        self.redraw(start, end, text)
+        self.call("mark", "set", "insert", f"{start}+{len(text)}c")
+        self.call("see", "insert")
+
+    def replace_range(self, offset, length, text):
+        # Edits made by the program rather than typed, e.g. a followed file
+        # growing; these work even while the binding is read only.
+        start = self.index_of(offset)
+        end = self.index_of(offset + length)
+        if length:
+            self.document.delete(offset, length)
+        if text:
+            self.document.insert(offset, text)
+        self.redraw(start, end, text)
+
+    def redraw(self, start, end, text):
+        first = int(start.split(".")[0]) - 1
+        if self.on_change is not None:
+            self.on_change(first, int(end.split(".")[0]) - 1 - first, 0)
+        self.call("delete", start, end)
+        if text:
+            if self.on_change is not None:
+                self.on_change(first, 0, text.count("\n"))
+            self.call("insert", start, text)
+        if self.on_edit is not None:
+            self.on_edit()
+
+    def load(self, text):
+        self.suspended = True
+        try:
+            self.text_area.delete(1.0, tk.END)
+            self.text_area.insert(tk.END, text)
+        finally:
+            self.suspended = False
+
+    def detach(self):
+        self.tk.deletecommand(self.widget)
+        try:
+            self.tk.call("rename", self.original, self.widget)
+        except tk.TclError:
+            # The widget was destroyed while bound.
+            pass
@@ -1,22 +1,129 @@
 from tkinter import scrolledtext, filedialog, messagebox
 from gui.login import LoginWindow
-from gui.about import AboutWindow
+from gui.large_view import LargeFileView
+from gui.document_binding import DocumentBinding
+from gui.syntax import SyntaxHighlighter
+from gui.find_bar import FindBar
+from gui.grep_panel import GrepPanel
+from gui.tabs import Tab, TabBar
+from gui.history_window import DiffWindow, HistoryWindow
+from core.highlight import lexer_for
+from core.search import SearchResult, search
+from core.grep import GrepResults, default_index_path, grep_folder
+from core.document import Document, file_key
+from core.editor_core import (
+    LARGE_FILE_THRESHOLD,
+    EditorCore,
+    open_index,
+)
+from core.follow import (
+    COMPACT_RATIO,
+    COMPACT_SLACK_BYTES,
+    DEFAULT_FOLLOW_LINES,
+    FileFollower,
+)
+from core.io_worker import IOWorker, Cancelled
+from core.line_index import fingerprint
+from core.metrics import PROBES
+from core.tabs import DEFAULT_LIVE_TABS, DEFAULT_MEMORY_BUDGET, TabSet
+from core.text_format import TextFormat
+from core.undo import DEFAULT_UNDO_MEMORY
+from db.db import open_database
+from db.journal import EditJournal
+from db.history import FileHistory
+from db.session import SessionStore
 import tkinter as tk
+import os
+import re
+import sqlite3
+from functools import partial
+from itertools import islice
+from time import perf_counter
+
+THROUGHPUT_REPORT_BYTES = 8 * 1024 * 1024
+MAX_DIFF_LINES = 5000
+
+
+def tab_attribute(name):
+    # Per-document state lives on the active tab.
+    return property(
+        lambda self: getattr(self.tabs.active, name),
+        lambda self, value: setattr(self.tabs.active, name, value),
+    )
 
 
 class FileEditor:
-    def __init__(self, root):
+    IO_POLL_MS = 100
+    JOURNAL_FLUSH_MS = 2000
+    LAG_PROBE_MS = 100
+    # Followed files are redrawn at most this often however fast they grow.
+    FOLLOW_UPDATE_MS = 250
+
+    current_file = tab_attribute("path")
+    text_area = tab_attribute("text_area")
+    document = tab_attribute("document")
+    binding = tab_attribute("binding")
+    highlighter = tab_attribute("highlighter")
+    large_view = tab_attribute("large_view")
+
+    def __init__(
+        self,
+        root,
+        db=None,
+        live_tabs=DEFAULT_LIVE_TABS,
+        tab_memory_budget=DEFAULT_MEMORY_BUDGET,
+        undo_memory=DEFAULT_UNDO_MEMORY,
+        follow_lines=DEFAULT_FOLLOW_LINES,
+    ):
         self.root = root
         self.root.title("File Editor - Please Login")
         self.root.geometry("800x600")
         self.root.configure(bg="white")
 
-        self.current_file = None
         self.current_user = None
+        self.tabs = TabSet(live_tabs, tab_memory_budget)
+        self.undo_memory = undo_memory
+        self.follow_lines = follow_lines
+        self.follow_var = None
+        self.follow_job = None
+        self.tabs.activate(self.tabs.add(Tab()))
+        # Widgets are built on the first successful login, not at startup,
+        # so the login window is the only thing painted before credentials.
+        self.tab_bar = None
+        self.io = IOWorker()
+        self.io_job = None
+        # (task, result, query) of the latest search; results are kept for
+        # Find Next until the query or the document changes.
+        self.search_job = None
+        self.grep_panel = None
+        self.grep_job = None
+        self.grep_executor = None
+        self.journal = None
+        self.journal_job = None
+        self.history_window = None
+        # One connection for the whole process, shared by every login.
+        self.db = db or open_database()
+        self.history = FileHistory(self.db)
+        self.sessions = SessionStore(self.db)
+        # [(tab, task)] of session files read ahead of being shown.
+        self.prefetch_tasks = []
+        self.prefetch_job = None
+        self.lag_job = None
 
         self.root.withdraw()
+        self.watch_event_loop()
+
+        self.login_window = LoginWindow(self.root, self.on_login_success, self.db)
 
-        LoginWindow(self.root, self.on_login_success)
+    def watch_event_loop(self, due=None):
+        # How late a timer fires is how long the event loop was busy with
+        # something else: the lag a keystroke would have seen.
+        now = perf_counter()
+        if due is not None and PROBES.enabled:
+            PROBES.record("tk.event_loop_lag", max(0.0, now - due))
+        self.lag_job = self.root.after(
+            self.LAG_PROBE_MS, self.watch_event_loop, now + self.LAG_PROBE_MS / 1000
+        )
 
     def on_login_success(self, username):
         self.current_user = username
@@ -27,23 +134,262 @@ class FileEditor:
         self.root.attributes("-topmost", True)
         self.root.after_idle(self.root.attributes, "-topmost", False)
 
-        self.setup_ui()
+        self.journal = EditJournal(self.db, username)
+        # The UI is built on the first login and kept, hidden, across logouts.
+        if self.tab_bar is None:
+            self.setup_ui()
+        else:
+            self.status_bar.config(text=f"Ready - Logged in as: {username}")
+            self.show_tab(self.tab)
+        self.offer_recovery()
+        self.journal_job = self.root.after(self.JOURNAL_FLUSH_MS, self.flush_journal)
 
-    def setup_ui(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
+    def offer_recovery(self):
+        # The session is restored once recovery is done, so recovered files
+        # keep the tabs they were given.
+        pending = self.journal.recoverable()
+        if not pending:
+            self.restore_session()
+            return
+        if not messagebox.askyesno(
+            "Recover",
+            f"{len(pending)} unsaved document(s) from an earlier session were found."
+            " Recover them?",
+        ):
+            self.journal.discard()
+            self.restore_session()
+            return
+        self.status_bar.config(text="Recovering unsaved documents...")
+        self.poll_recovery(self.io.submit(self.journal.recover))
+
+    def poll_recovery(self, task):
+        if not task.done():
+            self.root.after(self.IO_POLL_MS, self.poll_recovery, task)
+            return
+        try:
+            recovered, conflicts = task.result()
+        except Exception as e:
+            recovered, conflicts = [], []
+            messagebox.showerror("Recover", f"Failed to recover documents:\n{e}")
+        if self.journal is None:
+            # Logged out while recovering.
+            for entry in recovered:
+                entry.document.close()
+            return
+        self.finish_recovery(recovered, conflicts)
+        self.status_bar.config(text=f"Ready - Logged in as: {self.current_user}")
+        self.restore_session()
+
+    def finish_recovery(self, recovered, conflicts):
+        for entry in recovered:
+            tab = self.target_tab(entry.path)
+            self.close_document(tab)
+            tab.path = entry.path
+            tab.document = entry.document
+            self.journal.track(entry.document, entry.path, entry.edits)
+            if entry.document.source is not None:
+                if tab.text_area is None:
+                    tab.text_area = self.make_text_area()
+                tab.text_area.config(state=tk.NORMAL)
+                tab.large_view = LargeFileView(
+                    tab.text_area, entry.document.source, document=entry.document
+                )
+            self.show_tab(tab)
+        # Until the next flush the recovered text exists only in memory.
+        self.flush_journal(reschedule=False)
+        if conflicts:
+            messagebox.showwarning(
+                "Recover",
+                "These files changed on disk since the unsaved edits were made "
+                "and could not be recovered:\n" + "\n".join(conflicts),
+            )
+
+    def restore_session(self):
+        try:
+            session = self.sessions.load(self.current_user)
+        except sqlite3.Error:
+            return
+        if session is None:
+            return
+        if session.geometry:
+            self.root.geometry(session.geometry)
+        restored = {}
+        for position, (path, top, cursor) in enumerate(session.tabs):
+            # Files recovered from the journal already have their tab.
+            if not os.path.isfile(path) or self.tabs.find(path) is not None:
+                continue
+            tab = Tab(path)
+            if top is not None:
+                tab.view = (top, cursor)
+            restored[position] = tab
+        if not restored:
+            return
+
+        current = self.tab
+        if current.untouched:
+            self.discard_tab(current)
+            self.tabs.remove(current)
+        elif current.text_area is not None:
+            current.text_area.pack_forget()
+        for tab in restored.values():
+            self.tabs.activate(self.tabs.add(tab))
+        visible = restored.get(session.active, next(iter(restored.values())))
+        # Only the visible tab is read now; the rest are read ahead while
+        # they fit the memory budget, and the others when first shown.
+        self.show_tab(visible)
+        self.prefetch([tab for tab in restored.values() if tab is not visible])
+
+    def prefetch(self, tabs):
+        budget = self.tabs.memory_budget - self.tabs.resident_bytes()
+        for tab in tabs:
+            try:
+                size = os.path.getsize(tab.path)
+            except OSError:
+                continue
+            if size >= LARGE_FILE_THRESHOLD or size > budget:
+                continue
+            budget -= size
+            task = self.io.submit(EditorCore.load, tab.path, total=size)
+            self.prefetch_tasks.append((tab, task))
+        if self.prefetch_tasks and self.prefetch_job is None:
+            self.poll_prefetch()
+
+    def poll_prefetch(self):
+        pending = []
+        for tab, task in self.prefetch_tasks:
+            if not task.done():
+                pending.append((tab, task))
+                continue
+            try:
+                core = task.result()
+            except Exception:
+                # The tab reports the error when it is shown and read again.
+                continue
+            if tab in self.tabs and tab.document is None and tab.large_view is None:
+                tab.core = core
+                self.track_document(tab)
+            else:
+                core.close()
+        self.prefetch_tasks = pending
+        self.prefetch_job = None
+        if pending:
+            self.prefetch_job = self.root.after(self.IO_POLL_MS, self.poll_prefetch)
+
+    def cancel_prefetch(self):
+        if self.prefetch_job is not None:
+            self.root.after_cancel(self.prefetch_job)
+            self.prefetch_job = None
+        for _, task in self.prefetch_tasks:
+            task.cancel()
+        self.prefetch_tasks = []
 
+    def save_session(self):
+        if self.current_user is None or self.tab_bar is None:
+            return
+        tabs = []
+        active = None
+        for tab in self.tabs:
+            if tab.path is None:
+                continue
+            if tab is self.tab:
+                active = len(tabs)
+            top, cursor = tab.position or (None, None)
+            tabs.append((os.path.abspath(tab.path), top, cursor))
+        try:
+            self.sessions.save(self.current_user, self.root.geometry(), tabs, active)
+        except sqlite3.Error:
+            pass
+
+    def remember_file(self, file_path):
+        try:
+            self.sessions.add_recent(self.current_user, file_path)
+        except sqlite3.Error:
+            pass
+
+    def fill_recent_menu(self):
+        self.recent_menu.delete(0, tk.END)
+        try:
+            recent = self.sessions.recent(self.current_user)
+        except sqlite3.Error:
+            recent = []
+        for path in recent:
+            self.recent_menu.add_command(
+                label=path, command=lambda path=path: self.load_file(path)
+            )
+        if not recent:
+            self.recent_menu.add_command(label="(empty)", state=tk.DISABLED)
+
+    def flush_journal(self, reschedule=True):
+        try:
+            self.journal.flush()
+        except sqlite3.Error as e:
+            self.status_bar.config(text=f"Autosave failed: {e}")
+        if reschedule:
+            self.journal_job = self.root.after(
+                self.JOURNAL_FLUSH_MS, self.flush_journal
+            )
+
+    def stop_journal(self):
+        if self.journal_job is not None:
+            self.root.after_cancel(self.journal_job)
+            self.journal_job = None
+        if self.journal is not None:
+            try:
+                self.journal.close()
+            except sqlite3.Error:
+                pass
+            self.journal = None
+
+    @property
+    def tab(self):
+        return self.tabs.active
+
+    @property
+    def core(self):
+        # The active document's editing logic, apart from its widgets.
+        return self.tab.core
+
+    def setup_ui(self):
         self.menu_bar = tk.Menu(self.root)
 
         self.file_menu = tk.Menu(self.menu_bar, tearoff=0)
         self.file_menu.add_command(label="New", command=self.new_file)
         self.file_menu.add_command(label="Open", command=self.open_file)
+        self.recent_menu = tk.Menu(
+            self.file_menu, tearoff=0, postcommand=self.fill_recent_menu
+        )
+        self.file_menu.add_cascade(label="Open Recent", menu=self.recent_menu)
+        self.file_menu.add_command(label="Open Folder...", command=self.open_folder)
         self.file_menu.add_command(label="Save", command=self.save_file)
         self.file_menu.add_command(label="Save As", command=self.save_as_file)
+        self.file_menu.add_command(
+            label="Close Tab", accelerator="Ctrl+W", command=self.close_tab
+        )
+        self.file_menu.add_command(label="History...", command=self.show_history)
+        self.follow_var = tk.BooleanVar(self.root, False)
+        self.file_menu.add_checkbutton(
+            label="Follow File", variable=self.follow_var, command=self.toggle_follow
+        )
         self.file_menu.add_separator()
-        self.file_menu.add_command(label="Exit", command=self.root.quit)
+        self.file_menu.add_command(label="Exit", command=self.quit)
         self.menu_bar.add_cascade(label="File", menu=self.file_menu)
 
+        edit_menu = tk.Menu(self.menu_bar, tearoff=0)
+        edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        edit_menu.add_command(
+            label="Redo", accelerator="Ctrl+Shift+Z", command=self.redo
+        )
+        edit_menu.add_separator()
+        edit_menu.add_command(
+            label="Find...", accelerator="Ctrl+F", command=self.show_find
+        )
+        edit_menu.add_command(label="Find Next", accelerator="F3", command=self.find_next)
+        edit_menu.add_command(
+            label="Find Previous", accelerator="Shift+F3", command=self.find_previous
+        )
+        edit_menu.add_command(label="Replace All...", command=self.show_find)
+        self.menu_bar.add_cascade(label="Edit", menu=edit_menu)
+
         account_menu = tk.Menu(self.menu_bar, tearoff=0)
         account_menu.add_command(label="User Info", command=self.show_user_info)
         account_menu.add_command(label="Logout", command=self.logout)
@@ -54,19 +400,16 @@ class FileEditor:
         self.menu_bar.add_cascade(label="Help", menu=help_menu)
 
         self.root.config(menu=self.menu_bar)
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
+        self.root.bind("<Escape>", self.cancel_io)
+        self.root.bind("<Control-w>", lambda e: self.close_tab())
+        self.root.bind("<Control-Tab>", lambda e: self.cycle_tab(1))
+        self.root.bind("<Control-ISO_Left_Tab>", lambda e: self.cycle_tab(-1))
 
-        text_frame = tk.Frame(self.root)
-        text_frame.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
-
-        self.text_area = scrolledtext.ScrolledText(
-            text_frame,
-            wrap=tk.WORD,
-            width=80,
-            height=25,
-            font=("Consolas", 12),
-            undo=True,
-        )
-        self.text_area.pack(expand=True, fill=tk.BOTH)
+        self.tab_bar = TabBar(self.root, self.show_tab, self.close_tab)
+        self.tab_bar.frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        self.text_frame = tk.Frame(self.root)
+        self.text_frame.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
 
         self.status_bar = tk.Label(
             self.root,
@@ -77,20 +420,273 @@ class FileEditor:
         )
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
-    def new_file(self):
-        if self.text_area.get(1.0, tk.END).strip():
-            if messagebox.askyesno(
-                "New File", "Unsaved changes will be lost. Continue?"
-            ):
-                self.text_area.delete(1.0, tk.END)
-                self.current_file = None
-                self.status_bar.config(
-                    text=f"New file - Logged in as: {self.current_user}"
-                )
+        self.find_bar = FindBar(
+            self.root, self.find, self.find_next, self.find_previous, self.replace_all
+        )
+        self.root.bind("<F3>", lambda e: self.find_next())
+        self.root.bind("<Shift-F3>", lambda e: self.find_previous())
+
+        self.show_tab(self.tab)
+
+    def make_text_area(self):
+        text_area = scrolledtext.ScrolledText(
+            self.text_frame,
+            wrap=tk.WORD,
+            width=80,
+            height=25,
+            font=("Consolas", 12),
+        )
+        # Tk's own undo keeps every keystroke; the document's history is
+        # coalesced and capped instead.
+        text_area.bind("<<Undo>>", self.undo)
+        text_area.bind("<<Redo>>", self.redo)
+        text_area.bind("<Control-f>", self.show_find)
+        return text_area
+
+    def show_tab(self, tab, content=None):
+        # content, when given, is the already decoded text of tab.document.
+        previous = self.tab
+        if previous is not tab:
+            if previous is not None and previous.text_area is not None:
+                previous.text_area.pack_forget()
+            self.clear_search()
+            self.tabs.activate(tab)
+
+        if tab.text_area is None:
+            tab.text_area = self.make_text_area()
+        if tab.large_view is None:
+            if tab.document is None and tab.path is not None:
+                # The buffer was dropped to stay within the memory budget.
+                tab.text_area.config(state=tk.DISABLED)
+                self.read_file(tab.path)
+            elif tab.binding is None:
+                if tab.document is None:
+                    tab.document = Document.from_text("")
+                if content is None:
+                    content = tab.document.text()
+                self.bind_document(content)
+        tab.text_area.pack(expand=True, fill=tk.BOTH)
+        tab.text_area.focus_set()
+
+        self.enforce_tab_limits()
+        if self.tab_bar is not None:
+            self.tab_bar.render(self.tabs, tab)
+        if self.follow_var is not None:
+            self.follow_var.set(tab.follower is not None)
+
+    def bind_document(self, content):
+        tab = self.tab
+        tab.text_area.config(state=tk.NORMAL)
+        tab.binding = DocumentBinding(
+            tab.text_area, tab.document, on_edit=self.on_edit
+        )
+        tab.binding.load(content)
+        tab.document.history.limit = self.undo_memory
+        self.track_document(tab)
+        lexer = lexer_for(tab.path)
+        if lexer is not None:
+            tab.highlighter = SyntaxHighlighter(tab.text_area, lexer)
+            tab.binding.on_change = tab.highlighter.on_change
+        if tab.view is not None:
+            top, insert = tab.view
+            tab.view = None
+            tab.text_area.mark_set(tk.INSERT, insert)
+            tab.text_area.yview_moveto(top)
+
+    def track_document(self, tab):
+        if self.journal is not None and tab.document.journal is None:
+            self.journal.track(tab.document, tab.path)
+
+    def on_edit(self):
+        self.refresh_tab(self.tab)
+
+    def undo(self, event=None):
+        binding = self.tab.binding
+        if binding is not None and not binding.read_only:
+            self.core.undo(binding.splice)
+        return "break"
+
+    def redo(self, event=None):
+        binding = self.tab.binding
+        if binding is not None and not binding.read_only:
+            self.core.redo(binding.splice)
+        return "break"
+
+    def toggle_follow(self):
+        if self.tab.follower is None:
+            self.start_follow()
+        else:
+            self.stop_follow()
+        self.follow_var.set(self.tab.follower is not None)
+
+    def start_follow(self):
+        tab = self.tab
+        if tab.large_view is not None or tab.binding is None:
+            messagebox.showinfo(
+                "Follow File", "Follow is not available in the large-file view"
+            )
+            return
+        if tab.path is None or tab.modified:
+            messagebox.showinfo("Follow File", "Save the file before following it")
+            return
+        document = tab.document
+        if document.disk is not None:
+            key = document.disk[1]
         else:
-            self.text_area.delete(1.0, tk.END)
-            self.current_file = None
-            self.status_bar.config(text=f"New file - Logged in as: {self.current_user}")
+            key = file_key(os.stat(tab.path))
+        # Appended text is shown, not edited: the view is read only, and
+        # nothing is journaled or kept for undo while it grows.
+        self.forget_document(tab)
+        tab.binding.read_only = True
+        tab.follower = FileFollower(tab.path, key[2], key[:2], document.text_format)
+        tab.follow_version = document.version
+        tab.follower.start()
+        if self.follow_job is None:
+            self.follow_job = self.root.after(self.FOLLOW_UPDATE_MS, self.poll_follow)
+        self.status_bar.config(
+            text=f"Following {tab.path} - Logged in as: {self.current_user}"
+        )
+
+    def stop_follow(self):
+        tab = self.tab
+        if tab.document.version == tab.follow_version:
+            tab.follower.stop()
+            tab.follower = None
+            tab.binding.read_only = False
+            self.track_document(tab)
+            self.status_bar.config(
+                text=f"Stopped following - Logged in as: {self.current_user}"
+            )
+            return
+        # What is shown may have lost lines to the cap; editing starts again
+        # from the file as it is now, and the tab stays read only until the
+        # re-read replaces its binding.
+        if self.io_busy():
+            return
+        tab.follower.stop()
+        tab.follower = None
+        self.read_file(tab.path)
+
+    def poll_follow(self):
+        self.follow_job = None
+        following = [tab for tab in self.tabs if tab.follower is not None]
+        for tab in following:
+            self.follow_batch(tab, *tab.follower.take())
+        if following:
+            self.follow_job = self.root.after(self.FOLLOW_UPDATE_MS, self.poll_follow)
+
+    def follow_batch(self, tab, reset, text):
+        if not reset and not text:
+            return
+        document = tab.document
+        binding = tab.binding
+        at_end = tab.text_area.yview()[1] >= 1.0
+        if reset:
+            binding.replace_range(0, len(document), "")
+        if text:
+            binding.replace_range(len(document), 0, text)
+        excess = document.line_count - self.follow_lines
+        if excess > 0:
+            binding.replace_range(0, document.line_start(excess), "")
+        table = document.table
+        held = len(table.original.data) + len(table.added.data)
+        if held > COMPACT_RATIO * len(document) + COMPACT_SLACK_BYTES:
+            document.compact()
+        document.history.clear()
+        document.saved_version = document.version
+        document.disk = None
+        if at_end:
+            tab.text_area.see(tk.END)
+
+    def refresh_tab(self, tab):
+        if self.tab_bar is not None:
+            self.tab_bar.refresh(tab)
+
+    def enforce_tab_limits(self):
+        for tab in self.tabs.widgets_to_release():
+            self.release_widget(tab)
+        for tab in self.tabs.buffers_to_drop():
+            self.forget_document(tab)
+            tab.document.close()
+            tab.document = None
+
+    def release_widget(self, tab):
+        # The document stays; the widget is rebuilt when the tab is shown.
+        text_area = tab.text_area
+        tab.view = tab.position
+        if tab.highlighter is not None:
+            tab.highlighter.detach()
+            tab.highlighter = None
+        if tab.binding is not None:
+            tab.binding.detach()
+            tab.binding = None
+        text_area.destroy()
+        tab.text_area = None
+
+    def close_document(self, tab=None):
+        tab = tab or self.tab
+        if tab.follower is not None:
+            tab.follower.stop()
+            tab.follower = None
+        if tab.highlighter is not None:
+            tab.highlighter.detach()
+            tab.highlighter = None
+        if tab.binding is not None:
+            tab.binding.detach()
+            tab.binding = None
+        if tab.large_view is not None:
+            tab.large_view.detach()
+            tab.large_view = None
+        if tab.document is not None:
+            self.forget_document(tab)
+            tab.document.close()
+            tab.document = None
+
+    def forget_document(self, tab):
+        if self.journal is not None:
+            try:
+                self.journal.forget(tab.document)
+            except sqlite3.Error:
+                pass
+
+    def discard_tab(self, tab):
+        self.close_document(tab)
+        if tab.text_area is not None:
+            tab.text_area.destroy()
+            tab.text_area = None
+
+    def target_tab(self, file_path):
+        # Where a file being opened goes: its own tab if it is already open,
+        # else the active tab while it is still empty, else a new tab.
+        tab = self.tabs.find(file_path) if file_path else None
+        if tab is None:
+            tab = self.tab if self.tab.untouched else self.tabs.add(Tab())
+        return tab
+
+    def close_tab(self, tab=None):
+        tab = tab or self.tab
+        if self.io_busy():
+            return
+        if tab.modified and not messagebox.askyesno(
+            "Close Tab", f"{tab.title} has unsaved changes. Close it anyway?"
+        ):
+            return
+        self.discard_tab(tab)
+        successor = self.tabs.remove(tab)
+        if self.tab is None:
+            self.show_tab(successor or self.tabs.add(Tab()))
+        elif self.tab_bar is not None:
+            self.tab_bar.render(self.tabs, self.tab)
+
+    def cycle_tab(self, step):
+        tab = self.tabs.neighbour(step)
+        if tab is not self.tab:
+            self.show_tab(tab)
+        return "break"
+
+    def new_file(self):
+        self.show_tab(self.tabs.add(Tab()))
+        self.status_bar.config(text=f"New file - Logged in as: {self.current_user}")
 
     def open_file(self):
         file_path = filedialog.askopenfilename(
@@ -102,36 +698,583 @@ class FileEditor:
             ]
         )
         if file_path:
+            self.load_file(file_path)
+
+    def load_file(self, file_path, position=None):
+        # position is an optional (line, column) to show once it is loaded.
+        tab = self.tabs.find(file_path)
+        if tab is not None and (
+            tab.document is not None or tab.large_view is not None
+        ):
+            self.show_tab(tab)
+            if position is not None:
+                self.go_to(*position)
+            return
+        self.read_file(file_path, position)
+
+    def read_file(self, file_path, position=None):
+        if self.io_busy():
+            return
+        try:
+            size = os.path.getsize(file_path)
+            if size >= LARGE_FILE_THRESHOLD:
+                self.open_large_file(file_path)
+                if position is not None:
+                    self.go_to(*position)
+                return
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open file:\n{str(e)}")
+            return
+        self.run_io(
+            f"Opening {file_path}",
+            EditorCore.load,
+            file_path,
+            total=size,
+            on_done=lambda core: self.finish_open(file_path, core, position),
+            error="Failed to open file",
+            probe="open_file",
+        )
+
+    @PROBES.timed("open_file.show")
+    def finish_open(self, file_path, core, position=None):
+        tab = self.target_tab(file_path)
+        self.close_document(tab)
+        tab.path = file_path
+        tab.core = core
+        self.show_tab(tab)
+        self.remember_file(file_path)
+        text_format = core.document.text_format
+        label = "" if text_format.native else f" ({text_format.label})"
+        self.status_bar.config(
+            text=f"Opened: {file_path}{label} - Logged in as: {self.current_user}"
+        )
+        if position is not None:
+            self.go_to(*position)
+
+    def go_to(self, line, column=0):
+        if self.large_view is not None:
+            self.large_view.show_line(line)
+        index = f"{line - self.first_line() + 1}.{column}"
+        self.text_area.mark_set(tk.INSERT, index)
+        self.text_area.see(index)
+        self.text_area.focus_set()
+
+    def open_folder(self):
+        folder = filedialog.askdirectory()
+        if not folder:
+            return
+        if self.grep_panel is not None:
+            self.grep_panel.close()
+        self.grep_panel = GrepPanel(
+            self.root,
+            folder,
+            self.search_folder,
+            lambda path, line, column: self.load_file(path, (line, column)),
+            self.on_grep_panel_closed,
+        )
+
+    def search_folder(self):
+        panel = self.grep_panel
+        spec = panel.spec
+        if not spec[0]:
+            return
+        if spec[1]:
             try:
-                with open(file_path, "r", encoding="utf-8") as file:
-                    content = file.read()
-                    self.text_area.delete(1.0, tk.END)
-                    self.text_area.insert(tk.END, content)
-                    self.current_file = file_path
-                    self.status_bar.config(
-                        text=f"Opened: {file_path} - Logged in as: {self.current_user}"
-                    )
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to open file:\n{str(e)}")
-
-    def save_file(self):
-        if not self.current_file:
-            self.save_as_file()
+                re.compile(spec[0])
+            except re.error as e:
+                panel.set_status(f"Invalid pattern: {e}")
+                return
+        self.cancel_grep()
+        if self.grep_executor is None:
+            # Imported on first use; spawned workers avoid forking a process
+            # that already runs Tk and I/O threads.
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            self.grep_executor = ProcessPoolExecutor(
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        panel.clear()
+        results = GrepResults()
+        task = self.io.submit(
+            grep_folder,
+            panel.folder,
+            spec,
+            results,
+            default_index_path(),
+            self.grep_executor,
+        )
+        self.grep_job = (task, results)
+        self.poll_grep(task)
+
+    def poll_grep(self, task):
+        if self.grep_job is None or self.grep_job[0] is not task:
+            return
+        _, results = self.grep_job
+        panel = self.grep_panel
+        panel.add_rows(results.since(len(panel.rows)))
+        summary = (
+            f"{len(results.items)} matches in {results.files_searched} files searched"
+            f" ({results.files_skipped} of {results.files_total} ruled out by the index)"
+        )
+        if not task.done():
+            panel.set_status(f"Searching... {summary}")
+            self.root.after(self.IO_POLL_MS, self.poll_grep, task)
             return
+
+        self.grep_job = None
         try:
-            with open(self.current_file, "w", encoding="utf-8") as file:
-                content = self.text_area.get(1.0, tk.END)
-                if content.endswith("\n"):
-                    content = content[:-1]
-                file.write(content)
-                self.status_bar.config(
-                    text=f"Saved: {self.current_file} - Logged in as: {self.current_user}"
+            task.result()
+        except Cancelled:
+            panel.set_status(f"Cancelled: {summary}")
+            return
+        except Exception as e:
+            panel.set_status(f"Search failed: {e}")
+            return
+        panel.set_status(summary)
+
+    def cancel_grep(self):
+        if self.grep_job is not None:
+            self.grep_job[0].cancel()
+            self.grep_job = None
+
+    def on_grep_panel_closed(self):
+        self.cancel_grep()
+        self.grep_panel = None
+
+    @PROBES.timed("open_large_file")
+    def open_large_file(self, file_path):
+        try:
+            index = open_index(file_path)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Failed to open file:\n{str(e)}")
+            return
+        key = fingerprint(index.buffer, index.stat)
+        try:
+            offsets = self.sessions.cached_offsets(file_path, key)
+        except sqlite3.Error:
+            offsets = None
+        if offsets is not None:
+            index.adopt(offsets)
+        tab = self.target_tab(file_path)
+        self.close_document(tab)
+        tab.path = file_path
+        if tab.text_area is None:
+            tab.text_area = self.make_text_area()
+        tab.text_area.config(state=tk.NORMAL)
+
+        def on_progress(progress):
+            state = "Indexed" if progress >= 1 else f"Indexing {progress:.0%}"
+            self.status_bar.config(
+                text=f"Opened: {file_path} ({state}) - Logged in as: {self.current_user}"
+            )
+
+        def on_ready(document):
+            tab.document = document
+            self.track_document(tab)
+            if offsets is None:
+                self.io.submit(
+                    self.sessions.cache_offsets, file_path, key, index.offsets
                 )
-                messagebox.showinfo("Success", "File saved successfully!")
+
+        tab.large_view = LargeFileView(tab.text_area, index, on_progress, on_ready)
+        self.show_tab(tab)
+        self.remember_file(file_path)
+
+    def save_refused(self):
+        # A followed tab shows only the tail of a file that is still being
+        # written; saving it would replace the whole file with that tail.
+        if not self.tab.read_only:
+            return False
+        messagebox.showinfo("Save", "Stop following the file before saving it")
+        return True
+
+    def save_file(self, file_path=None):
+        if self.document is None:
+            messagebox.showerror("Error", "The file is still loading")
+            return
+        if self.save_refused():
+            return
+        file_path = file_path or self.current_file
+        if not file_path:
+            self.save_as_file()
+            return
+        if self.io_busy():
+            return
+        document = self.document
+        job, total = self.core.save_job(file_path)
+        checkpoint = None
+        if self.journal is not None:
+            checkpoint = self.journal.checkpoint(document)
+        self.run_io(
+            f"Saving {file_path}",
+            job,
+            total=total,
+            on_done=lambda saved: self.finish_save(
+                file_path, document, saved, checkpoint
+            ),
+            error="Failed to save file",
+            probe="save_file",
+            on_error=lambda e: self.save_failed(file_path, document, e),
+        )
+        self.current_file = file_path
+
+    def finish_save(self, file_path, document, saved, checkpoint=None):
+        tab = next((tab for tab in self.tabs if tab.document is document), None)
+        if tab is None:
+            return
+        document.mark_saved(saved)
+        if self.journal is not None:
+            self.journal.saved(document, file_path, checkpoint)
+        self.refresh_tab(tab)
+        self.remember_file(file_path)
+        self.record_version(file_path, len(document))
+        stats = saved.stats
+        rate = ""
+        if stats.bytes_written >= THROUGHPUT_REPORT_BYTES:
+            rate = f" ({stats.megabytes:.1f} MB at {stats.throughput:.1f} MB/s)"
+        elif saved.patched:
+            rate = f" (patched {stats.bytes_written} bytes in place)"
+        self.status_bar.config(
+            text=f"Saved: {file_path}{rate} - Logged in as: {self.current_user}"
+        )
+        messagebox.showinfo("Success", "File saved successfully!")
+
+    def save_failed(self, file_path, document, error):
+        # Text the file's encoding cannot hold: offer UTF-8 with the same
+        # line ends rather than leaving the document unsaveable.
+        if not isinstance(error, UnicodeEncodeError):
+            return False
+        text_format = document.text_format
+        utf8 = TextFormat("utf-8", b"", text_format.newline)
+        if not messagebox.askyesno(
+            "Encoding",
+            f"Some characters cannot be saved as {text_format.encoding}.\n\n"
+            f"Save the file as {utf8.label} instead?",
+        ):
+            self.status_bar.config(
+                text=f"Not saved: {file_path} - Logged in as: {self.current_user}"
+            )
+            return True
+        document.convert(utf8)
+        if document is self.document:
+            self.save_file(file_path)
+        return True
+
+    def record_version(self, file_path, size):
+        # Runs alongside editing; it only reads the file just written.
+        task = self.io.submit(
+            self.history.record, file_path, self.current_user, total=size
+        )
+        self.poll_history(task, file_path)
+
+    def poll_history(self, task, file_path):
+        if not task.done():
+            self.root.after(self.IO_POLL_MS, self.poll_history, task, file_path)
+            return
+        try:
+            report = task.result()
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save file:\n{str(e)}")
+            self.status_bar.config(text=f"History not recorded for {file_path}: {e}")
+            return
+        self.status_bar.config(
+            text=f"Saved: {file_path} - version {report.version_id} added "
+            f"{report.added_bytes / 1024:.1f} KB ({report.new_chunks} of "
+            f"{report.chunk_count} chunks new) in {report.seconds:.2f} s"
+            f" - Logged in as: {self.current_user}"
+        )
+        window = self.history_window
+        if window is not None and window.path == os.path.abspath(file_path):
+            window.refresh()
+
+    def show_history(self):
+        if not self.current_file:
+            messagebox.showinfo("History", "Save the file to start its history")
+            return
+        if self.history_window is not None:
+            self.history_window.close()
+        self.history_window = HistoryWindow(
+            self.root,
+            self.history,
+            os.path.abspath(self.current_file),
+            self.diff_versions,
+            self.restore_version,
+            self.on_history_closed,
+        )
+
+    def on_history_closed(self):
+        self.history_window = None
+
+    def diff_versions(self, old_id, new_id):
+        if self.io_busy():
+            return
+        self.run_io(
+            f"Comparing versions {old_id} and {new_id}",
+            lambda task: list(
+                islice(self.history.diff(old_id, new_id), MAX_DIFF_LINES)
+            ),
+            total=0,
+            on_done=lambda lines: DiffWindow(
+                self.root, f"Version {old_id} to {new_id}", lines
+            ),
+            error="Failed to compare versions",
+        )
+
+    def restore_version(self, path, version_id, size):
+        if self.io_busy():
+            return
+        tab = self.tabs.find(path)
+        warning = " Unsaved changes to it will be lost." if tab and tab.modified else ""
+        if not messagebox.askyesno(
+            "Restore", f"Replace {path} with version {version_id}?{warning}"
+        ):
+            return
+        self.run_io(
+            f"Restoring version {version_id}",
+            self.history.restore,
+            version_id,
+            path,
+            total=size,
+            on_done=lambda stats: self.finish_restore(path, version_id),
+            error="Failed to restore version",
+        )
+
+    def finish_restore(self, path, version_id):
+        tab = self.tabs.find(path)
+        if tab is not None:
+            # Dropping the document makes the tab read the file back.
+            self.close_document(tab)
+            if tab is self.tab:
+                self.show_tab(tab)
+        self.status_bar.config(
+            text=f"Restored version {version_id} of {path}"
+            f" - Logged in as: {self.current_user}"
+        )
+
+    def io_busy(self):
+        if self.io_job is None:
+            return False
+        messagebox.showinfo("Busy", "Please wait for the current operation to finish")
+        return True
+
+    def run_io(
+        self, label, function, *args, total, on_done, error, probe=None, on_error=None
+    ):
+        # probe names the latency histogram for the worker's share of the job;
+        # on_error gets the exception first and returns True if it handled it.
+        if probe is not None:
+            function = PROBES.timed(probe)(function)
+        task = self.io.submit(function, *args, total=total)
+        self.io_job = (task, label, on_done, error, on_error)
+        self.poll_io()
+
+    def poll_io(self):
+        task, label, on_done, error, on_error = self.io_job
+        if not task.done():
+            self.status_bar.config(
+                text=f"{label}... {task.progress:.0%} (Esc to cancel)"
+            )
+            self.root.after(self.IO_POLL_MS, self.poll_io)
+            return
+
+        self.io_job = None
+        try:
+            result = task.result()
+        except Cancelled:
+            self.status_bar.config(
+                text=f"{label} cancelled - Logged in as: {self.current_user}"
+            )
+            return
+        except Exception as e:
+            if on_error is None or not on_error(e):
+                messagebox.showerror("Error", f"{error}:\n{str(e)}")
+            return
+        on_done(result)
+
+    def cancel_io(self, event=None):
+        if self.io_job is not None:
+            self.io_job[0].cancel()
+        if self.search_job is not None:
+            self.search_job[0].cancel()
+
+    def clear_search(self):
+        if self.search_job is not None:
+            self.search_job[0].cancel()
+            self.search_job = None
+
+    def show_find(self, event=None):
+        self.find_bar.show(after=self.status_bar)
+        return "break"
+
+    def find_job(self, query):
+        # (job, result, total bytes) searching whatever the editor is showing.
+        if self.document is not None:
+            return self.core.search_job(query)
+        if self.large_view is not None:
+            # Still indexing, so there is no document yet: search the mapping.
+            index = self.large_view.index
+            result = SearchResult(None)
+            snapshot = [(index.buffer, 0, index.size)]
+            job = partial(search, snapshot, query, index.encoding, result)
+            return job, result, index.size
+        return None
+
+    def find(self, then="next"):
+        try:
+            query = self.find_bar.query()
+        except re.error as e:
+            self.status_bar.config(text=f"Invalid pattern: {e}")
+            return
+        source = self.find_job(query) if query.pattern else None
+        if source is None:
+            return
+        if self.search_job is not None:
+            self.search_job[0].cancel()
+
+        job, result, total = source
+        task = self.io.submit(job, total=total)
+        self.search_job = (task, result, query)
+        self.poll_search(task, then)
+
+    def poll_search(self, task, then):
+        if self.search_job is None or self.search_job[0] is not task:
+            return
+        _, result, query = self.search_job
+        if not task.done():
+            self.status_bar.config(
+                text=f"Searching... {len(result)} matches so far "
+                f"({task.progress:.0%}, Esc to cancel)"
+            )
+            self.root.after(self.IO_POLL_MS, self.poll_search, task, then)
+            return
+
+        try:
+            task.result()
+        except Cancelled:
+            self.search_job = None
+            self.status_bar.config(
+                text=f"Search cancelled - Logged in as: {self.current_user}"
+            )
+            return
+        except Exception as e:
+            self.search_job = None
+            messagebox.showerror("Error", f"Search failed:\n{str(e)}")
+            return
+        if not len(result):
+            self.status_bar.config(
+                text=f"No matches for '{query.pattern}' - Logged in as: {self.current_user}"
+            )
+            return
+        self.step_match(then)
+
+    def search_is_current(self):
+        if self.search_job is None:
+            return False
+        task, result, query = self.search_job
+        try:
+            current = self.find_bar.query()
+        except re.error:
+            return False
+        version = self.document.version if self.document is not None else None
+        return (current.pattern, current.regex, current.match_case) == (
+            query.pattern,
+            query.regex,
+            query.match_case,
+        ) and result.version == version
+
+    def find_next(self):
+        self.step_match("next")
+
+    def find_previous(self):
+        self.step_match("previous")
+
+    def step_match(self, direction):
+        if not self.search_is_current():
+            self.find(direction)
+            return
+        task, result, _ = self.search_job
+        if not len(result):
+            if task.done():
+                self.find(direction)
+            # Otherwise poll_search steps once the first matches come in.
+            return
+        line, column = self.cursor_position(direction)
+        if direction == "next":
+            i = result.next_after(line, column)
+        else:
+            i = result.previous_before(line, column)
+        if i is not None:
+            self.show_match(result, i)
+
+    def first_line(self):
+        return self.large_view.first_line if self.large_view is not None else 0
+
+    def cursor_position(self, direction):
+        # Searches are relative to the selected match, so repeated Find Next
+        # moves on; without a selection a match at the cursor itself counts.
+        selected = bool(self.text_area.tag_ranges(tk.SEL))
+        index = self.text_area.index(tk.SEL_FIRST if selected else tk.INSERT)
+        line, column = map(int, index.split("."))
+        if not selected and direction == "next":
+            column -= 1
+        return self.first_line() + line - 1, column
+
+    def show_match(self, result, i):
+        line, column, length = result[i]
+        if self.large_view is not None:
+            self.large_view.show_line(line)
+        start = f"{line - self.first_line() + 1}.{column}"
+        end = f"{start}+{length}c"
+        self.text_area.tag_remove(tk.SEL, "1.0", tk.END)
+        self.text_area.tag_add(tk.SEL, start, end)
+        self.text_area.mark_set(tk.INSERT, start)
+        self.text_area.see(start)
+        more = "" if result.complete else "+"
+        self.status_bar.config(
+            text=f"Match {i + 1} of {len(result)}{more} - Logged in as: {self.current_user}"
+        )
+
+    def replace_all(self):
+        if self.large_view is not None:
+            messagebox.showinfo(
+                "Replace All", "Replace All is not available in the large-file view"
+            )
+            return
+        try:
+            query = self.find_bar.query()
+        except re.error as e:
+            self.status_bar.config(text=f"Invalid pattern: {e}")
+            return
+        if not query.pattern or self.document is None or self.io_busy():
+            return
+        document = self.document
+        job, version = self.core.replace_job(query, self.find_bar.replacement)
+        self.run_io(
+            "Replacing",
+            job,
+            total=len(document),
+            on_done=lambda replaced: self.finish_replace_all(
+                document, version, *replaced
+            ),
+            error="Replace All failed",
+        )
+
+    def finish_replace_all(self, document, version, text, count):
+        if document is not self.document or document.version != version:
+            self.status_bar.config(
+                text="Replace All skipped: the document changed while it ran"
+            )
+            return
+        if count:
+            # One widget edit: a single undo step and a single document edit.
+            self.text_area.replace("1.0", "end-1c", text)
+        self.status_bar.config(
+            text=f"Replaced {count} matches - Logged in as: {self.current_user}"
+        )
 
     def save_as_file(self):
+        if self.save_refused():
+            return
         file_path = filedialog.asksaveasfilename(
             defaultextension=".txt",
             filetypes=[
@@ -142,22 +1285,68 @@ class FileEditor:
             ],
         )
         if file_path:
-            self.current_file = file_path
-            self.save_file()
+            self.save_file(file_path)
 
     def show_user_info(self):
         info = f"Current User: {self.current_user}\nCurrent File: {self.current_file or 'None'}"
         messagebox.showinfo("User Information", info)
 
     def logout(self):
+        if self.io_busy():
+            return
         if messagebox.askyesno("Logout", "Are you sure you want to logout?"):
+            self.save_session()
+            self.cancel_prefetch()
             self.root.withdraw()
+            self.root.title("File Editor - Please Login")
+            if self.grep_panel is not None:
+                self.grep_panel.close()
+            if self.history_window is not None:
+                self.history_window.close()
+            self.find_bar.hide()
+            self.clear_search()
+            # Unsaved documents stay journaled for the next login.
+            self.stop_journal()
+            for tab in list(self.tabs):
+                self.discard_tab(tab)
+                self.tabs.remove(tab)
+            self.tabs.activate(self.tabs.add(Tab()))
             self.current_user = None
-            self.current_file = None
-            self.root.config(menu=tk.Menu(self.root))
-            LoginWindow(self.root, self.on_login_success)
+            self.status_bar.config(text="")
+            self.login_window.show()
+
+    def quit(self):
+        self.save_session()
+        self.root.quit()
+
+    def close(self):
+        if self.lag_job is not None:
+            try:
+                self.root.after_cancel(self.lag_job)
+            except tk.TclError:
+                # The root window may already be destroyed.
+                pass
+            self.lag_job = None
+        if self.follow_job is not None:
+            try:
+                self.root.after_cancel(self.follow_job)
+            except tk.TclError:
+                pass
+            self.follow_job = None
+        for tab in self.tabs:
+            if tab.follower is not None:
+                tab.follower.stop()
+        self.stop_journal()
+        self.cancel_grep()
+        self.io.shutdown()
+        if self.grep_executor is not None:
+            self.grep_executor.shutdown(wait=False, cancel_futures=True)
+        self.db.close()
 
     def open_about_window(self):
+        # psutil and the chart code are only needed once About is opened.
+        from gui.about import AboutWindow
+
         about_root = tk.Toplevel(self.root)
         about_root.title("About System")
         AboutWindow(about_root)
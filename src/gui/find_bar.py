@@ -0,0 +1,64 @@
+import tkinter as tk
+from core.search import SearchQuery
+
+
+class FindBar:
+    def __init__(self, parent, on_find, on_next, on_previous, on_replace_all):
+        self.frame = tk.Frame(parent, bd=1, relief=tk.GROOVE)
+
+        tk.Label(self.frame, text="Find:").pack(side=tk.LEFT, padx=(5, 2))
+        self.find_entry = tk.Entry(self.frame, width=25)
+        self.find_entry.pack(side=tk.LEFT)
+
+        tk.Label(self.frame, text="Replace:").pack(side=tk.LEFT, padx=(10, 2))
+        self.replace_entry = tk.Entry(self.frame, width=20)
+        self.replace_entry.pack(side=tk.LEFT)
+
+        self.regex_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.frame, text="Regex", variable=self.regex_var).pack(
+            side=tk.LEFT, padx=(10, 0)
+        )
+        self.case_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(self.frame, text="Match case", variable=self.case_var).pack(
+            side=tk.LEFT
+        )
+
+        tk.Button(self.frame, text="Find", command=on_find).pack(side=tk.LEFT, padx=2)
+        tk.Button(self.frame, text="Next", command=on_next).pack(side=tk.LEFT, padx=2)
+        tk.Button(self.frame, text="Previous", command=on_previous).pack(
+            side=tk.LEFT, padx=2
+        )
+        tk.Button(self.frame, text="Replace All", command=on_replace_all).pack(
+            side=tk.LEFT, padx=2
+        )
+        tk.Button(self.frame, text="✕", relief=tk.FLAT, command=self.hide).pack(
+            side=tk.RIGHT, padx=2
+        )
+
+        self.find_entry.bind("<Return>", lambda e: on_next())
+        self.find_entry.bind("<Shift-Return>", lambda e: on_previous())
+        for widget in (self.find_entry, self.replace_entry):
+            widget.bind("<Escape>", lambda e: self.hide())
+
+    @property
+    def visible(self):
+        return bool(self.frame.winfo_manager())
+
+    def show(self, **pack_options):
+        if not self.visible:
+            self.frame.pack(side=tk.BOTTOM, fill=tk.X, **pack_options)
+        self.find_entry.focus_set()
+        self.find_entry.select_range(0, tk.END)
+
+    def hide(self):
+        self.frame.pack_forget()
+
+    def query(self):
+        # Raises re.error for an invalid regular expression.
+        return SearchQuery(
+            self.find_entry.get(), self.regex_var.get(), self.case_var.get()
+        )
+
+    @property
+    def replacement(self):
+        return self.replace_entry.get()
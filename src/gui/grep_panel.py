@@ -0,0 +1,89 @@
+import os
+import tkinter as tk
+
+
+class GrepPanel:
+    MAX_ROWS = 10000
+
+    def __init__(self, parent, folder, on_search, on_open, on_close):
+        self.folder = folder
+        self.on_open = on_open
+        self.on_close = on_close
+        self.rows = []
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"Search in {folder}")
+        self.window.geometry("700x450")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        form = tk.Frame(self.window)
+        form.pack(fill=tk.X, padx=5, pady=5)
+
+        self.pattern_entry = tk.Entry(form, width=40)
+        self.pattern_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.pattern_entry.bind("<Return>", lambda e: on_search())
+
+        self.regex_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(form, text="Regex", variable=self.regex_var).pack(side=tk.LEFT)
+        self.case_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(form, text="Match case", variable=self.case_var).pack(
+            side=tk.LEFT
+        )
+        tk.Button(form, text="Search", command=on_search).pack(side=tk.LEFT, padx=5)
+
+        list_frame = tk.Frame(self.window)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=5)
+        scrollbar = tk.Scrollbar(list_frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox = tk.Listbox(
+            list_frame, font=("Consolas", 10), yscrollcommand=scrollbar.set
+        )
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.listbox.yview)
+        self.listbox.bind("<Double-Button-1>", self.open_selected)
+        self.listbox.bind("<Return>", self.open_selected)
+
+        self.status_label = tk.Label(self.window, text="", anchor=tk.W)
+        self.status_label.pack(fill=tk.X, padx=5, pady=2)
+
+        self.pattern_entry.focus_set()
+
+    @property
+    def spec(self):
+        return (
+            self.pattern_entry.get(),
+            self.regex_var.get(),
+            self.case_var.get(),
+        )
+
+    def clear(self):
+        self.rows = []
+        self.listbox.delete(0, tk.END)
+
+    def add_rows(self, items):
+        # One Listbox insert per poll rather than one per match.
+        room = self.MAX_ROWS - len(self.rows)
+        items = items[:room]
+        if not items:
+            return
+        self.rows.extend(items)
+        self.listbox.insert(
+            tk.END,
+            *(
+                f"{os.path.relpath(path, self.folder)}:{line + 1}: {text}"
+                for path, line, _, text in items
+            ),
+        )
+
+    def set_status(self, text):
+        self.status_label.config(text=text)
+
+    def open_selected(self, event=None):
+        selection = self.listbox.curselection()
+        if selection:
+            path, line, column, _ = self.rows[selection[0]]
+            self.on_open(path, line, column)
+
+    def close(self):
+        self.on_close()
+        self.window.destroy()
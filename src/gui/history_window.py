@@ -0,0 +1,101 @@
+import os
+import tkinter as tk
+from tkinter import scrolledtext
+
+
+class HistoryWindow:
+    def __init__(self, parent, history, path, on_diff, on_restore, on_close):
+        self.history = history
+        self.path = path
+        self.on_diff = on_diff
+        self.on_restore = on_restore
+        self.on_close = on_close
+        self.versions = []
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"History of {os.path.basename(path)}")
+        self.window.geometry("600x350")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        list_frame = tk.Frame(self.window)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        scrollbar = tk.Scrollbar(list_frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox = tk.Listbox(
+            list_frame, font=("Consolas", 10), yscrollcommand=scrollbar.set
+        )
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.listbox.yview)
+        self.listbox.bind("<Double-Button-1>", lambda e: self.diff_selected())
+
+        buttons = tk.Frame(self.window)
+        buttons.pack(fill=tk.X, padx=5)
+        tk.Button(
+            buttons, text="Diff with Previous", command=self.diff_selected
+        ).pack(side=tk.LEFT, padx=2)
+        tk.Button(buttons, text="Restore", command=self.restore_selected).pack(
+            side=tk.LEFT, padx=2
+        )
+        tk.Button(buttons, text="Close", command=self.close).pack(
+            side=tk.RIGHT, padx=2
+        )
+
+        self.summary = tk.Label(self.window, text="", anchor=tk.W)
+        self.summary.pack(fill=tk.X, padx=5, pady=2)
+        self.refresh()
+
+    def refresh(self):
+        self.versions = self.history.versions(self.path)
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(
+            tk.END,
+            *(
+                f"#{version_id:<5} {created_at}  {size:>12,} bytes"
+                f"  +{added / 1024:.1f} KB in {seconds:.2f} s"
+                for version_id, created_at, size, added, seconds in self.versions
+            ),
+        )
+        stored, logical = self.history.storage()
+        self.summary.config(
+            text=f"{len(self.versions)} versions - all history uses "
+            f"{stored / (1024 * 1024):.1f} MB for "
+            f"{logical / (1024 * 1024):.1f} MB of saved versions"
+        )
+
+    def selected(self):
+        selection = self.listbox.curselection()
+        return selection[0] if selection else None
+
+    def diff_selected(self):
+        i = self.selected()
+        # Versions are listed newest first.
+        if i is not None and i + 1 < len(self.versions):
+            self.on_diff(self.versions[i + 1][0], self.versions[i][0])
+
+    def restore_selected(self):
+        i = self.selected()
+        if i is not None:
+            version_id, _, size, _, _ = self.versions[i]
+            self.on_restore(self.path, version_id, size)
+
+    def close(self):
+        self.on_close()
+        self.window.destroy()
+
+
+class DiffWindow:
+    COLORS = {"+": "#067d17", "-": "#c00000", "@": "#1750eb"}
+
+    def __init__(self, parent, title, lines):
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        self.window.geometry("800x500")
+        text_area = scrolledtext.ScrolledText(
+            self.window, wrap=tk.NONE, font=("Consolas", 10)
+        )
+        text_area.pack(fill=tk.BOTH, expand=True)
+        for prefix, color in self.COLORS.items():
+            text_area.tag_configure(prefix, foreground=color)
+        for line in lines:
+            text_area.insert(tk.END, line + "\n", line[:1])
+        text_area.config(state=tk.DISABLED)
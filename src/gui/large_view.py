@@ -0,0 +1,147 @@
+import tkinter as tk
+from core.document import Document
+from core.metrics import PROBES
+from gui.document_binding import DocumentBinding
+
+
+class LargeFileView:
+    WINDOW_LINES = 3000
+    EDGE_LINES = 300
+    POLL_MS = 100
+
+    def __init__(
+        self, text_area, index, on_progress=None, on_ready=None, document=None
+    ):
+        # document, when given, is one already built on the finished index.
+        self.text_area = text_area
+        self.index = index
+        self.source = index if document is None else document
+        self.document = document
+        self.binding = None
+        self.on_progress = on_progress
+        self.on_ready = on_ready
+        self.first_line = 0
+        self.last_line = 0
+        self.at_end = False
+        self._shift_pending = False
+        self._poll_id = None
+
+        self.text_area.vbar.config(command=self.on_scrollbar)
+        self.text_area.config(yscrollcommand=self.on_text_scroll)
+
+        self.index.start()
+        self.load_window(0)
+        self.poll_index()
+
+    @PROBES.timed("redraw.large_view")
+    def load_window(self, first):
+        total = self.source.line_count
+        first = max(0, min(first, total - self.WINDOW_LINES))
+        last = min(first + self.WINDOW_LINES, total)
+        content = self.source.get_text(first, last)
+
+        if self.binding is not None:
+            self.binding.first_line = first
+            self.binding.load(content)
+        else:
+            self.text_area.config(state=tk.NORMAL)
+            self.text_area.delete(1.0, tk.END)
+            self.text_area.insert(tk.END, content)
+            self.text_area.config(state=tk.DISABLED)
+
+        self.first_line = first
+        self.last_line = last
+        self.at_end = last == total
+
+    def show_line(self, line):
+        if not self.first_line <= line < self.last_line:
+            self.load_window(line - self.WINDOW_LINES // 2)
+        self.text_area.yview(f"{line - self.first_line + 1}.0")
+
+    def poll_index(self):
+        if self.on_progress is not None:
+            self.on_progress(self.index.progress)
+
+        if self.last_line - self.first_line < self.WINDOW_LINES:
+            self.reload()
+
+        if self.index.complete:
+            self._poll_id = None
+            self.make_editable()
+        else:
+            self._poll_id = self.text_area.after(self.POLL_MS, self.poll_index)
+
+    def make_editable(self):
+        if self.document is None:
+            self.document = Document.from_index(self.index)
+        self.source = self.document
+        self.binding = DocumentBinding(
+            self.text_area, self.document, self.first_line, self.on_edit
+        )
+        self.text_area.config(state=tk.NORMAL)
+        if self.on_ready is not None:
+            self.on_ready(self.document)
+
+    def on_edit(self):
+        if self.at_end:
+            self.last_line = self.source.line_count
+            return
+        end_line = int(self.text_area.index("end-1c").split(".")[0])
+        self.last_line = self.first_line + end_line - 1
+        # Text typed past the window's final newline belongs to the next,
+        # unloaded line; reload so the widget shows that line whole.
+        if self.text_area.get("end-1c linestart", "end-1c") and not self._shift_pending:
+            self._shift_pending = True
+            self.text_area.after_idle(self.reload)
+
+    def top_line(self):
+        return self.first_line + int(self.text_area.index("@0,0").split(".")[0]) - 1
+
+    def on_text_scroll(self, lo, hi):
+        lo, hi = float(lo), float(hi)
+        window = max(self.last_line - self.first_line, 1)
+        total = max(self.source.line_count, 1)
+        top = self.first_line + lo * window
+        bottom = self.first_line + hi * window
+        self.text_area.vbar.set(top / total, bottom / total)
+
+        near_top = self.first_line > 0 and top - self.first_line < self.EDGE_LINES
+        near_bottom = not self.at_end and self.last_line - bottom < self.EDGE_LINES
+        if (near_top or near_bottom) and not self._shift_pending:
+            self._shift_pending = True
+            self.text_area.after_idle(self.recenter)
+
+    def reload(self):
+        self._shift_pending = False
+        top = self.top_line()
+        cursor = self.text_area.index(tk.INSERT)
+        cursor_line = self.first_line + int(cursor.split(".")[0]) - 1
+        self.load_window(self.first_line)
+        self.text_area.yview(f"{top - self.first_line + 1}.0")
+        self.text_area.mark_set(
+            tk.INSERT, f"{cursor_line - self.first_line + 1}.{cursor.split('.')[1]}"
+        )
+
+    def recenter(self):
+        self._shift_pending = False
+        top = self.top_line()
+        self.load_window(top - self.WINDOW_LINES // 2)
+        self.text_area.yview(f"{top - self.first_line + 1}.0")
+
+    def on_scrollbar(self, *args):
+        if args[0] != "moveto":
+            self.text_area.yview(*args)
+            return
+        target = int(float(args[1]) * self.source.line_count)
+        self.show_line(max(0, min(target, self.source.line_count - 1)))
+
+    def detach(self):
+        if self._poll_id is not None:
+            self.text_area.after_cancel(self._poll_id)
+            self._poll_id = None
+        if self.binding is not None:
+            self.binding.detach()
+            self.binding = None
+        self.text_area.config(state=tk.NORMAL, yscrollcommand=self.text_area.vbar.set)
+        self.text_area.vbar.config(command=self.text_area.yview)
+        self.index.close()
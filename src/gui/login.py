@@ -1,42 +1,58 @@
 from tkinter import messagebox
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
-from db.db import Database
+
+# Password hashing is deliberately slow, so it never runs on the Tk thread.
+auth_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="auth")
 
 
 class LoginWindow:
-    def __init__(self, parent, callback):
+    POLL_MS = 20
+
+    def __init__(self, parent, callback, db):
         self.parent = parent
         self.callback = callback
-        self.db = Database()
+        self.db = db
+        self.busy = False
         self.create_login_window()
 
     def create_login_window(self):
+        # Everything is laid out while the window is withdrawn and shown
+        # once, so it paints in a single pass instead of after each update().
         self.window = tk.Toplevel(self.parent)
+        self.window.withdraw()
         self.window.title("Login - File Editor")
-        self.window.geometry("400x350")
         self.window.resizable(False, False)
-
         self.window.configure(bg="#f0f0f0")
 
-        self.window.update()
+        self.create_widgets()
+        self.center_window()
 
+        self.window.bind("<Map>", self.on_map)
+        self.window.deiconify()
         self.window.lift()
-        self.window.focus_force()
         self.window.attributes("-topmost", True)
-
-        self.window.grab_set()
-
         self.window.after(500, lambda: self.window.attributes("-topmost", False))
 
-        self.center_window()
-
-        self.window.update_idletasks()
+    def show(self):
+        # Reused for every login: cleared and shown again, never rebuilt.
+        self.username_entry.delete(0, tk.END)
+        self.password_entry.delete(0, tk.END)
+        self.status_label.config(text="Enter your credentials", fg="#666666")
+        self.window.bind("<Map>", self.on_map)
+        self.window.deiconify()
+        self.window.lift()
 
-        self.create_widgets()
+    def on_map(self, event):
+        if event.widget is not self.window:
+            return
+        self.window.unbind("<Map>")
+        # A grab needs a viewable window, so it waits for the first map.
+        self.window.grab_set()
+        self.window.focus_force()
+        self.username_entry.focus_set()
 
     def center_window(self):
-        self.window.update_idletasks()
-
         screen_width = self.window.winfo_screenwidth()
         screen_height = self.window.winfo_screenheight()
 
@@ -44,16 +60,11 @@ class LoginWindow:
         y = (screen_height - 350) // 2
 
         self.window.geometry(f"400x350+{x}+{y}")
-        self.window.update()
 
     def create_widgets(self):
-        self.window.configure(bg="#f0f0f0")
-
         main_frame = tk.Frame(self.window, bg="#f0f0f0", padx=30, pady=30)
         main_frame.pack(fill=tk.BOTH, expand=True)
 
-        main_frame.update()
-
         title_label = tk.Label(
             main_frame,
             text="File Editor Login",
@@ -85,7 +96,7 @@ class LoginWindow:
         button_frame = tk.Frame(main_frame, bg="#f0f0f0")
         button_frame.pack(pady=20)
 
-        login_btn = tk.Button(
+        self.login_btn = tk.Button(
             button_frame,
             text="Login",
             command=self.login,
@@ -96,9 +107,9 @@ class LoginWindow:
             relief=tk.RAISED,
             bd=2,
         )
-        login_btn.pack(side=tk.LEFT, padx=5)
+        self.login_btn.pack(side=tk.LEFT, padx=5)
 
-        register_btn = tk.Button(
+        self.register_btn = tk.Button(
             button_frame,
             text="Register",
             command=self.register,
@@ -109,7 +120,7 @@ class LoginWindow:
             relief=tk.RAISED,
             bd=2,
         )
-        register_btn.pack(side=tk.LEFT, padx=5)
+        self.register_btn.pack(side=tk.LEFT, padx=5)
 
         self.status_label = tk.Label(
             main_frame,
@@ -132,16 +143,31 @@ class LoginWindow:
         self.window.bind("<Return>", lambda e: self.login())
         self.window.bind("<Escape>", lambda e: self.window.quit())
 
-        self.username_entry.focus_set()
-
-        self.window.update()
-        main_frame.update()
-        self.window.update_idletasks()
-
-        self.window.lift()
-        self.window.focus_force()
+    def run_in_background(self, function, args, message, on_done):
+        self.busy = True
+        self.login_btn.config(state=tk.DISABLED)
+        self.register_btn.config(state=tk.DISABLED)
+        self.status_label.config(text=message, fg="#666666")
+        future = auth_executor.submit(function, *args)
+        self.window.after(self.POLL_MS, self.poll_background, future, on_done)
+
+    def poll_background(self, future, on_done):
+        if not future.done():
+            self.window.after(self.POLL_MS, self.poll_background, future, on_done)
+            return
+        self.busy = False
+        self.login_btn.config(state=tk.NORMAL)
+        self.register_btn.config(state=tk.NORMAL)
+        try:
+            result = future.result()
+        except Exception as e:
+            self.status_label.config(text=f"Error: {e}", fg="red")
+            return
+        on_done(result)
 
     def login(self):
+        if self.busy:
+            return
         username = self.username_entry.get().strip()
         password = self.password_entry.get()
 
@@ -151,14 +177,26 @@ class LoginWindow:
             )
             return
 
-        if self.db.authenticate_user(username, password):
-            self.window.destroy()
+        self.run_in_background(
+            self.db.authenticate_user,
+            (username, password),
+            "Signing in...",
+            lambda success: self.finish_login(username, success),
+        )
+
+    def finish_login(self, username, success):
+        if success:
+            self.window.grab_release()
+            self.window.withdraw()
+            self.password_entry.delete(0, tk.END)
             self.callback(username)
         else:
             self.status_label.config(text="Invalid username or password", fg="red")
             self.password_entry.delete(0, tk.END)
 
     def register(self):
+        if self.busy:
+            return
         username = self.username_entry.get().strip()
         password = self.password_entry.get()
 
@@ -174,7 +212,15 @@ class LoginWindow:
             )
             return
 
-        if self.db.create_user(username, password):
+        self.run_in_background(
+            self.db.create_user,
+            (username, password),
+            "Creating account...",
+            self.finish_register,
+        )
+
+    def finish_register(self, created):
+        if created:
             self.status_label.config(
                 text="Registration successful! You can now login", fg="green"
             )
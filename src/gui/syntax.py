@@ -0,0 +1,110 @@
+import tkinter as tk
+from time import perf_counter
+from core.highlight import Highlighter
+from core.metrics import PROBES
+
+STYLES = {
+    "keyword": {"foreground": "#0000cc"},
+    "builtin": {"foreground": "#900090"},
+    "definition": {"foreground": "#006680"},
+    "string": {"foreground": "#067d17"},
+    "comment": {"foreground": "#8c8c8c"},
+    "number": {"foreground": "#1750eb"},
+    "decorator": {"foreground": "#9e880d"},
+    "macro": {"foreground": "#9e880d"},
+    "char": {"foreground": "#067d17"},
+}
+
+
+class SyntaxHighlighter:
+    # Tags only the visible lines plus a margin. All lexing and tagging runs
+    # from idle callbacks in slices of at most SLICE_SECONDS, so a keystroke
+    # never waits on the highlighter.
+    MARGIN_LINES = 50
+    SLICE_SECONDS = 0.008
+
+    def __init__(self, text_area, lexer):
+        self.text_area = text_area
+        self.core = Highlighter(lexer, self.widget_lines())
+        self._idle_id = None
+        for kind, style in STYLES.items():
+            text_area.tag_configure(self.tag(kind), **style)
+            # Selection must stay visible on top of token colours.
+            text_area.tag_lower(self.tag(kind), "sel")
+        text_area.config(yscrollcommand=self.on_scroll)
+        self._configure_id = text_area.bind(
+            "<Configure>", self.on_configure, add="+"
+        )
+        self.schedule()
+
+    @staticmethod
+    def tag(kind):
+        return "syntax_" + kind
+
+    def widget_lines(self):
+        return int(self.text_area.index("end-1c").split(".")[0])
+
+    def get_line(self, line):
+        return self.text_area.get(f"{line + 1}.0", f"{line + 1}.end")
+
+    def on_change(self, line, removed, added):
+        self.core.edit(line, removed, added)
+        self.schedule()
+
+    def on_scroll(self, lo, hi):
+        self.text_area.vbar.set(lo, hi)
+        self.schedule()
+
+    def on_configure(self, event):
+        self.schedule()
+
+    def schedule(self):
+        if self._idle_id is None:
+            self._idle_id = self.text_area.after_idle(self.work)
+
+    def visible_range(self):
+        text_area = self.text_area
+        first = int(text_area.index("@0,0").split(".")[0]) - 1
+        last = int(text_area.index(f"@0,{text_area.winfo_height()}").split(".")[0])
+        return (
+            max(0, first - self.MARGIN_LINES),
+            min(self.core.line_count, last + self.MARGIN_LINES),
+        )
+
+    @PROBES.timed("redraw.highlight")
+    def work(self):
+        self._idle_id = None
+        deadline = perf_counter() + self.SLICE_SECONDS
+        first, last = self.visible_range()
+        core = self.core
+        if not core.advance(last - 1, self.get_line, deadline):
+            self.schedule()
+            return
+
+        for line in core.stale_lines(first, last):
+            self.apply(line, core.tokens(line, self.get_line))
+            if perf_counter() > deadline:
+                self.schedule()
+                return
+
+    def apply(self, line, tokens):
+        text_area = self.text_area
+        start, end = f"{line + 1}.0", f"{line + 1}.end"
+        for kind in STYLES:
+            text_area.tag_remove(self.tag(kind), start, end)
+        for kind, token_start, token_end in tokens:
+            text_area.tag_add(
+                self.tag(kind),
+                f"{line + 1}.{token_start}",
+                f"{line + 1}.{token_end}",
+            )
+
+    def detach(self):
+        if self._idle_id is not None:
+            self.text_area.after_cancel(self._idle_id)
+            self._idle_id = None
+        text_area = self.text_area
+        for kind in STYLES:
+            text_area.tag_remove(self.tag(kind), "1.0", tk.END)
+        text_area.config(yscrollcommand=text_area.vbar.set)
+        text_area.unbind("<Configure>", self._configure_id)
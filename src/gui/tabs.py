@@ -0,0 +1,135 @@
+import os
+import tkinter as tk
+from core.editor_core import EditorCore
+
+
+class Tab:
+    def __init__(self, path=None):
+        self._path = path
+        # The document's EditorCore, made with it; every edit, undo, search
+        # and save of the tab goes through it.
+        self.core = None
+        self.text_area = None
+        self.binding = None
+        self.highlighter = None
+        self.large_view = None
+        # FileFollower while the file is followed, and the document version
+        # it started from.
+        self.follower = None
+        self.follow_version = None
+        # (top fraction, insert index) restored when the tab is shown again.
+        self.view = None
+
+    @property
+    def path(self):
+        return self._path
+
+    @path.setter
+    def path(self, path):
+        self._path = path
+        if self.core is not None:
+            self.core.path = path
+
+    @property
+    def document(self):
+        return self.core.document if self.core is not None else None
+
+    @document.setter
+    def document(self, document):
+        self.core = EditorCore(document, self.path) if document is not None else None
+
+    @property
+    def title(self):
+        name = os.path.basename(self.path) if self.path else "Untitled"
+        return name + " *" if self.modified else name
+
+    @property
+    def live(self):
+        return self.text_area is not None
+
+    @property
+    def pinned(self):
+        # The windowed view owns its mapping and holds only a few thousand
+        # lines in its widget, so it keeps the widget while hidden; followed
+        # files keep theirs to go on growing in the background.
+        return self.large_view is not None or self.follower is not None
+
+    @property
+    def modified(self):
+        return self.document is not None and self.document.modified
+
+    @property
+    def untouched(self):
+        return (
+            self.path is None
+            and self.large_view is None
+            and (self.document is None or not len(self.document))
+        )
+
+    @property
+    def resident_bytes(self):
+        # Memory-mapped documents live in the page cache, not on the heap.
+        if self.document is None or self.document.source is not None:
+            return 0
+        return len(self.document)
+
+    @property
+    def position(self):
+        # (top fraction, insert index) to come back to, or None.
+        if self.text_area is None or self.large_view is not None:
+            return self.view
+        return self.text_area.yview()[0], self.text_area.index(tk.INSERT)
+
+    @property
+    def read_only(self):
+        # Following, or waiting for the followed file to be read again.
+        return self.follower is not None or (
+            self.binding is not None and self.binding.read_only
+        )
+
+    @property
+    def droppable(self):
+        return (
+            self.path is not None
+            and self.document is not None
+            and not self.live
+            and not self.pinned
+            and not self.modified
+        )
+
+
+class TabBar:
+    def __init__(self, parent, on_select, on_close):
+        self.on_select = on_select
+        self.on_close = on_close
+        self.frame = tk.Frame(parent)
+        self.buttons = {}
+
+    def render(self, tabs, active):
+        for child in self.frame.winfo_children():
+            child.destroy()
+        self.buttons = {}
+        for tab in tabs:
+            relief = tk.SUNKEN if tab is active else tk.RAISED
+            cell = tk.Frame(self.frame, bd=1, relief=relief)
+            cell.pack(side=tk.LEFT, padx=(0, 2))
+            button = tk.Button(
+                cell,
+                text=tab.title,
+                relief=tk.FLAT,
+                command=lambda tab=tab: self.on_select(tab),
+            )
+            button.pack(side=tk.LEFT)
+            button.bind("<Button-2>", lambda e, tab=tab: self.on_close(tab))
+            tk.Button(
+                cell,
+                text="✕",
+                relief=tk.FLAT,
+                command=lambda tab=tab: self.on_close(tab),
+            ).pack(side=tk.LEFT)
+            self.buttons[id(tab)] = button
+
+    def refresh(self, tab):
+        button = self.buttons.get(id(tab))
+        if button is not None and button.cget("text") != tab.title:
+            button.config(text=tab.title)
@@ -1,12 +1,81 @@
+import argparse
 import tkinter as tk
 from gui.editor import FileEditor
+from db.db import open_database
+from db.passwords import COST_PRESETS, DEFAULT_COST, PasswordHasher
+from core.metrics import PROBES
+from core.tabs import DEFAULT_LIVE_TABS, DEFAULT_MEMORY_BUDGET
+from core.undo import DEFAULT_UNDO_MEMORY
+from core.follow import DEFAULT_FOLLOW_LINES
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="File Editor")
+    parser.add_argument(
+        "--kdf-cost",
+        choices=COST_PRESETS,
+        default=DEFAULT_COST,
+        help="scrypt cost for new and upgraded password hashes",
+    )
+    parser.add_argument(
+        "--live-tabs",
+        type=int,
+        default=DEFAULT_LIVE_TABS,
+        help="tabs that keep a text widget; older tabs rebuild theirs when shown",
+    )
+    parser.add_argument(
+        "--tab-memory-mb",
+        type=int,
+        default=DEFAULT_MEMORY_BUDGET // (1024 * 1024),
+        help="memory for inactive buffers; unmodified files beyond it are re-read",
+    )
+    parser.add_argument(
+        "--undo-memory-mb",
+        type=int,
+        default=DEFAULT_UNDO_MEMORY // (1024 * 1024),
+        help="undo history kept per document; the oldest steps are dropped first",
+    )
+    parser.add_argument(
+        "--follow-lines",
+        type=int,
+        default=DEFAULT_FOLLOW_LINES,
+        help="lines a followed file keeps; older lines are dropped from the view",
+    )
+    parser.add_argument(
+        "--reauth-seconds",
+        type=int,
+        default=0,
+        help="accept a repeat login this soon after a full check without "
+        "rerunning the password hash (0 turns this off)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="record latency probes and write them to PATH as JSON on exit",
+    )
+    args = parser.parse_args(argv)
+    PROBES.enabled = args.metrics is not None
+
     root = tk.Tk()
 
-    FileEditor(root)
-    root.mainloop()
+    db = open_database(
+        hasher=PasswordHasher(cost=args.kdf_cost),
+        reauth_seconds=args.reauth_seconds,
+    )
+    editor = FileEditor(
+        root,
+        db,
+        live_tabs=args.live_tabs,
+        tab_memory_budget=args.tab_memory_mb * 1024 * 1024,
+        undo_memory=args.undo_memory_mb * 1024 * 1024,
+        follow_lines=args.follow_lines,
+    )
+    try:
+        root.mainloop()
+    finally:
+        editor.close()
+        if args.metrics is not None:
+            PROBES.dump(args.metrics)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+import argparse
+import sys
+from db.db import BULK_BATCH_SIZE, Database
+from db.passwords import COST_PRESETS, DEFAULT_COST, PasswordHasher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Create File Editor accounts in bulk from a CSV of "
+        "username,password rows."
+    )
+    parser.add_argument("csv", help="CSV file to read, or - for stdin")
+    parser.add_argument("--db", default="file_editor.db", help="database file")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="hashing processes (default: CPUs)"
+    )
+    parser.add_argument("--cost", choices=COST_PRESETS, default=DEFAULT_COST)
+    args = parser.parse_args(argv)
+
+    db = Database(args.db, PasswordHasher(cost=args.cost))
+    try:
+        if args.csv == "-":
+            result = db.create_users_bulk(sys.stdin, args.batch_size, args.workers)
+        else:
+            with open(args.csv, newline="", encoding="utf-8") as source:
+                result = db.create_users_bulk(source, args.batch_size, args.workers)
+    finally:
+        db.close()
+
+    for number, username, reason in result.conflicts:
+        print(f"row {number}: {username!r} not created ({reason})", file=sys.stderr)
+    print(f"Created {result.created} users, {len(result.conflicts)} conflicts")
+    return 1 if result.conflicts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import unittest
+import os
+import time
+import tkinter as tk
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from gui.charts import PieChart
+
+
+def redraw_by_recreating(canvas, percent_used, title):
+    # The previous AboutWindow.draw_pie_chart, kept as the baseline.
+    canvas.delete("all")
+    width = canvas.winfo_width()
+    height = canvas.winfo_height()
+    radius = min(width, height) * 0.4
+    center_x = width // 2
+    center_y = height // 2
+    used_angle = 360 * percent_used / 100
+    box = (
+        center_x - radius,
+        center_y - radius,
+        center_x + radius,
+        center_y + radius,
+    )
+    canvas.create_arc(*box, start=0, extent=used_angle, fill="#ff9999", outline="white")
+    canvas.create_arc(
+        *box,
+        start=used_angle,
+        extent=360 - used_angle,
+        fill="#66b3ff",
+        outline="white",
+    )
+    inner_radius = radius * 0.5
+    canvas.create_oval(
+        center_x - inner_radius,
+        center_y - inner_radius,
+        center_x + inner_radius,
+        center_y + inner_radius,
+        fill="white",
+        outline="white",
+    )
+    canvas.create_text(
+        center_x, center_y, text=f"{percent_used:.1f}%", font=("Helvetica", 14, "bold")
+    )
+    canvas.create_text(center_x, height - 15, text=title, font=("Helvetica", 10))
+
+
+def redraws_per_second(canvas, redraw, min_seconds=1.0):
+    count = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        redraw(count % 100)
+        canvas.update_idletasks()
+        count += 1
+        elapsed = time.perf_counter() - started
+    return count / elapsed
+
+
+def report():
+    root = tk.Tk()
+    try:
+        canvas = tk.Canvas(root, width=150, height=150)
+        canvas.pack()
+        root.update()
+        before = redraws_per_second(
+            canvas, lambda percent: redraw_by_recreating(canvas, percent, "CPU Usage")
+        )
+        canvas.delete("all")
+        chart = PieChart(canvas)
+        after = redraws_per_second(
+            canvas, lambda percent: chart.set(percent, "CPU Usage")
+        )
+        unchanged = redraws_per_second(canvas, lambda percent: chart.set(50, "CPU Usage"))
+    finally:
+        root.destroy()
+    return {
+        "delete-and-redraw": before,
+        "item reuse": after,
+        "item reuse, unchanged": unchanged,
+    }
+
+
+def has_display():
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        return False
+    return True
+
+
+@unittest.skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1")
+class TestChartRedrawBenchmark(unittest.TestCase):
+    def test_report_redraws_per_second(self):
+        if not has_display():
+            self.skipTest("no display available")
+        results = report()
+        for name, rate in results.items():
+            print(f"{name:>22}: {rate:12.1f} redraws/s")
+
+        self.assertGreater(results["item reuse"], results["delete-and-redraw"])
+
+
+if __name__ == "__main__":
+    for name, rate in report().items():
+        print(f"{name:>22}: {rate:12.1f} redraws/s")
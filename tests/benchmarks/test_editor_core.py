@@ -0,0 +1,128 @@
+import json
+import os
+import random
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.editor_core import EditorCore
+from core.search import SearchQuery
+
+# File sizes to measure; add 1024 for the 1 GB run, which needs that much
+# free disk space twice over.
+SIZES_MB = [
+    int(size) for size in os.environ.get("BENCHMARK_SIZES_MB", "1,64").split(",")
+]
+INSERTS = 2000
+# Smaller files are timed a few times and the best kept, to damp noise.
+REPEATS = 3
+REPEAT_BELOW_MB = 256
+# A result this much below the stored baseline fails the run.
+THRESHOLD = float(os.environ.get("BENCHMARK_THRESHOLD", "0.25"))
+RESULTS_DIR = Path(
+    os.environ.get(
+        "BENCHMARK_RESULTS", Path(__file__).parent.parent.parent / ".benchmarks"
+    )
+)
+BASELINE = RESULTS_DIR / "editor_core.json"
+LATEST = RESULTS_DIR / "editor_core-latest.json"
+
+
+def write_sample(path, size, seed=1):
+    rng = random.Random(seed)
+    words = ["".join(rng.choice("abcdefghij") for _ in range(6)) for _ in range(500)]
+    lines = []
+    total = 0
+    while total < 1024 * 1024:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(3, 12))) + "\n"
+        lines.append(line)
+        total += len(line)
+    block = "".join(lines).encode()
+    with open(path, "wb") as file:
+        for _ in range(size // len(block)):
+            file.write(block)
+        file.write(block[: size % len(block)])
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def measure(path, size_mb):
+    # Throughputs, all higher-is-better: MB/s, and inserts per second.
+    rng = random.Random(size_mb)
+    core, open_s = timed(EditorCore.open, path)
+    size = len(core.document)
+
+    started = time.perf_counter()
+    for i in range(INSERTS):
+        core.insert(rng.randrange(size), "x")
+        size += 1
+    insert_s = time.perf_counter() - started
+
+    _, search_s = timed(core.search, SearchQuery("needle"))
+    _, save_s = timed(core.save)
+    core.close()
+    return {
+        f"{size_mb} MB open MB/s": size_mb / open_s,
+        f"{size_mb} MB insert ops/s": INSERTS / insert_s,
+        f"{size_mb} MB search MB/s": size_mb / search_s,
+        f"{size_mb} MB save MB/s": size_mb / save_s,
+    }
+
+
+def report():
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size_mb in SIZES_MB:
+            path = os.path.join(directory, f"{size_mb}mb.txt")
+            for _ in range(REPEATS if size_mb < REPEAT_BELOW_MB else 1):
+                write_sample(path, size_mb * 1024 * 1024)
+                for name, value in measure(path, size_mb).items():
+                    results[name] = max(value, results.get(name, 0))
+            os.remove(path)
+    return results
+
+
+def regressions(results, baseline, threshold=THRESHOLD):
+    return {
+        name: (value, baseline[name])
+        for name, value in results.items()
+        if name in baseline and value < baseline[name] * (1 - threshold)
+    }
+
+
+def store(path, results):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+@unittest.skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1")
+class TestEditorCoreBenchmark(unittest.TestCase):
+    def test_no_regression_against_baseline(self):
+        results = report()
+        for name, value in results.items():
+            print(f"{name:>28}: {value:12.1f}")
+        store(LATEST, results)
+
+        # The first run, or BENCHMARK_UPDATE=1, records the baseline that
+        # later runs on this machine are held to.
+        if not BASELINE.exists() or os.environ.get("BENCHMARK_UPDATE"):
+            store(BASELINE, results)
+            return
+        baseline = json.loads(BASELINE.read_text())
+        self.assertEqual(
+            regressions(results, baseline),
+            {},
+            f"more than {THRESHOLD:.0%} slower than {BASELINE}",
+        )
+
+
+if __name__ == "__main__":
+    for name, value in report().items():
+        print(f"{name:>28}: {value:12.1f}")
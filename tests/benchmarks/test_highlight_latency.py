@@ -0,0 +1,75 @@
+import unittest
+import os
+import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.highlight import Highlighter, PythonLexer
+
+LINE_COUNT = 50_000
+VIEWPORT_LINES = 40
+MARGIN_LINES = 50
+FRAME_MS = 16.7
+
+
+def sample_lines(count):
+    block = [
+        "class Widget(Base):",
+        '    """Docstring that',
+        '    spans lines."""',
+        "    def render(self, value=0x1F):  # draw",
+        "        return f'{value!r}' + str(1.5e3)",
+        "",
+    ]
+    return [block[i % len(block)] for i in range(count)]
+
+
+def keystroke_latencies(keystrokes=2000):
+    # Each keystroke is the work an idle slice does after typing one
+    # character: record the edit, re-lex to the bottom of the viewport and
+    # produce tokens for the lines that changed.
+    lines = sample_lines(LINE_COUNT)
+    highlighter = Highlighter(PythonLexer(), LINE_COUNT)
+    get_line = lines.__getitem__
+    top = LINE_COUNT // 2
+    highlighter.advance(top + VIEWPORT_LINES + MARGIN_LINES, get_line)
+
+    latencies = []
+    for number in range(keystrokes):
+        line = top + number % VIEWPORT_LINES
+        started = time.perf_counter()
+        lines[line] += "x"
+        highlighter.edit(line, 0, 0)
+        highlighter.advance(top + VIEWPORT_LINES + MARGIN_LINES, get_line)
+        for stale in highlighter.stale_lines(
+            top - MARGIN_LINES, top + VIEWPORT_LINES + MARGIN_LINES
+        ):
+            highlighter.tokens(stale, get_line)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return latencies
+
+
+def report():
+    latencies = keystroke_latencies()
+    return {
+        "median ms": latencies[len(latencies) // 2],
+        "p99 ms": latencies[int(len(latencies) * 0.99)],
+        "max ms": latencies[-1],
+    }
+
+
+@unittest.skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1")
+class TestHighlightLatencyBenchmark(unittest.TestCase):
+    def test_typing_in_a_large_file_stays_within_a_frame(self):
+        results = report()
+        for name, value in results.items():
+            print(f"{name:>10}: {value:8.3f}")
+
+        self.assertLess(results["p99 ms"], FRAME_MS)
+
+
+if __name__ == "__main__":
+    for name, value in report().items():
+        print(f"{name:>10}: {value:8.3f}")
@@ -0,0 +1,74 @@
+import unittest
+import os
+import random
+import tempfile
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from db.db import Database
+from db.history import FileHistory
+
+FILE_SIZE = 100 * 1024 * 1024
+EDITS = 5
+
+
+def sample_text(size, seed=1):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = [
+        "".join(rng.choice(letters) for _ in range(rng.randint(2, 9)))
+        for _ in range(5000)
+    ]
+    lines = []
+    total = 0
+    while total < size:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(3, 12))) + "\n"
+        lines.append(line)
+        total += len(line)
+    return bytearray("".join(lines).encode()[:size])
+
+
+def report():
+    # Saves a 100 MB file, then the same file after each of a few small
+    # edits, and reports what every later save added to the database.
+    rng = random.Random(2)
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, "history.db"))
+        history = FileHistory(db)
+        path = os.path.join(directory, "large.txt")
+        data = sample_text(FILE_SIZE)
+        reports = []
+        for edit in range(EDITS + 1):
+            if edit:
+                offset = rng.randrange(len(data))
+                data[offset:offset] = f"edit {edit}\n".encode()
+            with open(path, "wb") as file:
+                file.write(data)
+            reports.append(history.record(path))
+        stored, logical = history.storage()
+        db.close()
+    later = reports[1:]
+    return {
+        "first save s": reports[0].seconds,
+        "first save KB": reports[0].added_bytes / 1024,
+        "edit save s": max(r.seconds for r in later),
+        "edit save KB": max(r.added_bytes for r in later) / 1024,
+        "stored MB": stored / (1024 * 1024),
+        "versions MB": logical / (1024 * 1024),
+    }
+
+
+@unittest.skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1")
+class TestHistoryGrowthBenchmark(unittest.TestCase):
+    def test_small_edits_add_only_kilobytes(self):
+        results = report()
+        for name, value in results.items():
+            print(f"{name:>14}: {value:10.3f}")
+
+        self.assertLess(results["edit save KB"], 64)
+
+
+if __name__ == "__main__":
+    for name, value in report().items():
+        print(f"{name:>14}: {value:10.3f}")
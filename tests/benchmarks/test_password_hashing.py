@@ -0,0 +1,41 @@
+import unittest
+import os
+import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from db.passwords import COST_PRESETS, PasswordHasher, legacy_hash
+
+
+def hashes_per_second(hash_function, min_seconds=1.0):
+    count = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        hash_function("benchmark password")
+        count += 1
+        elapsed = time.perf_counter() - started
+    return count / elapsed
+
+
+def report():
+    results = {"legacy-sha256": hashes_per_second(legacy_hash, 0.2)}
+    for name in COST_PRESETS:
+        results[name] = hashes_per_second(PasswordHasher(cost=name).hash)
+    return results
+
+
+@unittest.skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1")
+class TestPasswordHashingBenchmark(unittest.TestCase):
+    def test_report_hashes_per_second(self):
+        results = report()
+        for name, rate in results.items():
+            print(f"{name:>14}: {rate:12.1f} hashes/s")
+
+        self.assertGreater(results["legacy-sha256"], results["interactive"])
+
+
+if __name__ == "__main__":
+    for name, rate in report().items():
+        print(f"{name:>14}: {rate:12.1f} hashes/s")
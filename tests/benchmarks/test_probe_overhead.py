@@ -0,0 +1,44 @@
+import unittest
+import os
+import timeit
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.metrics import Probes
+
+CALLS = 200_000
+# Added cost per call of a probe that is switched off.
+DISABLED_BUDGET_NS = 500
+
+
+def report():
+    probes = Probes()
+
+    def bare():
+        pass
+
+    probed = probes.timed("bare")(bare)
+    base = min(timeit.repeat(bare, number=CALLS, repeat=5))
+    disabled = min(timeit.repeat(probed, number=CALLS, repeat=5))
+    probes.enabled = True
+    enabled = min(timeit.repeat(probed, number=CALLS, repeat=5))
+    return {
+        "disabled ns": (disabled - base) / CALLS * 1e9,
+        "enabled ns": (enabled - base) / CALLS * 1e9,
+    }
+
+
+@unittest.skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1")
+class TestProbeOverheadBenchmark(unittest.TestCase):
+    def test_disabled_probes_are_nearly_free(self):
+        results = report()
+        for name, value in results.items():
+            print(f"{name:>12}: {value:8.1f}")
+
+        self.assertLess(results["disabled ns"], DISABLED_BUDGET_NS)
+
+
+if __name__ == "__main__":
+    for name, value in report().items():
+        print(f"{name:>12}: {value:8.1f}")
@@ -0,0 +1,107 @@
+import unittest
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent.parent / "src"
+
+# Regression thresholds; generous enough for a cold CI machine.
+IMPORT_BUDGET_MS = 250
+FIRST_PAINT_BUDGET_MS = 1500
+
+FIRST_PAINT_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+import tkinter as tk
+from db.db import Database
+from gui.editor import FileEditor
+
+root = tk.Tk()
+editor = FileEditor(root, Database(sys.argv[1]))
+login = [w for w in root.winfo_children() if isinstance(w, tk.Toplevel)][0]
+
+def painted(event):
+    if event.widget is login:
+        print((time.perf_counter() - started) * 1000)
+        root.after_idle(root.destroy)
+
+login.bind("<Map>", painted, add="+")
+try:
+    root.mainloop()
+finally:
+    editor.close()
+"""
+
+
+def import_time_ms(module="main"):
+    # -X importtime reports cumulative microseconds per module on stderr.
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        _, _, rest = line.partition(":")
+        parts = [part.strip() for part in rest.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"{module} missing from -X importtime output")
+
+
+def first_paint_ms():
+    with tempfile.TemporaryDirectory() as directory:
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                FIRST_PAINT_SCRIPT,
+                os.path.join(directory, "bench.db"),
+            ],
+            cwd=SRC,
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=30,
+        )
+    return float(result.stdout.strip())
+
+
+def has_display():
+    result = subprocess.run(
+        [sys.executable, "-c", "import tkinter; tkinter.Tk().destroy()"],
+        capture_output=True,
+    )
+    return result.returncode == 0
+
+
+def report():
+    results = {"import main (ms)": import_time_ms()}
+    if has_display():
+        results["login first paint (ms)"] = first_paint_ms()
+    return results
+
+
+@unittest.skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1")
+class TestStartupBenchmark(unittest.TestCase):
+    def test_import_time(self):
+        elapsed = import_time_ms()
+        print(f"import main: {elapsed:.1f} ms")
+
+        self.assertLess(elapsed, IMPORT_BUDGET_MS)
+
+    def test_time_to_first_paint(self):
+        if not has_display():
+            self.skipTest("no display available")
+        elapsed = first_paint_ms()
+        print(f"login first paint: {elapsed:.1f} ms")
+
+        self.assertLess(elapsed, FIRST_PAINT_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    for name, value in report().items():
+        print(f"{name:>24}: {value:10.1f}")
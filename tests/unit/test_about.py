@@ -6,6 +6,7 @@ from pathlib import Path
 
 # Add the src directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.ring_buffer import History
 from gui.about import AboutWindow
 
 
@@ -69,6 +70,63 @@ class TestAboutWindow(unittest.TestCase):
 
             mock_show_info.assert_called_once()
 
+    def test_update_pie_charts_uses_latest_sample_without_blocking(self):
+        self.about_window.ram_chart = Mock()
+        self.about_window.cpu_chart = Mock()
+        self.about_window.sampler = Mock()
+        self.about_window.sampler.latest = Mock(
+            cpu_percent=12.5,
+            ram_percent=40.0,
+            ram_used=2 * 1024**3,
+            ram_total=8 * 1024**3,
+        )
+
+        with patch("gui.about.psutil.cpu_percent") as mock_cpu_percent:
+            self.about_window.update_pie_charts()
+
+        mock_cpu_percent.assert_not_called()
+        self.about_window.ram_chart.set.assert_called_once_with(
+            40.0, "RAM: 2.0/8.0 GB"
+        )
+        self.about_window.cpu_chart.set.assert_called_once_with(12.5, "CPU Usage")
+
+    def test_update_sparklines_draws_every_series(self):
+        history = History(capacity=4, names=["cpu", "disk_read", "disk_write"])
+        history.record({"cpu": 10.0, "disk_read": 100.0, "disk_write": 300.0})
+        self.about_window.sampler = Mock(history=history)
+        self.about_window.sparklines = {
+            name: Mock() for name in ("cpu", "disk_read", "disk_write")
+        }
+
+        self.about_window.update_sparklines()
+
+        cpu = self.about_window.sparklines["cpu"]
+        cpu.draw.assert_called_once()
+        self.assertEqual(list(cpu.draw.call_args.args[0]), [10.0])
+        self.assertIsNone(cpu.draw.call_args.args[2])
+        read = self.about_window.sparklines["disk_read"]
+        self.assertEqual(read.draw.call_args.args[2], 300.0)
+
+    def test_set_refresh_rate_updates_sampler_interval(self):
+        self.about_window.sampler = Mock(interval=0.5)
+        self.about_window.refresh_var = Mock()
+        self.about_window.refresh_var.get.return_value = 250
+
+        self.about_window.set_refresh_rate()
+
+        self.assertEqual(self.about_window.refresh_ms, 250)
+        self.assertEqual(self.about_window.sampler.interval, 0.25)
+
+    def test_latency_rows_show_percentiles(self):
+        summary = {
+            "open_file": {"count": 3, "p50_ms": 1.5, "p99_ms": 20.0, "max_ms": 21.25}
+        }
+
+        rows = AboutWindow.latency_rows(summary).splitlines()
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1].split(), ["open_file", "3", "1.50", "20.00", "21.25"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import Mock
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from gui.charts import IdleBatch, PieChart, Sparkline
+
+
+class TestSparkline(unittest.TestCase):
+    def setUp(self):
+        self.canvas = Mock()
+        self.canvas.create_line.return_value = 7
+        self.canvas.winfo_width.return_value = 104
+        self.canvas.winfo_height.return_value = 54
+
+    def test_draw_moves_a_single_line_item(self):
+        sparkline = Sparkline(self.canvas, maximum=100)
+
+        for _ in range(50):
+            sparkline.draw([0.0, 50.0, 100.0], capacity=3)
+
+        self.canvas.create_line.assert_called_once()
+        self.assertEqual(self.canvas.coords.call_count, 50)
+        item, coords = self.canvas.coords.call_args.args
+        self.assertEqual(item, 7)
+        self.assertEqual(coords, [2.0, 52.0, 52.0, 27.0, 102.0, 2.0])
+
+    def test_newest_sample_is_on_the_right_edge(self):
+        sparkline = Sparkline(self.canvas)
+
+        coords = sparkline.points([5.0, 10.0], 104, 54, capacity=101)
+
+        self.assertEqual(coords[-2], 102)
+        self.assertEqual(coords[-1], 2.0)
+        self.assertEqual(coords[0], 101.0)
+
+    def test_single_value_still_forms_a_line(self):
+        sparkline = Sparkline(self.canvas, maximum=100)
+
+        self.assertEqual(len(sparkline.points([10.0], 104, 54, capacity=10)), 4)
+        self.assertEqual(sparkline.points([], 104, 54, capacity=10), [0, 0, 0, 0])
+
+
+class TestPieChart(unittest.TestCase):
+    def setUp(self):
+        self.canvas = Mock()
+        self.canvas.winfo_width.return_value = 150
+        self.canvas.winfo_height.return_value = 150
+        self.canvas.after_idle.return_value = "after#1"
+        self.chart = PieChart(self.canvas)
+
+    def test_items_are_created_once(self):
+        created = self.canvas.method_calls.copy()
+
+        for percent in (10, 20, 30):
+            self.chart.set(percent, "CPU Usage")
+            self.chart.batch.flush()
+
+        self.assertEqual(len(created), 5)
+        self.canvas.delete.assert_not_called()
+        self.assertEqual(self.canvas.create_arc.call_count, 2)
+        self.assertEqual(self.chart.percent, 30)
+
+    def test_updates_are_batched_into_one_idle_callback(self):
+        batch = IdleBatch(self.canvas)
+        other = PieChart(self.canvas, batch)
+        self.chart.batch = batch
+
+        self.chart.set(10, "RAM")
+        other.set(20, "CPU")
+        self.chart.set(15, "RAM")
+        self.canvas.after_idle.assert_called_once_with(batch.flush)
+        batch.flush()
+
+        self.assertEqual(self.chart.percent, 15)
+        self.assertEqual(other.percent, 20)
+
+    def test_small_changes_are_skipped(self):
+        self.assertTrue(self.chart.flush())
+        self.chart.set(40.0, "CPU Usage")
+        self.chart.batch.flush()
+        self.canvas.itemconfigure.reset_mock()
+
+        self.chart.set(40.2, "CPU Usage")
+        self.chart.batch.flush()
+
+        self.canvas.itemconfigure.assert_not_called()
+        self.assertEqual(self.chart.percent, 40.0)
+
+    def test_resize_relayouts_and_redraws(self):
+        self.chart.set(40.0, "CPU Usage")
+        self.chart.batch.flush()
+        self.canvas.coords.reset_mock()
+        self.canvas.winfo_width.return_value = 200
+
+        self.chart.set(40.0, "CPU Usage")
+        self.chart.batch.flush()
+
+        self.assertEqual(self.canvas.coords.call_count, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.chunking import MAX_CHUNK, MIN_CHUNK, chunks, cut_points, digest
+
+
+def sample(size, seed=1):
+    return random.Random(seed).randbytes(size)
+
+
+class TestChunking(unittest.TestCase):
+    def test_chunks_cover_the_data_within_size_bounds(self):
+        data = sample(1024 * 1024)
+
+        pieces = list(chunks(data))
+
+        self.assertEqual(b"".join(pieces), data)
+        self.assertTrue(all(len(p) <= MAX_CHUNK for p in pieces))
+        self.assertTrue(all(len(p) >= MIN_CHUNK for p in pieces[:-1]))
+
+    def test_small_and_empty_inputs(self):
+        self.assertEqual(list(chunks(b"")), [])
+        self.assertEqual(list(chunks(b"abc")), [b"abc"])
+
+    def test_insert_only_changes_nearby_chunks(self):
+        data = sample(1024 * 1024)
+        middle = len(data) // 2
+        edited = data[:middle] + b"a few inserted bytes" + data[middle:]
+
+        before = {digest(p) for p in chunks(data)}
+        changed = [p for p in chunks(edited) if digest(p) not in before]
+
+        self.assertLessEqual(sum(len(p) for p in changed), 2 * MAX_CHUNK)
+
+    def test_boundaries_do_not_depend_on_the_scan_start(self):
+        data = sample(256 * 1024)
+        cuts = list(cut_points(data))
+
+        resumed = [cuts[3] + end for end in cut_points(data[cuts[3] :])]
+
+        self.assertEqual(resumed, cuts[4:])
+
+
+if __name__ == "__main__":
+    unittest.main()
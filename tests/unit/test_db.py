@@ -1,14 +1,17 @@
 import unittest
 import sqlite3
 import os
+import threading
 from unittest.mock import patch
 import hashlib
+import io
 import sys
 from pathlib import Path
 
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
-from db.db import Database
+from db.db import Database, open_database
+from db.passwords import PasswordHasher
 
 
 class TestDB(unittest.TestCase):
@@ -22,9 +25,11 @@ class TestDB(unittest.TestCase):
 
     def tearDown(self):
         if self.db is not None:
+            self.db.close()
             self.db = None
-        if os.path.exists(self.TEST_DB):
-            os.remove(self.TEST_DB)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.TEST_DB + suffix):
+                os.remove(self.TEST_DB + suffix)
 
     def test_hash_password_returns_consistent_hashes(self):
         assert self.db is not None
@@ -80,6 +85,139 @@ class TestDB(unittest.TestCase):
         result = self.db.authenticate_user("nonexistent", "password")
         self.assertFalse(result, "Authentication should fail for non-existent user")
 
+    def test_connection_uses_wal(self):
+        assert self.db is not None
+        (mode,) = self.db.conn.execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual(mode, "wal")
+
+    def test_schema_setup_runs_once(self):
+        assert self.db is not None
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+
+        self.db.init_db()
+
+        self.assertFalse(any("CREATE TABLE" in sql for sql in statements))
+
+    def test_concurrent_use_from_threads(self):
+        assert self.db is not None
+        db = self.db
+
+        def register(i):
+            db.create_user(f"user{i}", "password")
+
+        threads = [threading.Thread(target=register, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for i in range(20):
+            self.assertTrue(db.authenticate_user(f"user{i}", "password"))
+
+    def test_stored_hash_is_salted_kdf(self):
+        assert self.db is not None
+        self.db.create_user("first", "same_password")
+        self.db.create_user("second", "same_password")
+
+        rows = self.db.conn.execute("SELECT password_hash FROM users").fetchall()
+        self.assertNotEqual(rows[0][0], rows[1][0])
+        self.assertTrue(all(row[0].startswith("scrypt$") for row in rows))
+
+    def test_legacy_hash_migrated_on_login(self):
+        assert self.db is not None
+        legacy = hashlib.sha256(b"old_password").hexdigest()
+        with self.db.conn:
+            self.db.conn.execute(
+                "INSERT INTO users (username, password_hash) VALUES (?, ?)",
+                ("legacy_user", legacy),
+            )
+
+        self.assertTrue(self.db.authenticate_user("legacy_user", "old_password"))
+
+        (stored,) = self.db.conn.execute(
+            "SELECT password_hash FROM users WHERE username = ?", ("legacy_user",)
+        ).fetchone()
+        self.assertTrue(stored.startswith("scrypt$"))
+        self.assertTrue(self.db.authenticate_user("legacy_user", "old_password"))
+
+    def test_create_users_bulk_reports_conflicts(self):
+        assert self.db is not None
+        self.db.hasher = PasswordHasher(n=2**10)
+        self.db.create_user("taken", "password")
+        rows = [
+            ("alice", "password1"),
+            ("taken", "password2"),
+            ("bob", "password3"),
+            ("alice", "password4"),
+            ("", "password5"),
+        ]
+
+        result = self.db.create_users_bulk(rows, batch_size=2, workers=1)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(
+            result.conflicts,
+            [
+                (2, "taken", "exists"),
+                (4, "alice", "duplicate in input"),
+                (5, "", "invalid"),
+            ],
+        )
+        self.assertTrue(self.db.authenticate_user("alice", "password1"))
+        self.assertTrue(self.db.authenticate_user("bob", "password3"))
+
+    def test_create_users_bulk_from_csv_with_process_pool(self):
+        assert self.db is not None
+        self.db.hasher = PasswordHasher(n=2**10)
+        source = io.StringIO(
+            "username,password\n" + "".join(f"user{i},secret{i}\n" for i in range(50))
+        )
+
+        result = self.db.create_users_bulk(source, batch_size=16, workers=2)
+
+        self.assertEqual(result.created, 50)
+        self.assertEqual(result.conflicts, [])
+        self.assertTrue(self.db.authenticate_user("user49", "secret49"))
+
+    def test_create_users_bulk_numbers_csv_rows_by_line(self):
+        assert self.db is not None
+        self.db.hasher = PasswordHasher(n=2**10)
+        source = io.StringIO("username,password\nann,secret1\nann,secret2\n")
+
+        result = self.db.create_users_bulk(source, workers=1)
+
+        self.assertEqual(result.conflicts, [(3, "ann", "duplicate in input")])
+
+    def test_create_users_bulk_with_batch_above_parameter_limit(self):
+        assert self.db is not None
+        self.db.hasher = PasswordHasher(n=2**4, r=1)
+        rows = [(f"user{i}", "secret") for i in range(2500)]
+
+        result = self.db.create_users_bulk(rows, batch_size=2500, workers=1)
+
+        self.assertEqual(result.created, 2500)
+
+    def test_open_database_shares_one_handle_per_path(self):
+        self.db.close()
+        self.db = open_database(self.TEST_DB)
+        self.assertIs(open_database(os.path.abspath(self.TEST_DB)), self.db)
+        self.db.close()
+        other = open_database(self.TEST_DB)
+        self.assertIsNot(other, self.db)
+        self.db = other
+
+    def test_repeat_login_within_reauth_window_skips_kdf(self):
+        self.db.close()
+        self.db = Database(self.TEST_DB, reauth_seconds=60)
+        self.db.create_user("alice", "secret")
+        self.assertTrue(self.db.authenticate_user("alice", "secret"))
+        with patch.object(self.db.hasher, "verify") as verify:
+            self.assertTrue(self.db.authenticate_user("alice", "secret"))
+            verify.assert_not_called()
+            verify.return_value = False
+            self.assertFalse(self.db.authenticate_user("alice", "wrong"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,207 @@
+import unittest
+import os
+import tempfile
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.document import Document
+from core.line_index import LineIndex
+
+
+class TestDocument(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "file.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_text_by_line(self):
+        document = Document.from_text("a\nbé\nc")
+
+        self.assertEqual(document.get_text(1, 2), "bé\n")
+        self.assertEqual(document.line_count, 3)
+
+    def test_save_over_mapped_original(self):
+        with open(self.path, "wb") as file:
+            file.write(b"first\nsecond\n")
+        index = LineIndex.from_path(self.path)
+        index.build()
+        document = Document.from_index(index)
+
+        document.insert(document.line_start(1), "inserted\n")
+        saved = document.save(self.path)
+
+        with open(self.path, "rb") as file:
+            self.assertEqual(file.read(), b"first\ninserted\nsecond\n")
+        self.assertFalse(document.modified)
+        self.assertFalse(saved.patched)
+        self.assertEqual(os.listdir(self.directory.name), ["file.txt"])
+        document.close()
+
+    def test_save_preserves_permissions(self):
+        with open(self.path, "w") as file:
+            file.write("old")
+        os.chmod(self.path, 0o640)
+
+        Document.from_text("new").save(self.path)
+
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o640)
+
+    def open_mapped(self, data):
+        with open(self.path, "wb") as file:
+            file.write(data)
+        index = LineIndex.from_path(self.path)
+        index.build()
+        document = Document.from_index(index)
+        self.addCleanup(document.close)
+        return document
+
+    def read(self):
+        with open(self.path, "rb") as file:
+            return file.read()
+
+    def test_same_length_edit_patches_in_place(self):
+        document = self.open_mapped(b"abcdefghij" * 100)
+        inode = os.stat(self.path).st_ino
+
+        document.delete(500, 3)
+        document.insert(500, "XYZ")
+        saved = document.save(self.path)
+
+        self.assertTrue(saved.patched)
+        self.assertEqual(saved.stats.bytes_written, 3)
+        self.assertEqual(os.stat(self.path).st_ino, inode)
+        self.assertEqual(self.read(), document.table.read())
+
+    def test_tail_edit_patches_in_place(self):
+        document = self.open_mapped(b"line\n" * 200)
+
+        document.delete(len(document) - 5, 5)
+        document.insert(len(document), "new tail\n")
+        saved = document.save(self.path)
+        document.insert(len(document), "more\n")
+        saved_again = document.save(self.path)
+
+        self.assertTrue(saved.patched)
+        self.assertTrue(saved_again.patched)
+        self.assertEqual(saved_again.stats.bytes_written, 5)
+        self.assertEqual(self.read(), b"line\n" * 199 + b"new tail\nmore\n")
+
+    def test_undo_after_patched_save_restores_mapped_text(self):
+        document = self.open_mapped(b"hello world\n" * 100)
+
+        document.delete(0, 1)
+        document.insert(0, "J")
+        saved = document.save(self.path)
+        document.undo()
+        document.undo()
+
+        self.assertFalse(saved.patched)
+        self.assertEqual(document.table.read(), b"hello world\n" * 100)
+        self.assertEqual(self.read(), b"Jello world\n" + b"hello world\n" * 99)
+
+    def test_undo_after_truncating_save_restores_mapped_tail(self):
+        data = b"0123456789" * 120_000
+        document = self.open_mapped(data)
+
+        document.delete(len(document) - 100_000, 100_000)
+        saved = document.save(self.path)
+        document.undo()
+
+        self.assertFalse(saved.patched)
+        self.assertEqual(self.read(), data[:-100_000])
+        self.assertEqual(document.table.read(), data)
+
+    def test_tail_edit_without_history_still_patches(self):
+        document = self.open_mapped(b"line\n" * 200)
+
+        document.delete(len(document) - 5, 5)
+        document.history.clear()
+        saved = document.save(self.path)
+
+        self.assertTrue(saved.patched)
+        self.assertEqual(self.read(), b"line\n" * 199)
+
+    def test_undo_after_patched_save_restores_mapped_text(self):
+        document = self.open_mapped(b"hello world\n" * 100)
+
+        document.delete(0, 1)
+        document.insert(0, "J")
+        saved = document.save(self.path)
+        document.undo()
+        document.undo()
+
+        self.assertTrue(saved.patched)
+        self.assertEqual(self.read(), b"Jello world\n" + b"hello world\n" * 99)
+        self.assertEqual(document.table.read(), b"hello world\n" * 100)
+
+    def test_undo_after_truncating_save_restores_mapped_tail(self):
+        data = b"0123456789" * 120_000
+        document = self.open_mapped(data)
+
+        document.delete(len(document) - 100_000, 100_000)
+        saved = document.save(self.path)
+        document.undo()
+
+        self.assertTrue(saved.patched)
+        self.assertEqual(self.read(), data[:-100_000])
+        self.assertEqual(document.table.read(), data)
+
+    def test_large_undoable_truncation_falls_back_to_full_save(self):
+        data = b"0123456789" * 120_000
+        document = self.open_mapped(data)
+        inode = os.stat(self.path).st_ino
+
+        document.delete(200_000, len(document) - 200_000)
+        saved = document.save(self.path)
+        document.undo()
+
+        self.assertFalse(saved.patched)
+        self.assertNotEqual(os.stat(self.path).st_ino, inode)
+        self.assertEqual(self.read(), data[:200_000])
+        self.assertEqual(document.table.read(), data)
+
+    def test_shifting_edit_falls_back_to_full_save(self):
+        document = self.open_mapped(b"line\n" * 200)
+
+        document.insert(0, "head\n")
+        saved = document.save(self.path)
+
+        self.assertFalse(saved.patched)
+        self.assertEqual(self.read(), b"head\n" + b"line\n" * 200)
+
+    def test_external_change_falls_back_to_full_save(self):
+        document = self.open_mapped(b"0123456789" * 10)
+        document.delete(0, 1)
+        document.insert(0, "X")
+        with open(self.path, "ab") as file:
+            file.write(b"appended elsewhere")
+
+        saved = document.save(self.path)
+
+        self.assertFalse(saved.patched)
+        self.assertEqual(self.read(), b"X123456789" + b"0123456789" * 9)
+
+    def test_moved_mapped_text_is_not_patched(self):
+        document = self.open_mapped(b"AAAA" + b"." * 100 + b"BBBB")
+        document.PATCH_RATIO = 1.0
+
+        document.delete(0, 4)
+        document.table.insert(100, document.table.original.data[0:4])
+        document.version += 1
+        self.assertEqual(document.table.read(), b"." * 100 + b"AAAABBBB")
+        # Swap the added copy for a reference into the mapped original.
+        for piece in document.table.pieces():
+            if piece.buffer is document.table.added:
+                piece.buffer = document.table.original
+                piece.start = 0
+        saved = document.save(self.path)
+
+        self.assertFalse(saved.patched)
+        self.assertEqual(self.read(), b"." * 100 + b"AAAABBBB")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,34 @@
+import os
+import tempfile
 import unittest
-from unittest.mock import Mock, patch, mock_open
+import subprocess
+from unittest.mock import MagicMock, Mock, patch, mock_open
+from concurrent.futures import Future
 import tkinter as tk
 import sys
 from pathlib import Path
 
 # Add the src directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
-from gui.editor import FileEditor
+from gui.editor import FileEditor, LARGE_FILE_THRESHOLD
+from core.document import Document
+from core.editor_core import EditorCore
+from core.io_worker import IOTask
+from core.text_format import TextFormat
+
+
+def open_text(text):
+    return EditorCore(Document.from_text(text))
+
+
+def run_now(function, *args, total=0):
+    task = IOTask(total)
+    task.future = Future()
+    try:
+        task.future.set_result(function(*args, task=task))
+    except Exception as e:
+        task.future.set_exception(e)
+    return task
 
 
 class TestFileEditor(unittest.TestCase):
@@ -15,7 +37,7 @@ class TestFileEditor(unittest.TestCase):
         self.mock_root.winfo_children.return_value = []
 
         with patch("gui.editor.LoginWindow"):
-            self.editor = FileEditor(self.mock_root)
+            self.editor = FileEditor(self.mock_root, db=Mock())
 
         self.setup_ui_mocks()
 
@@ -34,17 +56,21 @@ class TestFileEditor(unittest.TestCase):
         self.editor.status_bar = self.mock_status_bar
         self.editor.menu_bar = self.mock_menu_bar
         self.editor.file_menu = self.mock_file_menu
+        self.editor.io = Mock(submit=Mock(side_effect=run_now))
+        self.editor.sessions = Mock()
+        self.editor.find_bar = Mock()
 
+    @patch("gui.editor.os.path.getsize", return_value=12)
     @patch("gui.editor.filedialog.askopenfilename")
-    @patch("builtins.open", new_callable=mock_open, read_data="file content")
-    def test_open_file_success(self, mock_file, mock_filedialog):
+    @patch("builtins.open", new_callable=mock_open, read_data=b"file content")
+    def test_open_file_success(self, mock_file, mock_filedialog, mock_getsize):
         self.editor.current_user = "test_user"
         mock_filedialog.return_value = "/path/to/file.txt"
 
         self.editor.open_file()
 
         mock_filedialog.assert_called_once()
-        mock_file.assert_called_once_with("/path/to/file.txt", "r", encoding="utf-8")
+        mock_file.assert_called_once_with("/path/to/file.txt", "rb")
         self.mock_text_area.delete.assert_called_with(1.0, tk.END)
         self.mock_text_area.insert.assert_called_with(tk.END, "file content")
         self.assertEqual(self.editor.current_file, "/path/to/file.txt")
@@ -52,6 +78,19 @@ class TestFileEditor(unittest.TestCase):
             text="Opened: /path/to/file.txt - Logged in as: test_user"
         )
 
+    @patch("gui.editor.os.path.getsize", return_value=LARGE_FILE_THRESHOLD)
+    @patch("gui.editor.filedialog.askopenfilename")
+    @patch.object(FileEditor, "open_large_file")
+    def test_open_file_large_uses_windowed_view(
+        self, mock_open_large, mock_filedialog, mock_getsize
+    ):
+        mock_filedialog.return_value = "/path/to/huge.log"
+
+        self.editor.open_file()
+
+        mock_open_large.assert_called_once_with("/path/to/huge.log")
+        self.mock_text_area.insert.assert_not_called()
+
     @patch("gui.editor.filedialog.asksaveasfilename")
     @patch.object(FileEditor, "save_file")
     def test_save_as_file_success(self, mock_save_file, mock_filedialog):
@@ -60,8 +99,401 @@ class TestFileEditor(unittest.TestCase):
         self.editor.save_as_file()
 
         mock_filedialog.assert_called_once()
-        self.assertEqual(self.editor.current_file, "/path/to/newfile.txt")
-        mock_save_file.assert_called_once()
+        mock_save_file.assert_called_once_with("/path/to/newfile.txt")
+
+    def test_save_as_keeps_current_file_until_save_is_submitted(self):
+        self.editor.current_file = "/path/to/original.txt"
+        self.editor.document = Mock()
+        self.editor.io_job = (Mock(), "Opening", Mock(), "error", None)
+
+        with patch("gui.editor.messagebox.showinfo"):
+            self.editor.save_file("/path/to/other.txt")
+
+        self.assertEqual(self.editor.current_file, "/path/to/original.txt")
+        self.editor.document.save_job.assert_not_called()
+
+    @patch("gui.editor.messagebox.showinfo")
+    def test_finish_save_ignores_replaced_document(self, mock_showinfo):
+        old_document = Mock()
+        self.editor.document = Mock()
+
+        self.editor.finish_save("/path/to/file.txt", old_document, Mock())
+
+        old_document.mark_saved.assert_not_called()
+        self.editor.document.mark_saved.assert_not_called()
+        mock_showinfo.assert_not_called()
+
+    @patch("gui.editor.messagebox.showinfo")
+    def test_finish_save_resets_the_edit_journal(self, mock_showinfo):
+        document = MagicMock()
+        self.editor.document = document
+        self.editor.journal = Mock()
+        saved = Mock(patched=False)
+        saved.stats.bytes_written = 0
+
+        self.editor.finish_save("/path/to/file.txt", document, saved, 7)
+
+        document.mark_saved.assert_called_once_with(saved)
+        self.editor.journal.saved.assert_called_once_with(
+            document, "/path/to/file.txt", 7
+        )
+
+    def unencodable_document(self, folder):
+        path = os.path.join(folder, "notes.txt")
+        with open(path, "wb") as file:
+            file.write(b"caf\xe9\r\n")
+        document = Document.from_text("café\n")
+        document.text_format = TextFormat("cp1252", b"", "\r\n")
+        document.attach_file(path)
+        document.insert(0, "中")
+        self.editor.document = document
+        self.editor.current_file = path
+        return path, document
+
+    @patch("gui.editor.messagebox.showinfo")
+    @patch("gui.editor.messagebox.showerror")
+    @patch("gui.editor.messagebox.askyesno", return_value=True)
+    def test_unencodable_text_is_saved_as_utf8(
+        self, mock_askyesno, mock_showerror, mock_showinfo
+    ):
+        self.editor.record_version = Mock()
+        with tempfile.TemporaryDirectory() as folder:
+            path, document = self.unencodable_document(folder)
+
+            self.editor.save_file()
+
+            with open(path, "rb") as file:
+                self.assertEqual(file.read(), "中café\r\n".encode("utf-8"))
+        self.assertEqual(document.text_format, TextFormat("utf-8", b"", "\r\n"))
+        mock_askyesno.assert_called_once()
+        mock_showerror.assert_not_called()
+
+    @patch("gui.editor.messagebox.askyesno", return_value=False)
+    def test_declined_encoding_change_leaves_the_file(self, mock_askyesno):
+        with tempfile.TemporaryDirectory() as folder:
+            path, document = self.unencodable_document(folder)
+
+            self.editor.save_file()
+
+            with open(path, "rb") as file:
+                self.assertEqual(file.read(), b"caf\xe9\r\n")
+        self.assertEqual(document.text_format.encoding, "cp1252")
+        self.assertIsNone(self.editor.io_job)
+
+    def test_saved_file_is_recorded_in_history(self):
+        self.editor.current_user = "test_user"
+        self.editor.history = Mock()
+        self.editor.history.record.return_value = Mock(
+            version_id=3, added_bytes=2048, new_chunks=1, chunk_count=40, seconds=0.5
+        )
+
+        self.editor.record_version("/path/to/file.txt", 400)
+
+        self.editor.history.record.assert_called_once()
+        self.mock_status_bar.config.assert_called_with(
+            text="Saved: /path/to/file.txt - version 3 added 2.0 KB (1 of 40 chunks "
+            "new) in 0.50 s - Logged in as: test_user"
+        )
+
+    @patch("gui.editor.messagebox.askyesno")
+    @patch("gui.editor.messagebox.showinfo")
+    def test_logout_blocked_while_io_running(self, mock_showinfo, mock_askyesno):
+        self.editor.io_job = (Mock(), "Saving", Mock(), "error", None)
+
+        self.editor.logout()
+
+        mock_askyesno.assert_not_called()
+        mock_showinfo.assert_called_once()
+
+    @patch("gui.editor.LoginWindow")
+    @patch("gui.editor.messagebox.askyesno", return_value=True)
+    def test_logout_reuses_the_login_window_and_ui(
+        self, mock_askyesno, mock_login_window
+    ):
+        self.editor.tab_bar = tab_bar = Mock()
+        login_window = self.editor.login_window
+
+        self.editor.logout()
+
+        mock_login_window.assert_not_called()
+        login_window.show.assert_called_once()
+        self.editor.find_bar.hide.assert_called_once()
+        self.assertIs(self.editor.tab_bar, tab_bar)
+        self.assertTrue(self.editor.tab.untouched)
+
+    def test_finish_replace_all_rewrites_buffer_once(self):
+        document = Mock(version=3)
+        self.editor.document = document
+
+        self.editor.finish_replace_all(document, 3, "new text", 42)
+
+        self.mock_text_area.replace.assert_called_once_with("1.0", "end-1c", "new text")
+        self.mock_text_area.insert.assert_not_called()
+
+    def test_finish_replace_all_skips_edited_document(self):
+        document = Mock(version=4)
+        self.editor.document = document
+
+        self.editor.finish_replace_all(document, 3, "new text", 42)
+
+        self.mock_text_area.replace.assert_not_called()
+
+    def test_undo_and_redo_replay_document_history(self):
+        self.editor.tab.document = document = Mock()
+        self.editor.tab.binding = binding = Mock(read_only=False)
+
+        self.assertEqual(self.editor.undo(), "break")
+        self.editor.redo()
+
+        document.undo.assert_called_once_with(binding.splice)
+        document.redo.assert_called_once_with(binding.splice)
+
+    @patch("gui.editor.messagebox.showinfo")
+    def test_follow_needs_a_saved_file(self, mock_showinfo):
+        self.editor.tab.binding = Mock()
+
+        self.editor.start_follow()
+
+        mock_showinfo.assert_called_once()
+        self.assertIsNone(self.editor.tab.follower)
+
+    def test_follow_batch_appends_and_caps_lines(self):
+        tab = self.follow_tab("one\ntwo\n")
+        document = tab.document
+        self.mock_text_area.yview.return_value = (0.5, 1.0)
+        self.editor.follow_lines = 3
+
+        self.editor.follow_batch(tab, False, "three\nfour\n")
+
+        self.assertEqual(document.text(), "three\nfour\n")
+        self.assertFalse(document.modified)
+        self.assertEqual(len(document.history), 0)
+        self.mock_text_area.see.assert_called_once_with(tk.END)
+
+        self.editor.follow_batch(tab, True, "rotated\n")
+        self.assertEqual(document.text(), "rotated\n")
+
+    def follow_tab(self, text):
+        tab = self.editor.tab
+        tab.path = "/path/to/app.log"
+        tab.document = document = Document.from_text(text)
+
+        def replace_range(offset, length, text):
+            document.delete(offset, length)
+            document.insert(offset, text)
+
+        tab.binding = Mock(read_only=True)
+        tab.binding.replace_range.side_effect = replace_range
+        self.mock_text_area.yview.return_value = (0.0, 0.5)
+        return tab
+
+    @patch("gui.editor.COMPACT_SLACK_BYTES", 0)
+    def test_follow_keeps_buffers_bounded(self):
+        tab = self.follow_tab("")
+        self.editor.follow_lines = 100
+        line = "x" * 99 + "\n"
+
+        for _ in range(2000):
+            self.editor.follow_batch(tab, False, line * 10)
+
+        table = tab.document.table
+        self.assertEqual(tab.document.text(), line * 99)
+        held = len(table.original.data) + len(table.added.data)
+        self.assertLessEqual(held, 60_000)
+        self.assertLessEqual(len(table.added.line_starts), 1000)
+
+    @patch("gui.editor.filedialog.asksaveasfilename")
+    @patch("gui.editor.messagebox.showinfo")
+    def test_save_is_refused_while_following(self, mock_showinfo, mock_dialog):
+        tab = self.follow_tab("tail\n")
+        tab.follower = Mock()
+
+        self.editor.save_file()
+        self.editor.save_as_file()
+
+        self.assertEqual(mock_showinfo.call_count, 2)
+        mock_dialog.assert_not_called()
+        self.editor.io.submit.assert_not_called()
+
+    @patch("gui.editor.messagebox.showinfo")
+    def test_stop_follow_stays_read_only_until_reread(self, mock_showinfo):
+        tab = self.follow_tab("tail\n")
+        tab.follower = follower = Mock()
+        tab.follow_version = 0
+        tab.document.insert(5, "more\n")
+        self.editor.io_job = Mock()
+
+        self.editor.stop_follow()
+        follower.stop.assert_not_called()
+
+        self.editor.io_job = None
+        with patch.object(self.editor, "read_file") as read_file:
+            self.editor.stop_follow()
+
+        follower.stop.assert_called_once()
+        read_file.assert_called_once_with("/path/to/app.log")
+        self.assertTrue(tab.read_only)
+
+    def test_recovery_runs_on_the_io_pool_before_session_restore(self):
+        self.editor.journal = journal = Mock()
+        journal.recoverable.return_value = [(1, "/path/to/a.txt", None)]
+        document = Document.from_text("recovered")
+        entry = Mock(path="/path/to/a.txt", document=document, edits=())
+        journal.recover.return_value = ([entry], [])
+        journal.track.side_effect = lambda document, *args: setattr(
+            document, "journal", Mock()
+        )
+        calls = []
+        self.editor.io.submit.side_effect = lambda fn, *a, **k: (
+            calls.append("recover"),
+            run_now(fn, *a, **k),
+        )[1]
+
+        with patch("gui.editor.messagebox.askyesno", return_value=True), patch.object(
+            self.editor, "restore_session", side_effect=lambda: calls.append("restore")
+        ):
+            self.editor.offer_recovery()
+
+        self.assertEqual(calls, ["recover", "restore"])
+        self.assertIs(self.editor.tab.document, document)
+        journal.track.assert_called_once_with(document, "/path/to/a.txt", ())
+
+    def test_tab_keeps_the_core_it_was_opened_with(self):
+        self.mock_text_area.yview.return_value = (0.0, 1.0)
+        core = open_text("first")
+
+        self.editor.finish_open("/path/to/a.txt", core)
+        self.editor.current_file = "/path/to/b.txt"
+
+        self.assertIs(self.editor.core, core)
+        self.assertIs(self.editor.document, core.document)
+        self.assertEqual(core.path, "/path/to/b.txt")
+
+    def open_second_tab(self):
+        self.mock_text_area.yview.return_value = (0.0, 1.0)
+        self.editor.finish_open("/path/to/a.txt", open_text("first"))
+        first = self.editor.tab
+        second_area = Mock()
+        second_area.get.return_value = ""
+        second_area.yview.return_value = (0.0, 1.0)
+        with patch.object(self.editor, "make_text_area", return_value=second_area):
+            self.editor.finish_open("/path/to/b.txt", open_text("second"))
+        return first, second_area
+
+    def test_opening_another_file_adds_a_tab(self):
+        first, second_area = self.open_second_tab()
+
+        self.assertEqual(len(self.editor.tabs), 2)
+        self.assertEqual(self.editor.current_file, "/path/to/b.txt")
+        self.assertIs(self.editor.text_area, second_area)
+        first.text_area.pack_forget.assert_called_once()
+        second_area.insert.assert_called_with(tk.END, "second")
+
+    @patch("gui.editor.os.path.getsize")
+    def test_load_file_switches_to_an_open_tab(self, mock_getsize):
+        first, _ = self.open_second_tab()
+
+        self.editor.load_file("/path/to/a.txt")
+
+        self.assertIs(self.editor.tab, first)
+        mock_getsize.assert_not_called()
+
+    def test_least_recent_tab_releases_its_widget(self):
+        self.editor.tabs.live_limit = 1
+        first, _ = self.open_second_tab()
+
+        self.mock_text_area.destroy.assert_called_once()
+        self.assertIsNone(first.text_area)
+        self.assertEqual(first.document.text(), "first")
+
+    @patch("gui.editor.os.path.getsize", return_value=5)
+    @patch("builtins.open", new_callable=mock_open, read_data=b"first")
+    def test_dropped_buffer_is_read_back_when_shown(self, mock_file, mock_getsize):
+        self.editor.tabs.live_limit = 1
+        self.editor.tabs.memory_budget = 0
+        first, _ = self.open_second_tab()
+        self.assertIsNone(first.document)
+
+        restored_area = Mock()
+        restored_area.get.return_value = ""
+        with patch.object(self.editor, "make_text_area", return_value=restored_area):
+            self.editor.show_tab(first)
+
+        mock_file.assert_called_once_with("/path/to/a.txt", "rb")
+        self.assertEqual(first.document.text(), "first")
+        restored_area.insert.assert_called_with(tk.END, "first")
+
+    @patch("gui.editor.messagebox.askyesno", return_value=False)
+    def test_close_tab_keeps_unsaved_changes_when_declined(self, mock_askyesno):
+        self.editor.finish_open("/path/to/a.txt", open_text("first"))
+        self.editor.document.insert(0, "x")
+
+        self.editor.close_tab()
+
+        mock_askyesno.assert_called_once()
+        self.assertEqual(len(self.editor.tabs), 1)
+        self.mock_text_area.destroy.assert_not_called()
+
+
+    @patch("gui.editor.os.path.getsize", return_value=5)
+    @patch("gui.editor.os.path.isfile", return_value=True)
+    @patch("builtins.open", new_callable=mock_open, read_data=b"saved")
+    def test_session_restores_the_visible_tab_first(
+        self, mock_file, mock_isfile, mock_getsize
+    ):
+        self.editor.tab_bar = Mock()
+        self.editor.sessions.load.return_value = Mock(
+            geometry="900x700",
+            tabs=[("/path/to/a.txt", 0.0, "1.0"), ("/path/to/b.txt", 0.5, "1.3")],
+            active=1,
+        )
+        with patch.object(self.editor, "make_text_area", return_value=Mock()):
+            self.editor.restore_session()
+
+        first, second = self.editor.tabs
+        self.mock_root.geometry.assert_called_with("900x700")
+        self.assertIs(self.editor.tab, second)
+        self.assertEqual(second.document.text(), "saved")
+        second.text_area.mark_set.assert_called_with(tk.INSERT, "1.3")
+        # The hidden tab is read ahead without building its widget.
+        self.assertEqual(first.document.text(), "saved")
+        self.assertIsNone(first.text_area)
+
+    def test_logout_saves_the_open_tabs(self):
+        self.editor.current_user = "test_user"
+        self.editor.tab_bar = Mock()
+        self.mock_text_area.yview.return_value = (0.25, 1.0)
+        self.mock_text_area.index.return_value = "4.2"
+        self.mock_root.geometry.return_value = "800x600+0+0"
+        self.editor.finish_open("/path/to/a.txt", open_text("text"))
+
+        with patch("gui.editor.messagebox.askyesno", return_value=True):
+            self.editor.logout()
+
+        self.editor.sessions.save.assert_called_once_with(
+            "test_user", "800x600+0+0", [("/path/to/a.txt", 0.25, "4.2")], 0
+        )
+        self.editor.sessions.add_recent.assert_called_with(
+            "test_user", "/path/to/a.txt"
+        )
+
+
+class TestEditorImports(unittest.TestCase):
+    def test_startup_does_not_load_about_dependencies(self):
+        src = Path(__file__).parent.parent.parent / "src"
+        code = (
+            "import sys, main; "
+            "print(sorted({'psutil', 'gui.about', 'multiprocessing'} & set(sys.modules)))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=src,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+        self.assertEqual(output.strip(), "[]")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.editor_core import EditorCore
+from core.search import SearchQuery
+
+
+class TestEditorCore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "notes.txt")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, data):
+        with open(self.path, "wb") as file:
+            file.write(data)
+
+    def read(self):
+        with open(self.path, "rb") as file:
+            return file.read()
+
+    def test_open_edit_save(self):
+        self.write(b"one\r\ntwo\r\n")
+        core = EditorCore.open(self.path)
+
+        core.insert(0, "zero\n")
+        core.save()
+
+        self.assertEqual(self.read(), b"zero\r\none\r\ntwo\r\n")
+        self.assertFalse(core.document.modified)
+
+    @patch("core.editor_core.LARGE_FILE_THRESHOLD", 8)
+    def test_large_files_are_indexed_not_decoded(self):
+        self.write(b"line one\nline two\n")
+        core = EditorCore.open(self.path)
+
+        self.assertIsNotNone(core.document.source)
+        self.assertEqual(core.document.get_text(1, 2), "line two\n")
+        core.close()
+
+    def test_undo_and_redo(self):
+        core = EditorCore()
+        core.insert(0, "hello world")
+        core.delete(5, 6)
+        core.insert(5, "!")
+
+        self.assertTrue(core.undo())
+        self.assertTrue(core.undo())
+        self.assertEqual(core.text(), "hello world")
+        self.assertTrue(core.redo())
+        self.assertEqual(core.text(), "hello")
+        core.insert(5, "?")
+        self.assertFalse(core.redo())
+        self.assertTrue(core.undo())
+        self.assertTrue(core.undo())
+        self.assertTrue(core.undo())
+        self.assertFalse(core.undo())
+        self.assertEqual(core.text(), "")
+
+    def test_typing_undoes_a_word_at_a_time(self):
+        core = EditorCore()
+        for i, char in enumerate("one two"):
+            core.insert(i, char)
+
+        core.undo()
+        self.assertEqual(core.text(), "one ")
+
+    def test_search_and_replace_all(self):
+        core = EditorCore()
+        core.insert(0, "cat dog\ncat\n")
+
+        result = core.search(SearchQuery("cat"))
+        count = core.replace_all(SearchQuery("cat"), "cow")
+
+        matches = [result[i] for i in range(len(result))]
+        self.assertEqual(matches, [(0, 0, 3), (1, 0, 3)])
+        self.assertEqual(count, 2)
+        self.assertEqual(core.text(), "cow dog\ncow\n")
+        core.undo()
+        self.assertEqual(core.text(), "cat dog\ncat\n")
+
+
+    def test_search_job_reads_the_text_as_it_was_submitted(self):
+        core = EditorCore()
+        core.insert(0, "cat\n")
+
+        job, result, total = core.search_job(SearchQuery("cat"))
+        core.insert(0, "cat ")
+        job()
+
+        self.assertEqual(total, 4)
+        self.assertEqual([result[i] for i in range(len(result))], [(0, 0, 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.follow import FileFollower
+from core.text_format import NATIVE, TextFormat
+
+
+class TestFileFollower(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "app.log")
+        self.write(b"first\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, data, mode="wb"):
+        with open(self.path, mode) as file:
+            file.write(data)
+
+    def follower(self, text_format=NATIVE):
+        stat = os.stat(self.path)
+        return FileFollower(
+            self.path, stat.st_size, (stat.st_dev, stat.st_ino), text_format
+        )
+
+    def test_reads_only_appended_text(self):
+        follower = self.follower()
+        follower.poll()
+        self.assertEqual(follower.take(), (False, ""))
+
+        self.write(b"second\n", "ab")
+        self.write(b"third", "ab")
+        follower.poll()
+
+        self.assertEqual(follower.take(), (False, "second\nthird"))
+        self.assertEqual(follower.offset, len(b"first\nsecond\nthird"))
+
+    def test_truncation_starts_again_from_the_top(self):
+        follower = self.follower()
+        self.write(b"new\n", "r+b")
+        os.truncate(self.path, 4)
+        follower.poll()
+
+        self.assertEqual(follower.take(), (True, "new\n"))
+
+    def test_rotation_follows_the_new_file(self):
+        follower = self.follower()
+        os.rename(self.path, self.path + ".1")
+        follower.poll()
+        self.assertEqual(follower.take(), (False, ""))
+
+        self.write(b"after rotation\n")
+        follower.poll()
+
+        self.assertEqual(follower.take(), (True, "after rotation\n"))
+
+    def test_decodes_in_the_file_format(self):
+        follower = self.follower(TextFormat("utf-16-le", b"", "\r\n"))
+        data = "añadido\r\n".encode("utf-16-le")
+        self.write(data[:3], "ab")
+        follower.poll()
+        self.write(data[3:], "ab")
+        follower.poll()
+
+        self.assertEqual(follower.take(), (False, "añadido\n"))
+
+    @patch("core.follow.MAX_PENDING_BYTES", 10)
+    @patch("core.follow.CHUNK_SIZE", 4)
+    def test_pending_text_is_capped_oldest_first(self):
+        follower = self.follower()
+        self.write(b"0123456789abcdef", "ab")
+        follower.poll()
+
+        self.assertEqual(follower.take(), (False, "89abcdef"))
+
+    def test_thread_collects_in_the_background(self):
+        follower = self.follower()
+        follower.interval = 0.01
+        follower.start()
+        try:
+            self.write(b"more\n", "ab")
+            deadline = time.monotonic() + 5
+            text = ""
+            while "more" not in text and time.monotonic() < deadline:
+                time.sleep(0.01)
+                text += follower.take()[1]
+        finally:
+            follower.stop()
+
+        self.assertEqual(text, "more\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+import multiprocessing
+import os
+import random
+import tempfile
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.grep import (
+    INDEX_CHUNK,
+    GrepIndex,
+    GrepResults,
+    grep_folder,
+    query_trigrams,
+    trigrams,
+)
+from core.io_worker import IOTask
+
+
+class TestGrep(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.folder = os.path.join(self.temp_dir.name, "project")
+        self.index_path = os.path.join(self.temp_dir.name, "index.db")
+        self.write("main.py", "import os\n\ndef needle():\n    return 'needle'\n")
+        self.write("notes.txt", "nothing here\n")
+        self.write("lib/util.rs", "fn main() {}\n// Needle in caps\n")
+        self.write("image.bin", b"\x89PNG\x00needle")
+        self.write(".git/config", "needle\n")
+        self.write("empty.txt", "")
+
+    def write(self, name, content):
+        path = os.path.join(self.folder, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        mode = "wb" if isinstance(content, bytes) else "w"
+        with open(path, mode) as file:
+            file.write(content)
+        return path
+
+    def grep(self, pattern, regex=False, match_case=True, executor=None):
+        results = GrepResults()
+        grep_folder(
+            self.folder,
+            (pattern, regex, match_case),
+            results,
+            self.index_path,
+            executor,
+            IOTask(),
+        )
+        return results
+
+    def found(self, results):
+        return sorted(
+            (os.path.relpath(path, self.folder), line, column)
+            for path, line, column, _ in results.items
+        )
+
+    def test_finds_matches_and_skips_binaries_and_vcs_dirs(self):
+        results = self.grep("needle")
+
+        self.assertEqual(self.found(results), [("main.py", 2, 4), ("main.py", 3, 12)])
+        self.assertTrue(results.complete)
+        self.assertEqual(results.items[0][3], "def needle():")
+
+    def test_case_insensitive_and_regex(self):
+        results = self.grep(r"need\w+", regex=True, match_case=False)
+
+        self.assertIn(("lib/util.rs", 1, 3), self.found(results))
+        self.assertEqual(len(results.items), 3)
+
+    def test_repeat_search_uses_index(self):
+        self.grep("needle")
+
+        results = self.grep("needle")
+        self.assertEqual(len(results.items), 2)
+        # notes.txt and empty.txt lack the trigrams; image.bin is binary.
+        # util.rs has "Needle", and the index is case-insensitive.
+        self.assertEqual(results.files_skipped, 3)
+
+        self.write("notes.txt", "now a needle too\n")
+        results = self.grep("needle")
+        self.assertIn(("notes.txt", 0, 6), self.found(results))
+
+    def test_random_data_is_searched_but_not_indexed(self):
+        # No zero bytes, so it is not taken for a binary file.
+        noise = random.Random(3).randbytes(100_000).replace(b"\0", b"\1")
+        self.write("noise.dat", noise + b"\nneedle\n")
+
+        self.grep("needle")
+        results = self.grep("needle")
+
+        self.assertIn("noise.dat", [path for path, _, _ in self.found(results)])
+        index = GrepIndex(self.index_path)
+        self.addCleanup(index.close)
+        data = index.load(self.folder)
+        self.assertIsNone(data[os.path.join(self.folder, "noise.dat")][2])
+
+    def test_index_spans_chunk_boundaries(self):
+        text = b"a" * (INDEX_CHUNK - 1) + b"xyz"
+        found = trigrams(text)
+
+        self.assertIn(b"axy", found)
+        self.assertIn(b"xyz", found)
+
+    @patch("core.grep.MAX_TRIGRAMS", 10)
+    def test_files_with_many_trigrams_are_not_indexed(self):
+        self.assertIsNone(trigrams(b"the quick brown fox jumps"))
+
+    def test_process_pool(self):
+        executor = ProcessPoolExecutor(
+            2, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.addCleanup(executor.shutdown)
+
+        results = self.grep("needle", executor=executor)
+
+        self.assertEqual(self.found(results), [("main.py", 2, 4), ("main.py", 3, 12)])
+
+    def test_query_trigrams(self):
+        self.assertEqual(query_trigrams("Abcd", False), [b"abc", b"bcd"])
+        self.assertEqual(query_trigrams("ab", False), [])
+        self.assertEqual(query_trigrams("abc.*", True), [])
+        self.assertEqual(query_trigrams("café", False, match_case=False), [])
+        self.assertEqual(
+            query_trigrams("abcd", False, match_case=False), [b"abc", b"bcd"]
+        )
+        self.assertEqual(len(query_trigrams("café", False)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.highlight import Highlighter, PythonLexer, RustLexer, lexer_for
+
+
+def full_lex(lexer, lines):
+    state = lexer.initial
+    result = []
+    for line in lines:
+        tokens, state = lexer.lex_line(line, state)
+        result.append(tokens)
+    return result
+
+
+class CountingLines:
+    def __init__(self, lines):
+        self.lines = lines
+        self.reads = 0
+
+    def __call__(self, line):
+        self.reads += 1
+        return self.lines[line]
+
+
+class TestLexers(unittest.TestCase):
+    def test_python_tokens(self):
+        tokens, state = PythonLexer().lex_line("def run(x):  # go", "")
+
+        self.assertEqual(
+            tokens, [("keyword", 0, 3), ("definition", 4, 7), ("comment", 13, 17)]
+        )
+        self.assertEqual(state, "")
+
+    def test_python_triple_quoted_string_spans_lines(self):
+        lexer = PythonLexer()
+
+        _, state = lexer.lex_line('doc = """start', "")
+        middle, state_after_middle = lexer.lex_line("def not_code", state)
+        end, final = lexer.lex_line('end""" + 1', state_after_middle)
+
+        self.assertEqual(state, '"""')
+        self.assertEqual(middle, [("string", 0, 12)])
+        self.assertEqual(end, [("string", 0, 6), ("number", 9, 10)])
+        self.assertEqual(final, "")
+
+    def test_rust_nested_block_comments(self):
+        lexer = RustLexer()
+
+        _, state = lexer.lex_line("fn main() { /* a /* b */", "")
+        tokens, state = lexer.lex_line('c */ let s = "x";', state)
+
+        self.assertEqual(state, "")
+        self.assertEqual(tokens[0], ("comment", 0, 4))
+        self.assertIn(("keyword", 5, 8), tokens)
+        self.assertIn(("string", 13, 16), tokens)
+
+    def test_rust_raw_strings_and_macros(self):
+        tokens, state = RustLexer().lex_line('println!(r#"a "q" b"#);', "")
+
+        self.assertEqual(tokens, [("macro", 0, 8), ("string", 9, 21)])
+        self.assertEqual(state, "")
+
+    def test_lexer_for_extension(self):
+        self.assertIsInstance(lexer_for("/tmp/app.PY"), PythonLexer)
+        self.assertIsInstance(lexer_for("main.rs"), RustLexer)
+        self.assertIsNone(lexer_for("notes.txt"))
+        self.assertIsNone(lexer_for(None))
+
+
+class TestHighlighter(unittest.TestCase):
+    def setUp(self):
+        self.lexer = PythonLexer()
+        self.lines = [f"value_{i} = {i}  # line {i}" for i in range(1000)]
+        self.highlighter = Highlighter(self.lexer, len(self.lines))
+        self.highlighter.advance(len(self.lines) - 1, self.lines.__getitem__)
+
+    def tokens(self):
+        get_line = self.lines.__getitem__
+        self.highlighter.advance(len(self.lines) - 1, get_line)
+        return [
+            self.highlighter.tokens(line, get_line) for line in range(len(self.lines))
+        ]
+
+    def test_edit_inside_a_line_relexes_only_that_line(self):
+        self.lines[500] = "value = 'changed'"
+        self.highlighter.edit(500, 0, 0)
+        get_line = CountingLines(self.lines)
+
+        self.highlighter.advance(999, get_line)
+
+        self.assertEqual(get_line.reads, 1)
+        self.assertEqual(list(self.highlighter.stale_lines(0, 1000)), list(range(1000)))
+
+    def test_unclosed_string_relexes_until_state_matches(self):
+        self.lines[10] = 'text = """'
+        self.lines.insert(11, "inside")
+        self.lines.insert(12, '"""')
+        self.highlighter.edit(10, 0, 2)
+        get_line = CountingLines(self.lines)
+
+        self.highlighter.advance(len(self.lines) - 1, get_line)
+
+        self.assertEqual(get_line.reads, 3)
+        self.assertEqual(self.highlighter.states[11], '"""')
+        self.assertEqual(self.highlighter.states[13], "")
+
+    def test_opening_a_string_invalidates_following_lines(self):
+        self.tokens()
+        self.lines[10] = 'text = """'
+        self.highlighter.edit(10, 0, 0)
+
+        self.highlighter.advance(20, self.lines.__getitem__)
+
+        self.assertEqual(list(self.highlighter.stale_lines(0, 21)), list(range(10, 21)))
+
+    def test_random_edits_match_full_relex(self):
+        rng = random.Random(7)
+        pieces = ['"""', "x = 1", "# c", "'''", "def f():", ""]
+        for _ in range(300):
+            line = rng.randrange(len(self.lines))
+            removed = rng.randrange(min(3, len(self.lines) - line))
+            added = rng.randrange(3)
+            replacement = [rng.choice(pieces) for _ in range(added + 1)]
+            self.lines[line : line + removed + 1] = replacement
+            self.highlighter.edit(line, removed, added)
+            if rng.random() < 0.3:
+                # A deadline of 0 stops after one line, like a cut-off slice.
+                self.highlighter.advance(
+                    rng.randrange(len(self.lines)),
+                    self.lines.__getitem__,
+                    rng.choice((0, None)),
+                )
+
+        self.assertEqual(self.highlighter.line_count, len(self.lines))
+        self.assertEqual(self.tokens(), full_lex(self.lexer, self.lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
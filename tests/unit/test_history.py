@@ -0,0 +1,97 @@
+import os
+import random
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from db.db import Database
+from db.history import FileHistory
+
+
+def text(lines, seed=1):
+    rng = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta"]
+    return "".join(
+        " ".join(rng.choice(words) + str(rng.randint(0, 999)) for _ in range(8)) + "\n"
+        for _ in range(lines)
+    ).encode()
+
+
+class TestFileHistory(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.dir.name, "editor.db"))
+        self.history = FileHistory(self.db)
+        self.path = os.path.join(self.dir.name, "notes.txt")
+
+    def tearDown(self):
+        self.db.close()
+        self.dir.cleanup()
+
+    def save(self, data):
+        with open(self.path, "wb") as file:
+            file.write(data)
+        return self.history.record(self.path, "alice")
+
+    def test_small_edit_to_a_large_file_adds_little(self):
+        data = text(40000)
+        first = self.save(data)
+        middle = data.index(b"\n", len(data) // 2) + 1
+        second = self.save(data[:middle] + b"a new line\n" + data[middle:])
+
+        self.assertEqual(first.new_chunks, first.chunk_count)
+        self.assertLessEqual(second.new_chunks, 2)
+        self.assertLess(second.added_bytes, first.added_bytes / 50)
+
+    def test_versions_stream_back_exactly(self):
+        original = text(5000)
+        first = self.save(original)
+        self.save(original.replace(b"alpha", b"ALPHA"))
+
+        restored = os.path.join(self.dir.name, "restored.txt")
+        self.history.restore(first.version_id, restored)
+
+        with open(restored, "rb") as file:
+            self.assertEqual(file.read(), original)
+        self.assertEqual(
+            [row[0] for row in self.history.versions(self.path)], [2, 1]
+        )
+
+    def test_diff_reports_changed_lines_with_file_line_numbers(self):
+        data = text(20000)
+        lines = data.splitlines(keepends=True)
+        first = self.save(data)
+        lines[12345] = b"changed line\n"
+        second = self.save(b"".join(lines))
+
+        diff = list(self.history.diff(first.version_id, second.version_id))
+
+        self.assertIn("+changed line", diff)
+        self.assertIn("-" + data.splitlines()[12345].decode(), diff)
+        hunks = [line for line in diff if line.startswith("@@")]
+        self.assertEqual(len(hunks), 1)
+        self.assertTrue(hunks[0].startswith("@@ -12343,7 +12343,7 @@"))
+
+    def test_identical_saves_share_every_chunk(self):
+        data = text(3000)
+        self.save(data)
+        second = self.save(data)
+
+        stored, logical = self.history.storage()
+
+        self.assertEqual(second.new_chunks, 0)
+        self.assertEqual(logical, 2 * len(data))
+        self.assertLess(stored, len(data))
+
+    def test_empty_file(self):
+        report = self.save(b"")
+
+        self.assertEqual(report.chunk_count, 0)
+        self.assertEqual(b"".join(self.history.iter_version(report.version_id)), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
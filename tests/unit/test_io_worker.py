@@ -0,0 +1,46 @@
+import unittest
+import os
+import tempfile
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.io_worker import IOWorker, IOTask, Cancelled, read_file
+
+
+class TestIOWorker(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "file.txt")
+        with open(self.path, "wb") as file:
+            file.write(b"0123456789" * 100)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_reports_progress(self):
+        task = IOTask(total=1000)
+
+        data = read_file(self.path, task, chunk_size=64)
+
+        self.assertEqual(len(data), 1000)
+        self.assertEqual(task.progress, 1.0)
+
+    def test_cancelled_read_raises(self):
+        task = IOTask(total=1000)
+        task.cancel()
+
+        with self.assertRaises(Cancelled):
+            read_file(self.path, task, chunk_size=64)
+
+    def test_submit_runs_in_worker(self):
+        worker = IOWorker()
+        task = worker.submit(read_file, self.path, total=1000)
+
+        self.assertEqual(len(task.result()), 1000)
+        self.assertTrue(task.done())
+        worker.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
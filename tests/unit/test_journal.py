@@ -0,0 +1,224 @@
+import os
+import random
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.document import Document
+from core.text_format import TextFormat
+from db.db import Database
+from db.journal import EditJournal
+
+
+class TestEditJournal(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.dir.name, "editor.db"))
+        self.journal = EditJournal(self.db, "alice")
+
+    def tearDown(self):
+        self.db.close()
+        self.dir.cleanup()
+
+    def edit_count(self):
+        return self.db.conn.execute("SELECT COUNT(*) FROM journal_edits").fetchone()[0]
+
+    def open_file(self, text):
+        path = os.path.join(self.dir.name, "notes.txt")
+        with open(path, "w") as file:
+            file.write(text)
+        document = Document.from_text(text)
+        document.attach_file(path)
+        return path, document
+
+    def recover(self, username="alice"):
+        return EditJournal(self.db, username).recover()
+
+    def test_typing_burst_is_one_delta(self):
+        document = Document.from_text("")
+        self.journal.track(document)
+        for i, char in enumerate("hello world"):
+            document.insert(i, char)
+        document.delete(10, 1)
+        document.delete(9, 1)
+
+        self.journal.flush()
+
+        self.assertEqual(self.edit_count(), 1)
+        (recovered,), _ = self.recover()
+        self.assertEqual(recovered.document.text(), "hello wor")
+
+    def test_edits_replay_on_top_of_the_file(self):
+        path, document = self.open_file("line one\nline two\n")
+        self.journal.track(document, path)
+        document.insert(0, "# ")
+        self.journal.flush()
+        document.delete(document.line_start(1), 9)
+        self.journal.flush()
+
+        (recovered,), conflicts = self.recover()
+
+        self.assertEqual(conflicts, [])
+        self.assertEqual(recovered.path, path)
+        self.assertEqual(recovered.document.text(), document.text())
+        self.assertTrue(recovered.document.modified)
+
+    @patch("db.journal.LARGE_FILE_THRESHOLD", 8)
+    def test_large_base_is_mapped_and_its_edits_journaled_again(self):
+        path, document = self.open_file("line one\nline two\n")
+        self.journal.track(document, path)
+        document.insert(0, "# ")
+        self.journal.flush()
+
+        (recovered,), _ = self.recover()
+        self.assertIsNotNone(recovered.document.source)
+        self.assertEqual(recovered.document.text(), "# line one\nline two\n")
+
+        journal = EditJournal(self.db, "alice")
+        journal.track(recovered.document, path, recovered.edits)
+        journal.flush()
+        recovered.document.close()
+        (again,), _ = self.recover()
+        self.assertEqual(again.document.text(), "# line one\nline two\n")
+        again.document.close()
+
+    def test_changed_base_file_is_reported(self):
+        path, document = self.open_file("original\n")
+        self.journal.track(document, path)
+        document.insert(0, "x")
+        self.journal.flush()
+        with open(path, "w") as file:
+            file.write("changed elsewhere\n")
+
+        recovered, conflicts = self.recover()
+
+        self.assertEqual(recovered, [])
+        self.assertEqual(conflicts, [path])
+
+    def test_recovery_is_per_user(self):
+        document = Document.from_text("")
+        self.journal.track(document)
+        document.insert(0, "secret")
+        self.journal.flush()
+
+        self.assertEqual(self.recover("bob"), ([], []))
+        self.assertEqual(len(self.recover("alice")[0]), 1)
+
+    @patch("db.journal.COMPACT_EDITS", 3)
+    def test_compaction_replaces_deltas_with_a_snapshot(self):
+        document = Document.from_text("")
+        self.journal.track(document)
+        for i in range(5):
+            document.insert(0, f"{i}\n")
+            self.journal.flush()
+
+        self.assertLess(self.edit_count(), 3)
+        (recovered,), _ = self.recover()
+        self.assertEqual(recovered.document.text(), document.text())
+
+    def test_save_drops_the_journal(self):
+        path, document = self.open_file("text")
+        self.journal.track(document, path)
+        document.insert(0, "more ")
+        self.journal.flush()
+
+        document.save(path)
+        self.journal.saved(document, path)
+
+        self.assertEqual(self.recover(), ([], []))
+
+    def test_close_keeps_only_unsaved_documents(self):
+        kept = Document.from_text("")
+        self.journal.track(kept)
+        kept.insert(0, "unsaved")
+        path, saved = self.open_file("text")
+        self.journal.track(saved, path)
+        saved.insert(0, "x")
+        self.journal.flush()
+        saved.delete(0, 1)
+        saved.saved_version = saved.version
+
+        self.journal.close()
+
+        (recovered,), _ = self.recover()
+        self.assertEqual(recovered.document.text(), "unsaved")
+
+    def test_recovered_document_keeps_its_text_format(self):
+        path, document = self.open_file("one\r\n")
+        document.text_format = TextFormat("cp1252", b"", "\r\n")
+        self.journal.track(document, path)
+        document.insert(0, "x")
+        self.journal.flush()
+
+        (recovered,), _ = self.recover()
+
+        self.assertEqual(recovered.document.text(), "xone\r\n")
+        self.assertEqual(recovered.document.text_format, document.text_format)
+
+    def test_unedited_non_native_document_is_not_snapshotted(self):
+        path, document = self.open_file("one\r\n")
+        document.text_format = TextFormat("cp1252", b"", "\r\n")
+        self.journal.track(document, path)
+
+        self.journal.flush()
+
+        snapshots = self.db.conn.execute(
+            "SELECT COUNT(*) FROM journal_documents WHERE snapshot IS NOT NULL"
+        ).fetchone()[0]
+        self.assertEqual(snapshots, 0)
+        self.assertEqual(self.recover(), ([], []))
+
+    def test_documents_without_edits_are_not_recoverable(self):
+        path, document = self.open_file("text")
+        self.journal.track(document, path)
+        document.insert(0, "x")
+        self.journal.flush()
+        self.db.conn.execute("DELETE FROM journal_edits")
+
+        self.assertEqual(EditJournal(self.db, "alice").recoverable(), [])
+
+    @patch("db.journal.SNAPSHOT_LIMIT", 4)
+    def test_save_rebases_edits_made_while_saving(self):
+        path, document = self.open_file("line one\n")
+        self.journal.track(document, path)
+        document.insert(0, "# ")
+        self.journal.flush()
+
+        checkpoint = self.journal.checkpoint(document)
+        job, _ = document.save_job(path)
+        saved = job()
+        document.insert(len(document), "line two\n")
+        document.mark_saved(saved)
+        self.journal.saved(document, path, checkpoint)
+        self.journal.flush()
+
+        self.assertEqual(self.edit_count(), 1)
+        (recovered,), _ = self.recover()
+        self.assertEqual(recovered.document.text(), "# line one\nline two\n")
+
+    def test_random_edits_replay_exactly(self):
+        rng = random.Random(7)
+        path, document = self.open_file("abc\n" * 50)
+        self.journal.track(document, path)
+        for step in range(300):
+            size = len(document)
+            if size and rng.random() < 0.4:
+                offset = rng.randrange(size)
+                document.delete(offset, rng.randint(1, min(5, size - offset)))
+            else:
+                document.insert(rng.randint(0, size), rng.choice(["x", "yz\n", "é"]))
+            if step % 17 == 0:
+                self.journal.flush()
+        self.journal.flush()
+
+        (recovered,), _ = self.recover()
+
+        self.assertEqual(recovered.document.text(), document.text())
+
+
+if __name__ == "__main__":
+    unittest.main()
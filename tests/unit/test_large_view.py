@@ -0,0 +1,44 @@
+import unittest
+from unittest.mock import Mock, patch
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.line_index import LineIndex
+from gui.large_view import LargeFileView
+
+
+class TestLargeFileView(unittest.TestCase):
+    def setUp(self):
+        data = b"".join(f"{i}\n".encode() for i in range(10000))
+        self.index = LineIndex(data)
+        self.index.build()
+        self.text_area = Mock()
+        self.text_area.index.return_value = "1.0"
+
+        window_patch = patch.object(LargeFileView, "WINDOW_LINES", 100)
+        window_patch.start()
+        self.addCleanup(window_patch.stop)
+        self.view = LargeFileView(self.text_area, self.index)
+
+    def test_only_window_is_materialized(self):
+        inserted = self.text_area.insert.call_args[0][1]
+
+        self.assertEqual(inserted.count("\n"), 100)
+        self.assertEqual((self.view.first_line, self.view.last_line), (0, 100))
+
+    def test_scrollbar_moveto_loads_new_window(self):
+        self.view.on_scrollbar("moveto", "0.5")
+
+        self.assertEqual(self.view.first_line, 4950)
+        self.assertTrue(self.text_area.insert.call_args[0][1].startswith("4950\n"))
+        self.text_area.yview.assert_called_with("51.0")
+
+    def test_scrollbar_reflects_whole_file(self):
+        self.view.on_text_scroll("0.0", "0.5")
+
+        self.text_area.vbar.set.assert_called_with(0.0, 50 / 10001)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import os
+import tempfile
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.line_index import LineIndex, fingerprint
+
+
+class TestLineIndex(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, data):
+        with open(self.path, "wb") as file:
+            file.write(data)
+
+    def test_build_indexes_every_line(self):
+        self.write(b"one\ntwo\nthree")
+        index = LineIndex.from_path(self.path)
+        index.build()
+
+        self.assertTrue(index.complete)
+        self.assertEqual(index.line_count, 3)
+        self.assertEqual(index.get_text(1, 2), "two\n")
+        self.assertEqual(index.get_text(2, 3), "three")
+        index.close()
+
+    def test_build_across_chunk_boundaries(self):
+        lines = [f"line {i}\n".encode() for i in range(1000)]
+        self.write(b"".join(lines))
+        index = LineIndex.from_path(self.path)
+        index.CHUNK_SIZE = 7
+        index.build()
+
+        self.assertEqual(index.line_count, 1001)
+        self.assertEqual(index.get_text(500, 502), "line 500\nline 501\n")
+        index.close()
+
+    def test_background_build(self):
+        self.write(b"a\n" * 10000)
+        index = LineIndex.from_path(self.path)
+        index.start()
+        index._thread.join()
+
+        self.assertTrue(index.complete)
+        self.assertEqual(index.progress, 1.0)
+        self.assertEqual(index.line_count, 10001)
+        index.close()
+
+    def test_adopted_offsets_skip_the_scan(self):
+        self.write(b"one\ntwo\nthree")
+        scanned = LineIndex.from_path(self.path)
+        scanned.build()
+        index = LineIndex.from_path(self.path)
+
+        index.adopt(scanned.offsets)
+
+        self.assertTrue(index.complete)
+        self.assertEqual(index.get_text(2, 3), "three")
+        scanned.close()
+        index.close()
+
+    def test_fingerprint_changes_with_content(self):
+        self.write(b"x" * 200_000)
+        index = LineIndex.from_path(self.path)
+        before = fingerprint(index.buffer, index.stat)
+        index.close()
+        self.write(b"x" * 199_999 + b"y")
+        index = LineIndex.from_path(self.path)
+        after = fingerprint(index.buffer, index.stat)
+        index.close()
+
+        self.assertEqual(before[0], after[0])
+        self.assertNotEqual(before[2], after[2])
+
+    def test_empty_file(self):
+        index = LineIndex.from_path(self.path)
+
+        self.assertTrue(index.complete)
+        self.assertEqual(index.line_count, 1)
+        self.assertEqual(index.get_text(0, 1), "")
+        index.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.metrics import BUCKETS, Histogram, Probes, bucket_limit, bucket_of
+
+
+class TestHistogram(unittest.TestCase):
+    def test_buckets_bound_their_samples(self):
+        for seconds in (1e-7, 1e-6, 3.3e-5, 0.02, 1.5, 60.0):
+            i = bucket_of(seconds)
+            self.assertLessEqual(seconds, bucket_limit(i))
+            if i:
+                self.assertGreater(seconds, bucket_limit(i - 1))
+        self.assertEqual(bucket_of(1e9), BUCKETS - 1)
+
+    def test_percentiles_are_within_a_bucket(self):
+        histogram = Histogram()
+        for ms in range(1, 101):
+            histogram.record(ms / 1000)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.percentile(50), 0.050, delta=0.050 * 0.2)
+        self.assertAlmostEqual(histogram.percentile(99), 0.099, delta=0.099 * 0.2)
+        self.assertEqual(histogram.percentile(100), 0.1)
+        self.assertEqual(Histogram().percentile(50), 0.0)
+
+
+class TestProbes(unittest.TestCase):
+    def setUp(self):
+        self.probes = Probes()
+
+        @self.probes.timed("work")
+        def work(value):
+            return value * 2
+
+        self.work = work
+
+    def test_disabled_probe_records_nothing(self):
+        self.assertEqual(self.work(2), 4)
+        self.assertEqual(self.probes.summary(), {})
+
+    def test_enabled_probe_records_calls(self):
+        self.probes.enabled = True
+        self.work(1)
+        self.work(2)
+
+        summary = self.probes.summary()
+
+        self.assertEqual(summary["work"]["count"], 2)
+        self.assertIn("p99_ms", summary["work"])
+
+    def test_dump_writes_summary_and_buckets(self):
+        self.probes.record("save_file", 0.25)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.json")
+            self.probes.dump(path)
+            with open(path) as file:
+                report = json.load(file)
+
+        self.assertEqual(report["probes"]["save_file"]["count"], 1)
+        (bucket,) = report["buckets"]["save_file"]
+        self.assertEqual(int(bucket), bucket_of(0.25))
+
+
+if __name__ == "__main__":
+    unittest.main()
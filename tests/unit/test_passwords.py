@@ -0,0 +1,70 @@
+import unittest
+import time
+from unittest.mock import patch
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from db.passwords import PasswordHasher, ReauthTokens, legacy_hash
+
+
+class TestPasswordHasher(unittest.TestCase):
+    def setUp(self):
+        self.hasher = PasswordHasher(n=2**10)
+
+    def test_hash_is_salted(self):
+        first = self.hasher.hash("secret")
+        second = self.hasher.hash("secret")
+
+        self.assertNotEqual(first, second)
+        self.assertTrue(first.startswith("scrypt$1024$8$1$"))
+
+    def test_verify(self):
+        stored = self.hasher.hash("secret")
+
+        self.assertTrue(self.hasher.verify("secret", stored))
+        self.assertFalse(self.hasher.verify("wrong", stored))
+
+    def test_verify_legacy_hash(self):
+        stored = legacy_hash("secret")
+
+        self.assertTrue(self.hasher.verify("secret", stored))
+        self.assertFalse(self.hasher.verify("wrong", stored))
+
+    def test_needs_rehash(self):
+        self.assertTrue(self.hasher.needs_rehash(legacy_hash("secret")))
+        self.assertFalse(self.hasher.needs_rehash(self.hasher.hash("secret")))
+        stronger = PasswordHasher(n=2**11)
+        self.assertTrue(stronger.needs_rehash(self.hasher.hash("secret")))
+
+    def test_verify_rejects_malformed_hashes(self):
+        for stored in ("scrypt$1$2", "bcrypt$a$b$c$d$e", "scrypt$x$8$1$00$00"):
+            self.assertFalse(self.hasher.verify("secret", stored))
+
+
+class TestReauthTokens(unittest.TestCase):
+    def test_token_is_bound_to_the_password(self):
+        tokens = ReauthTokens(ttl=60)
+        tokens.issue("alice", "secret")
+        self.assertTrue(tokens.check("alice", "secret"))
+        self.assertFalse(tokens.check("alice", "wrong"))
+        self.assertFalse(tokens.check("bob", "secret"))
+
+    def test_expired_and_revoked_tokens_fail(self):
+        tokens = ReauthTokens(ttl=60)
+        tokens.issue("alice", "secret")
+        with patch("db.passwords.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertFalse(tokens.check("alice", "secret"))
+        self.assertNotIn("alice", tokens.tokens)
+        tokens.issue("alice", "secret")
+        tokens.revoke("alice")
+        self.assertFalse(tokens.check("alice", "secret"))
+
+    def test_disabled_by_default(self):
+        tokens = ReauthTokens()
+        tokens.issue("alice", "secret")
+        self.assertFalse(tokens.check("alice", "secret"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.piece_table import PieceTable, span_bytes
+
+
+def line_starts(data):
+    return [0] + [i + 1 for i, byte in enumerate(data) if byte == ord("\n")]
+
+
+class TestPieceTable(unittest.TestCase):
+    def test_insert_and_delete(self):
+        table = PieceTable(b"hello world")
+        table.insert(5, b",")
+        table.insert(len(table), b"!")
+        table.delete(0, 1)
+        table.insert(0, b"H")
+
+        self.assertEqual(table.read(), b"Hello, world!")
+        self.assertEqual(len(table), 13)
+
+    def test_typing_extends_one_piece(self):
+        table = PieceTable(b"abc")
+        for i, char in enumerate(b"xyz"):
+            table.insert(3 + i, bytes([char]))
+
+        self.assertEqual(table.read(), b"abcxyz")
+        self.assertEqual(len(list(table.pieces())), 2)
+
+    def test_line_start(self):
+        table = PieceTable(b"one\ntwo\nthree")
+        table.insert(4, b"1.5\n")
+
+        self.assertEqual(table.line_count, 4)
+        self.assertEqual(table.line_start(1), 4)
+        self.assertEqual(table.line_start(2), 8)
+        self.assertEqual(table.line_start(3), 12)
+        self.assertEqual(table.line_start(10), len(table))
+
+    def test_iter_chunks_respects_chunk_size(self):
+        table = PieceTable(b"x" * 100)
+        table.CHUNK_SIZE = 30
+
+        chunks = list(table.iter_chunks())
+
+        self.assertEqual([len(chunk) for chunk in chunks], [30, 30, 30, 10])
+        self.assertEqual(table.read(10, 20), b"x" * 10)
+
+    def test_random_edits_match_reference(self):
+        rng = random.Random(42)
+        reference = bytearray(b"line\n" * 50)
+        table = PieceTable(bytes(reference))
+
+        for _ in range(2000):
+            if reference and rng.random() < 0.4:
+                start = rng.randrange(len(reference))
+                length = rng.randint(1, 10)
+                del reference[start : start + length]
+                table.delete(start, min(length, len(table) - start))
+            else:
+                offset = rng.randint(0, len(reference))
+                data = rng.choice([b"a", b"\n", b"xy\nz", b"long text"])
+                reference[offset:offset] = data
+                table.insert(offset, data)
+
+        self.assertEqual(table.read(), bytes(reference))
+        starts = line_starts(reference)
+        self.assertEqual(table.line_count, len(starts))
+        for line in range(0, len(starts), 7):
+            self.assertEqual(table.line_start(line), starts[line])
+        for offset in range(0, len(reference), 13):
+            self.assertEqual(table.line_at(offset), reference.count(b"\n", 0, offset))
+
+    def test_spans_are_put_back_without_copying(self):
+        table = PieceTable(b"hello world")
+        table.insert(5, b",")
+        spans = table.spans(3, 8)
+
+        self.assertEqual(span_bytes(spans), b"lo, w")
+        self.assertIs(spans[0][0], table.original)
+        table.delete(3, 5)
+        self.assertEqual(table.read(), b"helorld")
+        table.insert_spans(3, spans)
+        self.assertEqual(table.read(), b"hello, world")
+        self.assertEqual(len(table.added.data), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
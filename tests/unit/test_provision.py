@@ -0,0 +1,38 @@
+import unittest
+import os
+import tempfile
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from db.db import Database
+from provision import main
+
+
+class TestProvision(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "users.db")
+        self.csv_path = os.path.join(self.directory.name, "users.csv")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_main_creates_users_and_reports_conflicts(self):
+        with open(self.csv_path, "w") as file:
+            file.write("username,password\nann,secret1\nben,secret2\nann,secret3\n")
+
+        with patch("sys.stdout"), patch("sys.stderr") as stderr:
+            code = main([self.csv_path, "--db", self.db_path, "--workers", "1"])
+
+        errors = "".join(call.args[0] for call in stderr.write.call_args_list)
+        self.assertEqual(code, 1)
+        self.assertIn("duplicate in input", errors)
+        db = Database(self.db_path)
+        self.assertTrue(db.authenticate_user("ben", "secret2"))
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.ring_buffer import History, RingBuffer
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_values_in_insertion_order(self):
+        buffer = RingBuffer(3)
+        for value in (1, 2):
+            buffer.append(value)
+
+        self.assertEqual(list(buffer.values()), [1.0, 2.0])
+        self.assertEqual(buffer.latest(), 2.0)
+
+    def test_overwrites_oldest_when_full(self):
+        buffer = RingBuffer(3)
+        for value in range(10):
+            buffer.append(value)
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(list(buffer.values()), [7.0, 8.0, 9.0])
+        self.assertEqual(len(buffer.data), 3)
+
+    def test_history_series_are_bounded(self):
+        history = History(capacity=4, names=["cpu", "ram"])
+        for value in range(100):
+            history.record({"cpu": value, "ram": value * 2})
+
+        self.assertEqual(history.names(), ["cpu", "ram"])
+        self.assertEqual(list(history.values("ram")), [192.0, 194.0, 196.0, 198.0])
+        self.assertEqual(list(history.values("missing")), [])
+
+    def test_history_keeps_series_aligned(self):
+        history = History(capacity=3, names=["cpu", "disk_read"])
+
+        history.record({"cpu": 1.0})
+        history.record({"cpu": 2.0, "disk_read": 5.0, "unknown": 9.0})
+
+        self.assertEqual(list(history.values("cpu")), [1.0, 2.0])
+        self.assertEqual(list(history.values("disk_read")), [0.0, 5.0])
+        self.assertEqual(history.names(), ["cpu", "disk_read"])
+
+if __name__ == "__main__":
+    unittest.main()
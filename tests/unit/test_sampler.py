@@ -0,0 +1,77 @@
+import unittest
+import time
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.sampler import ResourceSampler
+
+
+class TestResourceSampler(unittest.TestCase):
+    def setUp(self):
+        psutil_patch = patch("core.sampler.psutil")
+        self.mock_psutil = psutil_patch.start()
+        self.addCleanup(psutil_patch.stop)
+
+        def cpu_percent(interval, percpu=False):
+            time.sleep(interval)
+            return [40.0, 44.0]
+
+        self.mock_psutil.cpu_percent.side_effect = cpu_percent
+        self.mock_psutil.cpu_count.return_value = 2
+        self.mock_psutil.virtual_memory.return_value = Mock(
+            percent=50.0, used=4 * 1024**3, total=8 * 1024**3
+        )
+        self.mock_psutil.Process.return_value.memory_info.return_value = Mock(
+            rss=100
+        )
+        self.mock_psutil.disk_io_counters.side_effect = [
+            Mock(read_bytes=0, write_bytes=0),
+            Mock(read_bytes=2000, write_bytes=500),
+            Mock(read_bytes=2000, write_bytes=500),
+        ]
+
+    def test_samples_in_background(self):
+        sampler = ResourceSampler(interval=0.01)
+
+        started = time.perf_counter()
+        sampler.start()
+        self.assertLess(time.perf_counter() - started, 0.05)
+        deadline = time.monotonic() + 5
+        while sampler.latest is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        sampler.stop()
+
+        self.assertEqual(sampler.latest.cpu_percent, 42.0)
+        self.assertEqual(sampler.latest.ram_percent, 50.0)
+        self.assertEqual(sampler.latest.ram_total, 8 * 1024**3)
+
+    def test_record_fills_history(self):
+        sampler = ResourceSampler(history_size=2)
+
+        sampler.record([40.0, 44.0], 1.0)
+        sampler.record([10.0, 20.0], 2.0)
+        sampler.record([30.0, 50.0], 1.0)
+
+        self.assertEqual(list(sampler.history.values("cpu")), [15.0, 40.0])
+        self.assertEqual(list(sampler.history.values("cpu1")), [20.0, 50.0])
+        self.assertEqual(list(sampler.history.values("disk_read")), [1000.0, 0.0])
+        self.assertEqual(list(sampler.history.values("rss")), [100.0, 100.0])
+
+    def test_series_are_allocated_up_front_and_aligned(self):
+        sampler = ResourceSampler(history_size=3)
+
+        self.assertEqual(
+            sorted(sampler.history.names()),
+            ["cpu", "cpu0", "cpu1", "disk_read", "disk_write", "ram", "rss"],
+        )
+        sampler.record([40.0, 44.0], 1.0)
+
+        for name in sampler.history.names():
+            self.assertEqual(len(sampler.history.values(name)), 1, name)
+        self.assertEqual(list(sampler.history.values("disk_write")), [0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import os
+import tempfile
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.io_worker import IOTask, Cancelled
+from core.save import UMASK, atomic_write, coalesce
+
+
+class TestSave(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "file.txt")
+        with open(self.path, "wb") as file:
+            file.write(b"original")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self):
+        with open(self.path, "rb") as file:
+            return file.read()
+
+    def test_coalesce_emits_fixed_size_chunks(self):
+        chunks = list(coalesce([b"ab", b"cde", b"f", b"ghijk"], chunk_size=4))
+
+        self.assertEqual(chunks, [b"abcd", b"efgh", b"ijk"])
+
+    def test_atomic_write_replaces_and_reports(self):
+        with patch("core.save.os.fsync") as mock_fsync:
+            stats = atomic_write(self.path, [b"new ", b"content"], chunk_size=4)
+
+        self.assertEqual(self.read(), b"new content")
+        self.assertEqual(stats.bytes_written, 11)
+        self.assertGreater(stats.throughput, 0)
+        self.assertEqual(mock_fsync.call_count, 2)
+
+    def test_cancelled_write_keeps_original(self):
+        task = IOTask(total=20)
+
+        def chunks():
+            yield b"new"
+            task.cancel()
+            yield b"data"
+
+        with self.assertRaises(Cancelled):
+            atomic_write(self.path, chunks(), task, chunk_size=2)
+
+        self.assertEqual(self.read(), b"original")
+        self.assertEqual(os.listdir(self.directory.name), ["file.txt"])
+
+    def test_failed_write_keeps_original(self):
+        def chunks():
+            yield b"partial"
+            raise OSError("disk full")
+
+        with self.assertRaises(OSError):
+            atomic_write(self.path, chunks())
+
+        self.assertEqual(self.read(), b"original")
+        self.assertEqual(os.listdir(self.directory.name), ["file.txt"])
+
+    def test_new_file_mode_does_not_touch_umask(self):
+        new_path = os.path.join(self.directory.name, "new.txt")
+
+        with patch("core.save.os.umask") as mock_umask:
+            atomic_write(new_path, [b"data"])
+
+        mock_umask.assert_not_called()
+        self.assertEqual(os.stat(new_path).st_mode & 0o777, 0o666 & ~UMASK)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core import search as search_module
+from core.io_worker import IOTask
+from core.piece_table import PieceTable
+from core.search import SearchQuery, SearchResult, replace_all, search
+
+
+class TestSearch(unittest.TestCase):
+    def test_literal_matches_report_line_and_column(self):
+        table = PieceTable(b"alpha beta\nbeta\n\nxbetax")
+
+        result = search(table.snapshot(), SearchQuery("beta"))
+
+        self.assertEqual(list(result), [(0, 6, 4), (1, 0, 4), (3, 1, 4)])
+        self.assertTrue(result.complete)
+
+    def test_regex_and_case_insensitive(self):
+        table = PieceTable(b"Foo foo1 FOO22")
+
+        result = search(table.snapshot(), SearchQuery(r"foo\d+", True, False))
+
+        self.assertEqual(list(result), [(0, 4, 4), (0, 9, 5)])
+
+    def test_literal_patterns_are_escaped(self):
+        table = PieceTable(b"a.b axb")
+
+        result = search(table.snapshot(), SearchQuery("a.b"))
+
+        self.assertEqual(len(result), 1)
+
+    def test_matches_across_block_boundaries(self):
+        text = "".join(f"line {i} needle\n" for i in range(5000))
+        table = PieceTable(text.encode())
+        table.insert(7, "é".encode())
+        original_block = search_module.BLOCK_SIZE
+        search_module.BLOCK_SIZE = 1000
+        self.addCleanup(setattr, search_module, "BLOCK_SIZE", original_block)
+        task = IOTask(len(table))
+
+        result = search(table.snapshot(), SearchQuery("needle"), task=task)
+
+        self.assertEqual(len(result), 5000)
+        self.assertEqual(result[0], (0, 8, 6))
+        self.assertEqual(result[4999], (4999, 10, 6))
+        self.assertEqual(task.done_bytes, len(table))
+
+    def small_blocks(self, size):
+        original_block = search_module.BLOCK_SIZE
+        search_module.BLOCK_SIZE = size
+        self.addCleanup(setattr, search_module, "BLOCK_SIZE", original_block)
+
+    def test_long_line_carries_only_the_window(self):
+        self.small_blocks(16)
+        table = PieceTable(b"x\n" + b"ab" * 1000 + b"\nab")
+        scanned = []
+        query = SearchQuery("ba")
+        compiled = query.compiled
+
+        class Recording:
+            def finditer(self, text):
+                scanned.append(len(text))
+                return compiled.finditer(text)
+
+        query.compiled = Recording()
+        result = search(table.snapshot(), query)
+
+        self.assertEqual(len(result), 999)
+        self.assertEqual(result[0], (1, 1, 2))
+        self.assertEqual(result[998], (1, 1997, 2))
+        self.assertLessEqual(max(scanned), 16 + query.window)
+
+    def test_regex_matches_in_a_long_line(self):
+        self.small_blocks(10)
+        table = PieceTable(b"-" * 95 + b"abc123" + b"-" * 50 + b"abc45")
+
+        result = search(table.snapshot(), SearchQuery(r"abc\d+", True))
+
+        self.assertEqual(list(result), [(0, 95, 6), (0, 151, 5)])
+
+    def test_replace_all_literal_ignores_backslashes(self):
+        table = PieceTable(b"a-b-c")
+
+        text, count = replace_all(table.snapshot(), SearchQuery("-"), r"\1")
+
+        self.assertEqual((text, count), (r"a\1b\1c", 2))
+
+    def test_replace_all_regex_groups(self):
+        table = PieceTable(b"x=1 y=2")
+
+        text, count = replace_all(
+            table.snapshot(), SearchQuery(r"(\w)=(\d)", True), r"\2=\1"
+        )
+
+        self.assertEqual((text, count), ("1=x 2=y", 2))
+
+
+class TestSearchResult(unittest.TestCase):
+    def setUp(self):
+        self.result = SearchResult()
+        for line, column in ((0, 2), (0, 8), (3, 0), (7, 5)):
+            self.result.add(line, column, 1)
+
+    def test_next_after_wraps(self):
+        self.assertEqual(self.result.next_after(0, 2), 1)
+        self.assertEqual(self.result.next_after(1, 0), 2)
+        self.assertEqual(self.result.next_after(7, 5), 0)
+
+    def test_previous_before_wraps(self):
+        self.assertEqual(self.result.previous_before(3, 0), 1)
+        self.assertEqual(self.result.previous_before(7, 9), 3)
+        self.assertEqual(self.result.previous_before(0, 2), 3)
+
+    def test_empty_result(self):
+        self.assertIsNone(SearchResult().next_after(0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
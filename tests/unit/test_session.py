@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+import sys
+from array import array
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from db.db import Database
+from db.session import RECENT_LIMIT, SessionStore
+
+
+class TestSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.dir.name, "editor.db"))
+        self.sessions = SessionStore(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        self.dir.cleanup()
+
+    def test_session_round_trip(self):
+        tabs = [("/a.txt", 0.25, "12.4"), ("/b.log", None, None)]
+        self.sessions.save("alice", "900x700+10+20", tabs, 1)
+
+        session = self.sessions.load("alice")
+
+        self.assertEqual(session.geometry, "900x700+10+20")
+        self.assertEqual(session.tabs, tabs)
+        self.assertEqual(session.active, 1)
+        self.assertIsNone(self.sessions.load("bob"))
+
+    def test_saving_replaces_the_previous_tabs(self):
+        self.sessions.save("alice", "800x600", [("/a", 0, "1.0"), ("/b", 0, "1.0")], 0)
+        self.sessions.save("alice", "800x600", [("/c", 0.5, "3.0")], 0)
+
+        self.assertEqual(self.sessions.load("alice").tabs, [("/c", 0.5, "3.0")])
+
+    @patch("db.session.time.time")
+    def test_recent_files_newest_first_and_bounded(self, mock_time):
+        for i in range(RECENT_LIMIT + 3):
+            mock_time.return_value = i
+            self.sessions.add_recent("alice", f"/file{i}")
+        mock_time.return_value = 100
+        self.sessions.add_recent("alice", "/file5")
+
+        recent = self.sessions.recent("alice")
+
+        self.assertEqual(len(recent), RECENT_LIMIT)
+        self.assertEqual(recent[:2], ["/file5", f"/file{RECENT_LIMIT + 2}"])
+        self.assertNotIn("/file0", recent)
+        self.assertEqual(self.sessions.recent("bob"), [])
+
+    def test_cached_offsets_need_a_matching_fingerprint(self):
+        offsets = array("Q", [0, 10, 25])
+        key = (30, 123, b"d" * 16)
+        self.sessions.cache_offsets("/big.log", key, offsets)
+
+        self.assertEqual(self.sessions.cached_offsets("/big.log", key), offsets)
+        self.assertIsNone(self.sessions.cached_offsets("/big.log", (30, 124, key[2])))
+        self.assertIsNone(self.sessions.cached_offsets("/other.log", key))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.document import Document
+from core.tabs import TabSet
+from gui.tabs import Tab
+
+
+def open_tab(path, text="", live=False):
+    tab = Tab(path)
+    tab.document = Document.from_text(text)
+    if live:
+        tab.text_area = Mock()
+    return tab
+
+
+class TestTabSet(unittest.TestCase):
+    def test_new_tabs_open_next_to_the_active_one(self):
+        tabs = TabSet()
+        first = tabs.add(Tab("a"))
+        tabs.activate(first)
+        last = tabs.add(Tab("c"))
+        tabs.activate(first)
+        middle = tabs.add(Tab("b"))
+
+        self.assertEqual(list(tabs), [first, middle, last])
+
+    def test_removing_active_tab_returns_its_neighbour(self):
+        tabs = TabSet()
+        a, b, c = (tabs.add(Tab(name)) for name in "abc")
+        tabs.activate(c)
+
+        self.assertIs(tabs.remove(c), b)
+        self.assertIsNone(tabs.active)
+        self.assertIsNone(tabs.remove(a))
+
+    def test_find_compares_absolute_paths(self):
+        tabs = TabSet()
+        tab = tabs.add(Tab("notes.txt"))
+
+        self.assertIs(tabs.find(str(Path("notes.txt").absolute())), tab)
+        self.assertIsNone(tabs.find("other.txt"))
+
+    def test_least_recently_used_widgets_are_released_first(self):
+        tabs = TabSet(live_limit=2)
+        old, recent, active = (open_tab(name, live=True) for name in "abc")
+        for tab in (old, recent, active):
+            tabs.add(tab)
+            tabs.activate(tab)
+
+        self.assertEqual(tabs.widgets_to_release(), [old])
+
+    def test_active_and_pinned_tabs_keep_their_widgets(self):
+        tabs = TabSet(live_limit=1)
+        pinned = open_tab("big", live=True)
+        pinned.large_view = Mock()
+        active = open_tab("a", live=True)
+        for tab in (pinned, active):
+            tabs.add(tab)
+            tabs.activate(tab)
+
+        self.assertEqual(tabs.widgets_to_release(), [])
+
+    def test_buffers_over_budget_are_dropped_oldest_first(self):
+        tabs = TabSet(memory_budget=250)
+        old, recent, active = (open_tab(name, "x" * 100) for name in "abc")
+        for tab in (old, recent, active):
+            tabs.add(tab)
+            tabs.activate(tab)
+
+        self.assertEqual(tabs.resident_bytes(), 300)
+        self.assertEqual(tabs.buffers_to_drop(), [old])
+
+    def test_modified_untitled_and_live_buffers_are_kept(self):
+        tabs = TabSet(memory_budget=0)
+        modified = open_tab("a", "abc")
+        modified.document.insert(0, "x")
+        untitled = open_tab(None, "abc")
+        live = open_tab("c", "abc", live=True)
+        for tab in (modified, untitled, live, open_tab("d")):
+            tabs.add(tab)
+            tabs.activate(tab)
+
+        self.assertEqual(tabs.buffers_to_drop(), [])
+
+
+class TestTab(unittest.TestCase):
+    def test_title_marks_unsaved_changes(self):
+        tab = open_tab("/tmp/notes.txt", "abc")
+        self.assertEqual(tab.title, "notes.txt")
+
+        tab.document.insert(0, "x")
+
+        self.assertEqual(tab.title, "notes.txt *")
+        self.assertEqual(Tab().title, "Untitled")
+
+    def test_mapped_documents_cost_no_resident_bytes(self):
+        tab = open_tab("big", "abc")
+        tab.document.source = Mock()
+
+        self.assertEqual(tab.resident_bytes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import codecs
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.document import Document
+from core.text_format import NATIVE, TextFormat, read_text, sniff
+
+
+class TestSniff(unittest.TestCase):
+    def test_byte_order_marks(self):
+        self.assertEqual(sniff(codecs.BOM_UTF8 + b"a\n").label, "utf-8 BOM LF")
+        self.assertEqual(
+            sniff("a\r\nb".encode("utf-16")).label.split()[1:], ["BOM", "CRLF"]
+        )
+        self.assertEqual(
+            sniff(codecs.BOM_UTF32_LE + "a".encode("utf-32-le")).encoding,
+            "utf-32-le",
+        )
+
+    def test_encodings_without_a_mark(self):
+        self.assertEqual(sniff("café\n".encode()).encoding, "utf-8")
+        self.assertEqual(sniff("café\n".encode("cp1252")).encoding, "cp1252")
+        self.assertEqual(sniff(b"\x81\xe9").encoding, "latin-1")
+        self.assertEqual(sniff("plain text".encode("utf-16-le")).encoding, "utf-16-le")
+        self.assertEqual(sniff("plain text".encode("utf-16-be")).encoding, "utf-16-be")
+
+    def test_most_common_line_end_wins(self):
+        self.assertEqual(sniff(b"a\r\nb\r\nc\n").newline, "\r\n")
+        self.assertEqual(sniff(b"a\rb\r").newline, "\r")
+        self.assertEqual(sniff(b"no line ends").newline, "\n")
+
+    def test_label_round_trip(self):
+        text_format = TextFormat("utf-16-le", codecs.BOM_UTF16_LE, "\r\n")
+
+        self.assertEqual(TextFormat.from_label(text_format.label), text_format)
+        self.assertTrue(TextFormat.from_label(NATIVE.label).native)
+
+
+class TestReadText(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, data):
+        with open(self.path, "wb") as file:
+            file.write(data)
+
+    def test_line_ends_split_across_chunks(self):
+        self.write(("ab\r\ncd\r\néf" * 1000).encode("utf-16"))
+
+        for chunk_size in (1, 3, 5, 7, 64):
+            text, text_format = read_text(self.path, chunk_size=chunk_size)
+            self.assertEqual(text, "ab\ncd\néf" * 1000)
+            self.assertEqual(text_format.encoding, "utf-16-le")
+
+    def test_late_undecodable_bytes_fall_back_to_latin_1(self):
+        self.write(b"plain\n" * 1000 + b"caf\xe9\n")
+
+        text, text_format = read_text(self.path, chunk_size=16)
+
+        self.assertEqual(text_format.encoding, "latin-1")
+        self.assertTrue(text.endswith("café\n"))
+
+    def test_save_keeps_encoding_and_line_ends(self):
+        original = codecs.BOM_UTF16_LE + "one\r\ntwo\r\n".encode("utf-16-le")
+        self.write(original)
+        text, text_format = read_text(self.path)
+        document = Document.from_text(text)
+        document.text_format = text_format
+        document.attach_file(self.path)
+
+        document.save(self.path)
+        with open(self.path, "rb") as file:
+            self.assertEqual(file.read(), original)
+
+        document.insert(len(document), "thé\n")
+        document.save(self.path)
+        with open(self.path, "rb") as file:
+            self.assertEqual(
+                file.read(), original + "thé\r\n".encode("utf-16-le")
+            )
+
+    def test_native_files_are_unchanged(self):
+        self.write(b"one\ntwo\n")
+
+        text, text_format = read_text(self.path)
+
+        self.assertEqual(text, "one\ntwo\n")
+        self.assertTrue(text_format.native)
+
+
+if __name__ == "__main__":
+    unittest.main()
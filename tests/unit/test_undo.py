@@ -0,0 +1,116 @@
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.document import Document
+from core.undo import SPAN_COST, STEP_COST
+
+
+def type_text(document, offset, text):
+    for i, char in enumerate(text):
+        document.insert(offset + i, char)
+
+
+class TestUndoHistory(unittest.TestCase):
+    def test_typing_coalesces_into_words(self):
+        document = Document.from_text("")
+        type_text(document, 0, "hello world")
+
+        self.assertEqual(len(document.history), 2)
+        document.undo()
+        self.assertEqual(document.text(), "hello ")
+        document.undo()
+        self.assertEqual(document.text(), "")
+        document.redo()
+        document.redo()
+        self.assertEqual(document.text(), "hello world")
+
+    def test_typed_run_is_one_span(self):
+        document = Document.from_text("")
+        type_text(document, 0, "abcdef")
+
+        (step,) = document.history.undo_steps
+        self.assertEqual(len(step[0].inserted), 1)
+        self.assertEqual(document.history.size, STEP_COST + SPAN_COST)
+
+    def test_new_lines_and_pastes_are_steps_of_their_own(self):
+        document = Document.from_text("")
+        type_text(document, 0, "ab\ncd")
+        document.insert(5, "pasted text")
+
+        self.assertEqual(len(document.history), 4)
+        document.undo()
+        self.assertEqual(document.text(), "ab\ncd")
+
+    def test_pause_or_jump_starts_a_new_step(self):
+        document = Document.from_text("")
+        with patch("core.undo.time.monotonic", return_value=0.0):
+            type_text(document, 0, "ab")
+        with patch("core.undo.time.monotonic", return_value=10.0):
+            type_text(document, 2, "cd")
+            document.insert(0, "x")
+
+        self.assertEqual(len(document.history), 3)
+
+    def test_backspace_and_delete_runs_coalesce(self):
+        document = Document.from_text("one two three")
+        for offset in range(7, 4, -1):
+            document.delete(offset - 1, 1)
+        for _ in range(2):
+            document.delete(4, 1)
+
+        self.assertEqual(document.text(), "one hree")
+        self.assertEqual(len(document.history), 1)
+        document.undo()
+        self.assertEqual(document.text(), "one two three")
+
+    def test_group_is_one_compact_step(self):
+        document = Document.from_text("x" * 100_000)
+        with document.history.group():
+            document.delete(0, len(document))
+            document.insert(0, "y" * 100_000)
+
+        (step,) = document.history.undo_steps
+        self.assertEqual(len(step), 1)
+        self.assertEqual(document.history.size, STEP_COST + 2 * SPAN_COST)
+        document.undo()
+        self.assertEqual(document.text(), "x" * 100_000)
+        document.redo()
+        self.assertEqual(document.text(), "y" * 100_000)
+
+    def test_memory_cap_drops_oldest_steps(self):
+        document = Document.from_text("")
+        document.history.limit = 10 * (STEP_COST + SPAN_COST)
+        for i in range(50):
+            document.insert(len(document), f"line {i}\n")
+
+        self.assertEqual(len(document.history), 10)
+        self.assertLessEqual(document.history.size, document.history.limit)
+        while document.undo():
+            pass
+        self.assertEqual(document.text(), "".join(f"line {i}\n" for i in range(40)))
+
+    def test_new_edit_clears_redo(self):
+        document = Document.from_text("abc")
+        document.insert(3, "def")
+        document.undo()
+        document.insert(0, "xyz")
+
+        self.assertFalse(document.redo())
+        self.assertEqual(document.history.size, STEP_COST + SPAN_COST)
+
+    def test_undo_reaches_the_journal(self):
+        document = Document.from_text("abc")
+        document.insert(3, "def")
+        document.journal = journal = Mock()
+        document.undo()
+        document.redo()
+
+        journal.delete.assert_called_once_with(3, 3)
+        journal.insert.assert_called_once_with(3, b"def")
+
+
+if __name__ == "__main__":
+    unittest.main()